@@ -17,6 +17,10 @@ abstract contract NotionalV2BaseLiquidator {
     using SafeInt256 for int256;
     using SafeMath for uint256;
 
+    /// @dev Action values are laid out so that they decode as bitflags:
+    ///  bits 0-1: liquidation kind (LocalCurrency, CollateralCurrency, LocalfCash, CrossCurrencyfCash)
+    ///  bit 2: set when profits are not withdrawn to the owner
+    ///  bit 3: set when the local currency has transfer fees
     enum LiquidationAction {
         LocalCurrency_NoTransferFee_Withdraw,
         CollateralCurrency_NoTransferFee_Withdraw,
@@ -36,6 +40,15 @@ abstract contract NotionalV2BaseLiquidator {
         CrossCurrencyfCash_WithTransferFee_NoWithdraw
     }
 
+    uint8 internal constant LIQUIDATION_KIND_MASK = 0x03;
+    uint8 internal constant NO_WITHDRAW_FLAG = 0x04;
+    uint8 internal constant TRANSFER_FEE_FLAG = 0x08;
+
+    uint8 internal constant LOCAL_CURRENCY = 0;
+    uint8 internal constant COLLATERAL_CURRENCY = 1;
+    uint8 internal constant LOCAL_FCASH = 2;
+    uint8 internal constant CROSS_CURRENCY_FCASH = 3;
+
     NotionalProxy public immutable NotionalV2;
     mapping(address => address) underlyingToCToken;
     address public immutable WETH;
@@ -64,8 +77,23 @@ abstract contract NotionalV2BaseLiquidator {
         bytes memory params
     ) internal virtual returns(uint256);
 
+    function _liquidationKind(LiquidationAction action) internal pure returns (uint8) {
+        return uint8(action) & LIQUIDATION_KIND_MASK;
+    }
+
     function _hasTransferFees(LiquidationAction action) internal pure returns (bool) {
-        return action >= LiquidationAction.LocalCurrency_WithTransferFee_Withdraw;
+        return (uint8(action) & TRANSFER_FEE_FLAG) != 0;
+    }
+
+    function _shouldWithdraw(LiquidationAction action) internal pure returns (bool) {
+        return (uint8(action) & NO_WITHDRAW_FLAG) == 0;
+    }
+
+    /// @notice Collateral and cross currency fCash liquidations receive collateral that must be
+    /// traded back to the local currency to repay the flash loan. Both kinds are odd, COLLATERAL_CURRENCY
+    /// and CROSS_CURRENCY_FCASH, so the check is a single bit test.
+    function _requiresDexTrade(LiquidationAction action) internal pure returns (bool) {
+        return (_liquidationKind(action) & 1) == 1;
     }
 
     function _transferFeeDepositTokens(
@@ -18,6 +18,10 @@ abstract contract NotionalV2FlashLiquidator is NotionalV2BaseLiquidator, IFlashL
     using SafeInt256 for int256;
     using SafeMath for uint256;
 
+    /// @notice Action type used in the flash loan params to signify a bundle of liquidations,
+    /// does not collide with any LiquidationAction value
+    uint8 public constant BUNDLE_ACTION = type(uint8).max;
+
     address public LENDING_POOL;
     address public ADDRESS_PROVIDER;
 
@@ -83,54 +87,23 @@ abstract contract NotionalV2FlashLiquidator is NotionalV2BaseLiquidator, IFlashL
     ) external override returns (bool) {
         // NOTE: no check on initiator because all profits will be distributed back to the owner
         require(msg.sender == LENDING_POOL); // dev: unauthorized caller
-        LiquidationAction action = LiquidationAction(abi.decode(params, (uint8)));
+        uint8 actionType = abi.decode(params, (uint8));
+        if (actionType == BUNDLE_ACTION) {
+            _executeBundle(assets, amounts, amounts[0].add(premiums[0]), params);
+            return true;
+        }
+
+        LiquidationAction action = LiquidationAction(actionType);
 
         // Mint cTokens for incoming assets, if required. If there are transfer fees
         // the we deposit underlying instead inside each _liquidate call instead
         if (!_hasTransferFees(action)) _mintCTokens(assets, amounts);
 
-        if (
-            action == LiquidationAction.LocalCurrency_WithTransferFee_Withdraw ||
-            action == LiquidationAction.LocalCurrency_WithTransferFee_NoWithdraw ||
-            action == LiquidationAction.LocalCurrency_NoTransferFee_Withdraw ||
-            action == LiquidationAction.LocalCurrency_NoTransferFee_NoWithdraw
-        ) {
-            _liquidateLocal(action, params, assets);
-        } else if (
-            action == LiquidationAction.CollateralCurrency_WithTransferFee_Withdraw ||
-            action == LiquidationAction.CollateralCurrency_WithTransferFee_NoWithdraw ||
-            action == LiquidationAction.CollateralCurrency_NoTransferFee_Withdraw ||
-            action == LiquidationAction.CollateralCurrency_NoTransferFee_NoWithdraw
-        ) {
-            _liquidateCollateral(action, params, assets);
-        } else if (
-            action == LiquidationAction.LocalfCash_WithTransferFee_Withdraw ||
-            action == LiquidationAction.LocalfCash_WithTransferFee_NoWithdraw ||
-            action == LiquidationAction.LocalfCash_NoTransferFee_Withdraw ||
-            action == LiquidationAction.LocalfCash_NoTransferFee_NoWithdraw
-        ) {
-            _liquidateLocalfCash(action, params, assets);
-        } else if (
-            action == LiquidationAction.CrossCurrencyfCash_WithTransferFee_Withdraw ||
-            action == LiquidationAction.CrossCurrencyfCash_WithTransferFee_NoWithdraw ||
-            action == LiquidationAction.CrossCurrencyfCash_NoTransferFee_Withdraw ||
-            action == LiquidationAction.CrossCurrencyfCash_NoTransferFee_NoWithdraw
-        ) {
-            _liquidateCrossCurrencyfCash(action, params, assets);
-        }
+        _liquidate(action, params, assets);
 
         _redeemCTokens(assets);
 
-        if (
-            action == LiquidationAction.CollateralCurrency_WithTransferFee_Withdraw ||
-            action == LiquidationAction.CollateralCurrency_WithTransferFee_NoWithdraw ||
-            action == LiquidationAction.CollateralCurrency_NoTransferFee_Withdraw ||
-            action == LiquidationAction.CollateralCurrency_NoTransferFee_NoWithdraw ||
-            action == LiquidationAction.CrossCurrencyfCash_WithTransferFee_Withdraw ||
-            action == LiquidationAction.CrossCurrencyfCash_WithTransferFee_NoWithdraw ||
-            action == LiquidationAction.CrossCurrencyfCash_NoTransferFee_Withdraw ||
-            action == LiquidationAction.CrossCurrencyfCash_NoTransferFee_NoWithdraw
-        ) {
+        if (_requiresDexTrade(action)) {
             _executeDexTrade(
                 action,
                 assets[0],
@@ -139,42 +112,90 @@ abstract contract NotionalV2FlashLiquidator is NotionalV2BaseLiquidator, IFlashL
             );
         }
 
-        if (
-            action == LiquidationAction.LocalCurrency_WithTransferFee_Withdraw ||
-            action == LiquidationAction.LocalCurrency_NoTransferFee_Withdraw ||
-            action == LiquidationAction.CollateralCurrency_WithTransferFee_Withdraw ||
-            action == LiquidationAction.CollateralCurrency_NoTransferFee_Withdraw ||
-            action == LiquidationAction.LocalfCash_WithTransferFee_Withdraw ||
-            action == LiquidationAction.LocalfCash_NoTransferFee_Withdraw ||
-            action == LiquidationAction.CrossCurrencyfCash_WithTransferFee_Withdraw ||
-            action == LiquidationAction.CrossCurrencyfCash_NoTransferFee_Withdraw
-        ) {
-            // Transfer profits to OWNER
-            uint256 bal = IERC20(assets[0]).balanceOf(address(this));
-            if (bal > amounts[0].add(premiums[0])) {
-                IERC20(assets[0]).transfer(OWNER, bal.sub(amounts[0].add(premiums[0])));
-            }
-        }
+        if (_shouldWithdraw(action)) _withdrawProfits(assets[0], amounts[0].add(premiums[0]));
 
         // The lending pool should have enough approval to pull the required amount from the contract
         return true;
     }
 
+    /// @notice Liquidates multiple accounts (or currencies) under a single flash loan. Bundle params are
+    /// encoded as abi.encode(uint8 BUNDLE_ACTION, bool withdrawProfits, bytes[] actionParams) where each
+    /// element of actionParams is encoded exactly as the params of a single liquidation action.
+    /// @dev Actions with transfer fees are not supported in a bundle, those deposit the entire underlying
+    /// balance on each liquidation and cannot share a flash loan.
+    function _executeBundle(
+        address[] calldata assets,
+        uint256[] calldata amounts,
+        uint256 repayAmount,
+        bytes calldata params
+    ) internal {
+        // prettier-ignore
+        (
+            /* uint8 action */,
+            bool withdrawProfits,
+            bytes[] memory actionParams
+        ) = abi.decode(params, (uint8, bool, bytes[]));
+
+        LiquidationAction[] memory actions = new LiquidationAction[](actionParams.length);
+        for (uint256 i; i < actionParams.length; i++) {
+            actions[i] = LiquidationAction(abi.decode(actionParams[i], (uint8)));
+            require(!_hasTransferFees(actions[i]), "Bundle transfer fee");
+        }
+
+        // All cTokens are minted up front, each liquidation withdraws its remaining cash balance back
+        // to this contract so the next liquidation in the bundle can use it.
+        _mintCTokens(assets, amounts);
+        for (uint256 i; i < actions.length; i++) {
+            _liquidate(actions[i], actionParams[i], assets);
+        }
+        _redeemCTokens(assets);
+
+        // Slippage on individual trades is not checked, the repayment amount is checked once
+        // after all collateral has been traded.
+        for (uint256 i; i < actions.length; i++) {
+            if (_requiresDexTrade(actions[i])) _executeDexTrade(actions[i], assets[0], 0, actionParams[i]);
+        }
+
+        require(IERC20(assets[0]).balanceOf(address(this)) >= repayAmount, "Insufficient repayment");
+        if (withdrawProfits) _withdrawProfits(assets[0], repayAmount);
+    }
+
+    function _liquidate(
+        LiquidationAction action,
+        bytes memory params,
+        address[] memory assets
+    ) internal {
+        uint8 kind = _liquidationKind(action);
+
+        if (kind == LOCAL_CURRENCY) {
+            _liquidateLocal(action, params, assets);
+        } else if (kind == COLLATERAL_CURRENCY) {
+            _liquidateCollateral(action, params, assets);
+        } else if (kind == LOCAL_FCASH) {
+            _liquidateLocalfCash(action, params, assets);
+        } else {
+            _liquidateCrossCurrencyfCash(action, params, assets);
+        }
+    }
+
+    function _withdrawProfits(address asset, uint256 repayAmount) internal {
+        // Transfer profits to OWNER
+        uint256 bal = IERC20(asset).balanceOf(address(this));
+        if (bal > repayAmount) {
+            IERC20(asset).transfer(OWNER, bal.sub(repayAmount));
+        }
+    }
+
     function _executeDexTrade(
         LiquidationAction action,
         address to,
         uint256 amountOutMin,
-        bytes calldata params
+        bytes memory params
     ) internal {
         address collateralUnderlyingAddress;
         bytes memory tradeCallData;
 
-        if (
-            action == LiquidationAction.CollateralCurrency_WithTransferFee_Withdraw ||
-            action == LiquidationAction.CollateralCurrency_WithTransferFee_NoWithdraw ||
-            action == LiquidationAction.CollateralCurrency_NoTransferFee_Withdraw ||
-            action == LiquidationAction.CollateralCurrency_NoTransferFee_NoWithdraw
-        ) {
+        if (_liquidationKind(action) == COLLATERAL_CURRENCY) {
             // prettier-ignore
             (
                 /* uint8 action */,
@@ -204,10 +225,14 @@ abstract contract NotionalV2FlashLiquidator is NotionalV2BaseLiquidator, IFlashL
             ) = abi.decode(params, (uint8, address, uint256, address, uint256, address, address, uint256[], uint256[], bytes));
         }
 
+        uint256 amountIn = IERC20(collateralUnderlyingAddress).balanceOf(address(this));
+        // Inside a bundle, an earlier trade may have already sold the entire collateral balance
+        if (amountIn == 0) return;
+
         executeDexTrade(
             collateralUnderlyingAddress,
             to,
-            IERC20(collateralUnderlyingAddress).balanceOf(address(this)),
+            amountIn,
             amountOutMin,
             tradeCallData
         );
@@ -30,6 +30,18 @@ contract WrappedfCash is IWrappedfCash, ERC777Upgradeable, AllowfCashReceiver, R
     /// @dev Storage slot for fCash id. Read only and set on initialization
     uint256 private _fCashId;
 
+    /// @dev Token metadata copied from NotionalV2.getCurrency so that mint and redeem do not
+    /// make an external call for it. Each token fits in a single storage slot.
+    struct CachedToken {
+        address tokenAddress;
+        uint64 precision;
+        TokenType tokenType;
+    }
+
+    /// @dev Set on initialization and by refreshTokenCache
+    CachedToken private _assetToken;
+    CachedToken private _underlyingToken;
+
     /// @notice Constructor is called only on deployment to set the Notional address, rest of state
     /// is initialized on the proxy.
     /// @dev Ensure initializer modifier is on the constructor to prevent an attack on UUPSUpgradeable contracts
@@ -49,12 +61,12 @@ contract WrappedfCash is IWrappedfCash, ERC777Upgradeable, AllowfCashReceiver, R
         require(DateTime.isValidMaturity(cashGroup.maxMarketIndex, maturity, block.timestamp), "Invalid maturity");
 
         _fCashId = EncodeDecode.encodeERC1155Id(currencyId, maturity, Constants.FCASH_ASSET_TYPE);
-        (IERC20 underlyingToken, /* */) = _getUnderlyingToken(currencyId);
-        (IERC20 assetToken, /* */, /* */) = getAssetToken();
+        // Caches token metadata and sets approvals for Notional
+        address underlyingToken = _refreshTokenCache();
 
-        string memory _symbol = address(underlyingToken) == ETH_ADDRESS ? 
+        string memory _symbol = underlyingToken == ETH_ADDRESS ? 
             "ETH" :
-            IERC20Metadata(address(underlyingToken)).symbol();
+            IERC20Metadata(underlyingToken).symbol();
 
         string memory _maturity = Strings.toString(maturity);
 
@@ -66,12 +78,35 @@ contract WrappedfCash is IWrappedfCash, ERC777Upgradeable, AllowfCashReceiver, R
             // no default operators
             new address[](0)
         );
+    }
 
-        // Set approvals for Notional. It is possible for an asset token address to equal the underlying
-        // token address when there is no money market involved.
-        assetToken.safeApprove(address(NotionalV2), type(uint256).max);
-        if (address(assetToken) != address(underlyingToken) && address(underlyingToken) != ETH_ADDRESS) {
-            underlyingToken.safeApprove(address(NotionalV2), type(uint256).max);
+    /// @notice Re-reads token metadata from Notional. Anyone may call this after governance lists
+    /// a different token for the currency, the cache only ever mirrors Notional's own state.
+    function refreshTokenCache() external override nonReentrant {
+        _refreshTokenCache();
+    }
+
+    /// @dev Writes the token cache and approves Notional to pull any token it has not been
+    /// approved for yet, returns the underlying token address
+    function _refreshTokenCache() private returns (address) {
+        (CachedToken memory asset, CachedToken memory underlying) = _readTokens();
+        _assetToken = asset;
+        _underlyingToken = underlying;
+
+        // It is possible for an asset token address to equal the underlying token address when
+        // there is no money market involved.
+        _approveNotional(asset.tokenAddress);
+        if (underlying.tokenAddress != asset.tokenAddress && underlying.tokenAddress != ETH_ADDRESS) {
+            _approveNotional(underlying.tokenAddress);
+        }
+
+        return underlying.tokenAddress;
+    }
+
+    /// @dev Skips tokens that are already approved, safeApprove reverts on a non zero allowance
+    function _approveNotional(address token) private {
+        if (IERC20(token).allowance(address(this), address(NotionalV2)) == 0) {
+            IERC20(token).safeApprove(address(NotionalV2), type(uint256).max);
         }
     }
 
@@ -203,6 +238,60 @@ contract WrappedfCash is IWrappedfCash, ERC777Upgradeable, AllowfCashReceiver, R
         }));
     }
 
+    /// @notice Redeems the entire balance of each holder after maturity and sends each holder
+    /// their share of the withdrawn tokens. The account is settled and cash is withdrawn from
+    /// Notional once for the whole batch. The caller must be an operator for every holder.
+    /// @param holders accounts to redeem, zero balances are skipped
+    /// @param toUnderlying set to true to withdraw the underlying token
+    /// @return tokensTransferred total tokens sent to holders
+    function batchRedeemMatured(
+        address[] calldata holders,
+        bool toUnderlying
+    ) external override nonReentrant returns (uint256 tokensTransferred) {
+        require(hasMatured(), "fCash not matured");
+        // This is a noop if the account is already settled
+        NotionalV2.settleAccount(address(this));
+        uint16 currencyId = getCurrencyId();
+
+        (int256 cashBalance, /* */, /* */) = NotionalV2.getAccountBalance(currencyId, address(this));
+        require(0 < cashBalance, "Negative Cash Balance");
+
+        // Claims are calculated against the supply before any tokens in the batch are burned,
+        // the same as individual redemptions.
+        uint256 initialTotalSupply = totalSupply();
+        uint256[] memory claims = new uint256[](holders.length);
+        uint256 totalClaim;
+        for (uint256 i; i < holders.length; i++) {
+            require(isOperatorFor(msg.sender, holders[i]), "Not operator");
+            uint256 amount = balanceOf(holders[i]);
+            if (amount == 0) continue;
+
+            // This always rounds down in favor of the wrapped fCash contract.
+            claims[i] = (uint256(cashBalance) * amount) / initialTotalSupply;
+            totalClaim += claims[i];
+            super._burn(holders[i], amount, "", "");
+        }
+        if (totalClaim == 0) return 0;
+        require(totalClaim <= uint256(type(uint88).max));
+
+        (IERC20 token, bool isETH) = _getToken(toUnderlying);
+        uint256 balanceBefore = isETH ? address(this).balance : token.balanceOf(address(this));
+        NotionalV2.withdraw(currencyId, uint88(totalClaim), toUnderlying);
+        uint256 balanceAfter = isETH ?  address(this).balance : token.balanceOf(address(this));
+        tokensTransferred = balanceAfter - balanceBefore;
+
+        // Withdrawn tokens are split by cash claim, rounding dust is sent to the last holder
+        uint256 remaining = tokensTransferred;
+        uint256 lastHolder = holders.length;
+        while (claims[lastHolder - 1] == 0) lastHolder--;
+        for (uint256 i; i < lastHolder; i++) {
+            if (claims[i] == 0) continue;
+            uint256 share = i == lastHolder - 1 ? remaining : (tokensTransferred * claims[i]) / totalClaim;
+            remaining -= share;
+            _sendTokensToReceiver(token, holders[i], isETH, share);
+        }
+    }
+
     /// @notice Called before tokens are burned (redemption) and so we will handle
     /// the fCash properly before and after maturity.
     function _burn(
@@ -312,15 +401,39 @@ contract WrappedfCash is IWrappedfCash, ERC777Upgradeable, AllowfCashReceiver, R
         }
     }
 
-    function _getToken(bool useUnderlying) internal returns (IERC20 token, bool isETH) {
-        if (useUnderlying) {
-            (token, /* */) = getUnderlyingToken();
-        } else {
-            (token, /* */, /* */) = getAssetToken();
-        }
+    function _getToken(bool useUnderlying) internal view returns (IERC20 token, bool isETH) {
+        token = IERC20(_getCachedToken(useUnderlying).tokenAddress);
         isETH = address(token) == ETH_ADDRESS;
     }
 
+    /// @dev Reads a single cached token slot. Wrappers initialized before the cache existed have
+    /// a zero precision and read from Notional until refreshTokenCache is called.
+    function _getCachedToken(bool useUnderlying) private view returns (CachedToken memory token) {
+        token = useUnderlying ? _underlyingToken : _assetToken;
+        if (token.precision == 0) {
+            (CachedToken memory asset, CachedToken memory underlying) = _readTokens();
+            token = useUnderlying ? underlying : asset;
+        }
+    }
+
+    function _readTokens() private view returns (CachedToken memory asset, CachedToken memory underlying) {
+        (Token memory assetToken, Token memory underlyingToken) = NotionalV2.getCurrency(getCurrencyId());
+        // In this case the asset token is the underlying
+        if (assetToken.tokenType == TokenType.NonMintable) underlyingToken = assetToken;
+
+        asset = _toCachedToken(assetToken);
+        underlying = _toCachedToken(underlyingToken);
+    }
+
+    function _toCachedToken(Token memory token) private pure returns (CachedToken memory) {
+        require(0 < token.decimals && token.decimals <= int256(uint256(type(uint64).max)));
+        return CachedToken({
+            tokenAddress: token.tokenAddress,
+            precision: uint64(uint256(token.decimals)),
+            tokenType: token.tokenType
+        });
+    }
+
     /***** View Methods  *****/
 
     /// @notice Returns the underlying fCash ID of the token
@@ -376,26 +489,8 @@ contract WrappedfCash is IWrappedfCash, ERC777Upgradeable, AllowfCashReceiver, R
         override 
         returns (IERC20 underlyingToken, int256 underlyingPrecision)
     {
-        uint16 currencyId = getCurrencyId();
-        return _getUnderlyingToken(currencyId);
-    }
-
-    /// @dev Called during initialization to set token name and symbol
-    function _getUnderlyingToken(uint16 currencyId)
-        private
-        view
-        returns (IERC20 underlyingToken, int256 underlyingPrecision)
-    {
-        (Token memory asset, Token memory underlying) = NotionalV2.getCurrency(
-            currencyId
-        );
-
-        if (asset.tokenType == TokenType.NonMintable) {
-            // In this case the asset token is the underlying
-            return (IERC20(asset.tokenAddress), asset.decimals);
-        } else {
-            return (IERC20(underlying.tokenAddress), underlying.decimals);
-        }
+        CachedToken memory underlying = _getCachedToken(true);
+        return (IERC20(underlying.tokenAddress), int256(uint256(underlying.precision)));
     }
 
     /// @notice Returns the asset token which the fCash settles to. This will be an interest
@@ -406,11 +501,8 @@ contract WrappedfCash is IWrappedfCash, ERC777Upgradeable, AllowfCashReceiver, R
         override 
         returns (IERC20 underlyingToken, int256 underlyingPrecision, TokenType tokenType)
     {
-        (Token memory asset, /* Token memory underlying */) = NotionalV2.getCurrency(
-            getCurrencyId()
-        );
-
-        return (IERC20(asset.tokenAddress), asset.decimals, asset.tokenType);
+        CachedToken memory asset = _getCachedToken(false);
+        return (IERC20(asset.tokenAddress), int256(uint256(asset.precision)), asset.tokenType);
     }
 
 }
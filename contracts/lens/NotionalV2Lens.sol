@@ -0,0 +1,162 @@
+// SPDX-License-Identifier: GPL-3.0-only
+pragma solidity 0.8.11;
+pragma abicoder v2;
+
+import "../lib/Constants.sol";
+import "../lib/DateTime.sol";
+import "../lib/EncodeDecode.sol";
+import "interfaces/notional/NotionalProxy.sol";
+import "interfaces/notional/IWrappedfCash.sol";
+import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
+
+/// @notice Read only aggregation of wrapper and account state. Results are ABI packed fixed width
+/// records, decoded by scripts/lens.py, so that one eth_call covers many wrappers or accounts.
+contract NotionalV2Lens {
+    NotionalProxy public immutable NotionalV2;
+
+    constructor(NotionalProxy notionalV2_) {
+        NotionalV2 = notionalV2_;
+    }
+
+    /// @notice Returns one 118 byte record per wrapper:
+    /// (address wrapper, uint16 currencyId, uint40 maturity, bool hasMatured, uint8 marketIndex,
+    ///  address underlyingToken, uint64 underlyingPrecision, address assetToken, uint64 assetPrecision,
+    ///  uint8 tokenType, uint128 totalSupply, int128 fCashNotional)
+    function getWrappers(IWrappedfCash[] calldata wrappers) external view returns (bytes memory) {
+        bytes[] memory records = new bytes[](wrappers.length);
+        for (uint256 i; i < wrappers.length; i++) {
+            records[i] = _getWrapper(address(wrappers[i]));
+        }
+        return _concat(records);
+    }
+
+    function _getWrapper(address wrapper) private view returns (bytes memory) {
+        (uint16 currencyId, uint40 maturity, /* */) = EncodeDecode.decodeERC1155Id(
+            IWrappedfCash(wrapper).getfCashId()
+        );
+        // Same logic as WrappedfCash.getUnderlyingToken and getAssetToken with a single getCurrency call
+        (Token memory asset, Token memory underlying) = NotionalV2.getCurrency(currencyId);
+        if (asset.tokenType == TokenType.NonMintable) underlying = asset;
+
+        return abi.encodePacked(
+            _getWrapperHeader(wrapper, currencyId, maturity),
+            underlying.tokenAddress,
+            uint64(uint256(underlying.decimals)),
+            asset.tokenAddress,
+            uint64(uint256(asset.decimals)),
+            uint8(asset.tokenType),
+            uint128(IERC20(wrapper).totalSupply()),
+            int128(NotionalV2.getfCashNotional(wrapper, currencyId, maturity))
+        );
+    }
+
+    function _getWrapperHeader(
+        address wrapper,
+        uint16 currencyId,
+        uint40 maturity
+    ) private view returns (bytes memory) {
+        bool hasMatured = maturity <= block.timestamp;
+        uint8 marketIndex;
+        if (!hasMatured) {
+            // Mirrors WrappedfCash.getMarketIndex, zero means idiosyncratic
+            (uint256 index, bool isIdiosyncratic) = DateTime.getMarketIndex(
+                Constants.MAX_TRADED_MARKET_INDEX,
+                maturity,
+                block.timestamp
+            );
+            if (!isIdiosyncratic) marketIndex = uint8(index);
+        }
+
+        return abi.encodePacked(wrapper, currencyId, maturity, hasMatured, marketIndex);
+    }
+
+    /// @notice Returns one variable length record per account:
+    /// (address account, uint40 nextSettleTime, bytes1 hasDebt, uint8 assetArrayLength,
+    ///  uint16 bitmapCurrencyId, bytes18 activeCurrencies, uint8 numBalances, uint8 numAssets)
+    /// followed by numBalances (uint16 currencyId, int128 cashBalance, int128 nTokenBalance,
+    /// uint40 lastClaimTime, uint128 lastClaimIntegralSupply) and numAssets (uint16 currencyId,
+    /// uint40 maturity, uint8 assetType, int128 notional)
+    function getAccounts(address[] calldata accounts) external view returns (bytes memory) {
+        bytes[] memory records = new bytes[](accounts.length);
+        for (uint256 i; i < accounts.length; i++) {
+            records[i] = _getAccount(accounts[i]);
+        }
+        return _concat(records);
+    }
+
+    function _getAccount(address account) private view returns (bytes memory) {
+        (
+            AccountContext memory context,
+            AccountBalance[] memory balances,
+            PortfolioAsset[] memory portfolio
+        ) = NotionalV2.getAccount(account);
+
+        // Notional returns a fixed size balance array, empty entries have a zero currency id
+        uint256 numBalances;
+        for (uint256 i; i < balances.length; i++) {
+            if (balances[i].currencyId != 0) numBalances++;
+        }
+
+        // Header, then one part per balance and per asset
+        bytes[] memory parts = new bytes[](1 + numBalances + portfolio.length);
+        parts[0] = abi.encodePacked(
+            account,
+            context.nextSettleTime,
+            context.hasDebt,
+            context.assetArrayLength,
+            context.bitmapCurrencyId,
+            context.activeCurrencies,
+            uint8(numBalances),
+            uint8(portfolio.length)
+        );
+
+        uint256 p = 1;
+        for (uint256 i; i < balances.length; i++) {
+            if (balances[i].currencyId == 0) continue;
+            parts[p++] = abi.encodePacked(
+                uint16(balances[i].currencyId),
+                int128(balances[i].cashBalance),
+                int128(balances[i].nTokenBalance),
+                uint40(balances[i].lastClaimTime),
+                uint128(balances[i].lastClaimIntegralSupply)
+            );
+        }
+
+        for (uint256 i; i < portfolio.length; i++) {
+            parts[p++] = abi.encodePacked(
+                uint16(portfolio[i].currencyId),
+                uint40(portfolio[i].maturity),
+                uint8(portfolio[i].assetType),
+                int128(portfolio[i].notional)
+            );
+        }
+
+        return _concat(parts);
+    }
+
+    /// @dev Copies parts into a single allocation. Appending with bytes.concat copies everything
+    /// written so far on each call, so memory and gas grow quadratically with the number of records.
+    function _concat(bytes[] memory parts) private pure returns (bytes memory result) {
+        uint256 length;
+        for (uint256 i; i < parts.length; i++) length += parts[i].length;
+        result = new bytes(length);
+
+        uint256 dst;
+        assembly {
+            dst := add(result, 32)
+        }
+        for (uint256 i; i < parts.length; i++) {
+            bytes memory part = parts[i];
+            assembly {
+                // Whole words are copied, any bytes written past the end of a part are overwritten by
+                // the next part or lie past the end of the result
+                let src := add(part, 32)
+                let end := add(src, mload(part))
+                for { let d := dst } lt(src, end) { src := add(src, 32) d := add(d, 32) } {
+                    mstore(d, mload(src))
+                }
+            }
+            dst += part.length;
+        }
+    }
+}
@@ -110,11 +110,11 @@ library EncodeDecode {
         return
             bytes32(
                 uint256(
-                    (uint8(TradeActionType.AddLiquidity) << 248) |
-                        (marketIndex << 240) |
-                        (assetCashAmount << 152) |
-                        (minImpliedRate << 120) |
-                        (maxImpliedRate << 88)
+                    (uint256(uint8(TradeActionType.AddLiquidity)) << 248) |
+                        (uint256(marketIndex) << 240) |
+                        (uint256(assetCashAmount) << 152) |
+                        (uint256(minImpliedRate) << 120) |
+                        (uint256(maxImpliedRate) << 88)
                 )
             );
     }
@@ -128,11 +128,11 @@ library EncodeDecode {
         return
             bytes32(
                 uint256(
-                    (uint8(TradeActionType.RemoveLiquidity) << 248) |
-                        (marketIndex << 240) |
-                        (tokenAmount << 152) |
-                        (minImpliedRate << 120) |
-                        (maxImpliedRate << 88)
+                    (uint256(uint8(TradeActionType.RemoveLiquidity)) << 248) |
+                        (uint256(marketIndex) << 240) |
+                        (uint256(tokenAmount) << 152) |
+                        (uint256(minImpliedRate) << 120) |
+                        (uint256(maxImpliedRate) << 88)
                 )
             );
     }
@@ -144,9 +144,9 @@ library EncodeDecode {
         return
             bytes32(
                 uint256(
-                    (uint8(TradeActionType.PurchaseNTokenResidual) << 248) |
-                        (maturity << 216) |
-                        (uint256(int256(fCashResidualAmount)) << 128)
+                    (uint256(uint8(TradeActionType.PurchaseNTokenResidual)) << 248) |
+                        (uint256(maturity) << 216) |
+                        (uint256(uint88(fCashResidualAmount)) << 128)
                 )
             );
     }
@@ -158,9 +158,9 @@ library EncodeDecode {
         return
             bytes32(
                 uint256(
-                    (uint8(TradeActionType.SettleCashDebt) << 248) |
-                        (uint256(bytes32(bytes20(counterparty))) << 88) |
-                        (uint256(int256(fCashAmountToSettle)))
+                    (uint256(uint8(TradeActionType.SettleCashDebt)) << 248) |
+                        (uint256(uint160(counterparty)) << 88) |
+                        (uint256(uint88(fCashAmountToSettle)))
                 )
             );
     }
@@ -177,7 +177,7 @@ library EncodeDecode {
             blockTime
         );
         // Cannot trade out of an idiosyncratic asset
-        if (isIdiosyncratic) (bytes32(0), false);
+        if (isIdiosyncratic) return (bytes32(0), false);
 
         require(type(int88).min < notional && notional < type(int88).max);
         if (notional > 0) {
@@ -191,7 +191,7 @@ library EncodeDecode {
         PortfolioAsset[] memory portfolio,
         uint256 fCashCurrency,
         uint256 blockTime
-    ) private returns (bytes32[] memory) {
+    ) internal pure returns (bytes32[] memory) {
         uint256 numTrades;
 
         bytes32[] memory trades = new bytes32[](portfolio.length);
@@ -233,7 +233,7 @@ library EncodeDecode {
         }
 
         // Resize the trades array down to numTrades length
-        assembly { mstore(trades, sub(mload(trades), numTrades)) }
+        assembly { mstore(trades, numTrades) }
         return trades;
     }
 
@@ -260,7 +260,7 @@ library EncodeDecode {
         }
 
         // Resize the trades array down to numTrades length
-        assembly { mstore(trades, sub(mload(trades), numTrades)) }
+        assembly { mstore(trades, numTrades) }
         return trades;
     }
 }
\ No newline at end of file
@@ -8,6 +8,11 @@ import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
 
 contract NotionalV2UniV3FlashLiquidator is NotionalV2FlashLiquidator {
     ISwapRouter public immutable UniV3SwapRouter;
+    /// @dev Length of abi.encode(uint24 fee, uint256 deadline, uint160 priceLimit)
+    uint256 internal constant SINGLE_HOP_PARAMS_LENGTH = 96;
+    /// @dev A packed path is a token followed by (uint24 fee, address token) for each hop
+    uint256 internal constant PATH_ADDRESS_LENGTH = 20;
+    uint256 internal constant PATH_HOP_LENGTH = 23;
 
     constructor(
         address lendingPool_,
@@ -18,6 +23,10 @@ contract NotionalV2UniV3FlashLiquidator is NotionalV2FlashLiquidator {
         UniV3SwapRouter = exchange_;
     }
 
+    /// @notice Single hop trades are encoded as abi.encode(uint24 fee, uint256 deadline, uint160 priceLimit).
+    /// Multi hop trades append the packed Uniswap V3 path from `from` to `to`:
+    /// abi.encode(uint24 fee, uint256 deadline, uint160 priceLimit, bytes path), fee and priceLimit are
+    /// ignored for multi hop trades. The path must start at `from` and end at `to`.
     function executeDexTrade(
         address from,
         address to,
@@ -29,6 +38,22 @@ contract NotionalV2UniV3FlashLiquidator is NotionalV2FlashLiquidator {
         uint256 deadline;
         uint160 priceLimit;
 
+        if (params.length > SINGLE_HOP_PARAMS_LENGTH) {
+            bytes memory path;
+            // prettier-ignore
+            (
+                /* uint24 fee */,
+                deadline,
+                /* uint160 priceLimit */,
+                path
+            ) = abi.decode(params, (uint24, uint256, uint160, bytes));
+            _checkPath(path, from, to);
+
+            return UniV3SwapRouter.exactInput(
+                ISwapRouter.ExactInputParams(path, address(this), deadline, amountIn, amountOutMin)
+            );
+        }
+
         // prettier-ignore
         (
             fee,
@@ -49,4 +74,27 @@ contract NotionalV2UniV3FlashLiquidator is NotionalV2FlashLiquidator {
 
        return UniV3SwapRouter.exactInputSingle(swapParams);
     }
+
+    /// @dev Reverts unless the packed path is well formed, starts at `from` and ends at `to`, otherwise
+    /// the trade could sell a token other than the collateral or buy one that does not repay the flash loan.
+    function _checkPath(
+        bytes memory path,
+        address from,
+        address to
+    ) internal pure {
+        require(
+            path.length >= PATH_ADDRESS_LENGTH + PATH_HOP_LENGTH &&
+                (path.length - PATH_ADDRESS_LENGTH) % PATH_HOP_LENGTH == 0,
+            "Invalid path"
+        );
+
+        address first;
+        address last;
+        assembly {
+            let start := add(path, 32)
+            first := shr(96, mload(start))
+            last := shr(96, mload(add(start, sub(mload(path), PATH_ADDRESS_LENGTH))))
+        }
+        require(first == from && last == to, "Invalid path");
+    }
 }
@@ -14,6 +14,8 @@ contract CompoundToNotionalV2 is NotionalCallback {
     NotionalProxy public immutable NotionalV2;
     address public immutable owner;
     address public immutable cETH;
+    /// @notice Asset token lookups cached by enableTokens, saves a getCurrency call per collateral
+    mapping(uint16 => address) public assetTokens;
 
     constructor(NotionalProxy notionalV2_, address owner_, address cETH_) {
         NotionalV2 = notionalV2_;
@@ -30,6 +32,11 @@ contract CompoundToNotionalV2 is NotionalCallback {
             // Approve Notional to transfer cTokens from this adapter as collateral
             require(cToken.approve(address(NotionalV2), type(uint256).max));
 
+            // cTokens that are not listed on Notional can still be repaid but not deposited
+            try NotionalV2.getCurrencyId(address(cToken)) returns (uint16 currencyId) {
+                if (currencyId != 0) assetTokens[currencyId] = address(cToken);
+            } catch {}
+
             if (address(cToken) != cETH) {
                 // NOTE: not all underlying tokens respond properly to approvals
                 // Approve the cToken to mint cTokens from this address for borrow repayment
@@ -46,6 +53,47 @@ contract CompoundToNotionalV2 is NotionalCallback {
         uint256[] memory notionalV2CollateralAmounts,
         BalanceActionWithTrades[] calldata borrowAction
     ) external {
+        address[] memory cTokenBorrows = new address[](1);
+        uint256[] memory cTokenRepayAmounts = new uint256[](1);
+        cTokenBorrows[0] = cTokenBorrow;
+        cTokenRepayAmounts[0] = cTokenRepayAmount;
+
+        _migrateBorrowsFromCompound(
+            cTokenBorrows,
+            cTokenRepayAmounts,
+            notionalV2CollateralIds,
+            notionalV2CollateralAmounts,
+            borrowAction
+        );
+    }
+
+    /// @notice Migrates multiple Compound borrows in a single Notional callback. Each repay amount of zero
+    /// repays the entire borrow balance. Borrow actions must be sorted by currency id, the same as any
+    /// other Notional batch action.
+    function migrateBorrowsFromCompound(
+        address[] memory cTokenBorrows,
+        uint256[] memory cTokenRepayAmounts,
+        uint16[] memory notionalV2CollateralIds,
+        uint256[] memory notionalV2CollateralAmounts,
+        BalanceActionWithTrades[] calldata borrowActions
+    ) external {
+        _migrateBorrowsFromCompound(
+            cTokenBorrows,
+            cTokenRepayAmounts,
+            notionalV2CollateralIds,
+            notionalV2CollateralAmounts,
+            borrowActions
+        );
+    }
+
+    function _migrateBorrowsFromCompound(
+        address[] memory cTokenBorrows,
+        uint256[] memory cTokenRepayAmounts,
+        uint16[] memory notionalV2CollateralIds,
+        uint256[] memory notionalV2CollateralAmounts,
+        BalanceActionWithTrades[] calldata borrowActions
+    ) internal {
+        require(cTokenBorrows.length == cTokenRepayAmounts.length);
         require(notionalV2CollateralIds.length == notionalV2CollateralAmounts.length);
         // borrow on notional via special flash loan facility
         //  - borrow repayment amount
@@ -57,22 +105,24 @@ contract CompoundToNotionalV2 is NotionalCallback {
         //   -> deposit cToken to notional (account needs to have set approvals)
         //   -> exit callback
         // inside original borrow, check FC
-        uint256 borrowBalance = ICToken(cTokenBorrow).borrowBalanceCurrent(msg.sender);
-        if (cTokenRepayAmount == 0) {
-            // Set the entire borrow balance if it is not set
-            cTokenRepayAmount = borrowBalance;
-        } else {
-            // Check that the cToken repayment amount is not more than required
-            require(cTokenRepayAmount <= borrowBalance, "Invalid repayment amount");
+        for (uint256 i; i < cTokenBorrows.length; i++) {
+            uint256 borrowBalance = ICToken(cTokenBorrows[i]).borrowBalanceCurrent(msg.sender);
+            if (cTokenRepayAmounts[i] == 0) {
+                // Set the entire borrow balance if it is not set
+                cTokenRepayAmounts[i] = borrowBalance;
+            } else {
+                // Check that the cToken repayment amount is not more than required
+                require(cTokenRepayAmounts[i] <= borrowBalance, "Invalid repayment amount");
+            }
         }
 
         bytes memory encodedData = abi.encode(
-            cTokenBorrow,
-            cTokenRepayAmount,
+            cTokenBorrows,
+            cTokenRepayAmounts,
             notionalV2CollateralIds,
             notionalV2CollateralAmounts
         );
-        NotionalV2.batchBalanceAndTradeActionWithCallback(msg.sender, borrowAction, encodedData);
+        NotionalV2.batchBalanceAndTradeActionWithCallback(msg.sender, borrowActions, encodedData);
     }
 
     function notionalCallback(
@@ -83,34 +133,57 @@ contract CompoundToNotionalV2 is NotionalCallback {
         require(msg.sender == address(NotionalV2) && sender == address(this), "Unauthorized callback");
 
         (
-            address cTokenBorrow,
-            uint256 cTokenRepayAmount,
+            address[] memory cTokenBorrows,
+            uint256[] memory cTokenRepayAmounts,
             uint16[] memory notionalV2CollateralIds,
             uint256[] memory notionalV2CollateralAmounts
-        ) = abi.decode(callbackData, (address, uint256, uint16[], uint256[]));
+        ) = abi.decode(callbackData, (address[], uint256[], uint16[], uint256[]));
 
-        // Transfer in the underlying amount that was borrowed
-        address underlyingToken = ICToken(cTokenBorrow).underlying();
-        bool success = IERC20(underlyingToken).transferFrom(account, address(this), cTokenRepayAmount);
-        require(success, "Transfer of repayment failed");
+        for (uint256 i; i < cTokenBorrows.length; i++) {
+            // Transfer in the underlying amount that was borrowed
+            address underlyingToken = ICToken(cTokenBorrows[i]).underlying();
+            bool success = IERC20(underlyingToken).transferFrom(account, address(this), cTokenRepayAmounts[i]);
+            require(success, "Transfer of repayment failed");
 
-        // Use the amount transferred to repay the borrow
-        uint code = ICErc20(cTokenBorrow).repayBorrowBehalf(account, cTokenRepayAmount);
-        require(code == 0, "Repay borrow behalf failed");
+            // Use the amount transferred to repay the borrow
+            uint code = ICErc20(cTokenBorrows[i]).repayBorrowBehalf(account, cTokenRepayAmounts[i]);
+            require(code == 0, "Repay borrow behalf failed");
+        }
 
         for (uint256 i; i < notionalV2CollateralIds.length; i++) {
-            (Token memory assetToken, /* */) = NotionalV2.getCurrency(notionalV2CollateralIds[i]);
+            uint16 currencyId = notionalV2CollateralIds[i];
+            uint256 amount = notionalV2CollateralAmounts[i];
+            // Already deposited together with an earlier entry for the same currency
+            if (amount == 0) continue;
+
+            // Combine repeated currency ids into a single transfer and deposit
+            for (uint256 j = i + 1; j < notionalV2CollateralIds.length; j++) {
+                if (notionalV2CollateralIds[j] == currencyId) {
+                    amount = amount + notionalV2CollateralAmounts[j];
+                    notionalV2CollateralAmounts[j] = 0;
+                }
+            }
+
+            address assetToken = _getAssetToken(currencyId);
             // Transfer the collateral to this contract so we can deposit it
-            success = ICToken(assetToken.tokenAddress).transferFrom(account, address(this), notionalV2CollateralAmounts[i]);
+            bool success = ICToken(assetToken).transferFrom(account, address(this), amount);
             require(success, "cToken transfer failed");
 
             // Deposit the cToken into the account's portfolio, no free collateral check is triggered here
-            NotionalV2.depositAssetToken(account, notionalV2CollateralIds[i], notionalV2CollateralAmounts[i]);
+            NotionalV2.depositAssetToken(account, currencyId, amount);
         }
 
         // When this exits a free collateral check will be triggered
     }
 
+    function _getAssetToken(uint16 currencyId) internal view returns (address) {
+        address assetToken = assetTokens[currencyId];
+        if (assetToken != address(0)) return assetToken;
+
+        (Token memory token, /* */) = NotionalV2.getCurrency(currencyId);
+        return token.tokenAddress;
+    }
+
     receive() external payable {
         // This contract cannot migrate ETH loans because there is no way
         // to do transferFrom on ETH
@@ -95,6 +95,23 @@ contract NotionalV1ToNotionalV2 is NotionalCallback {
         require(WBTC.approve(address(NotionalV2), type(uint256).max));
     }
 
+    /// @notice Migrates all of an account's V1 debts and collateral in a single callback. Debts must be
+    /// V1 DAI or USDC, collateral is the account's entire V1 ETH and WBTC balance. Borrow actions must
+    /// borrow enough of each debt currency to repay v1RepayAmounts, sorted by V2 currency id.
+    function migrateAccount(
+        uint16[] calldata v1DebtCurrencyIds,
+        uint128[] calldata v1RepayAmounts,
+        BalanceActionWithTrades[] calldata borrowActions
+    ) external {
+        require(v1DebtCurrencyIds.length == v1RepayAmounts.length);
+        uint16[] memory v1CollateralIds = new uint16[](2);
+        v1CollateralIds[0] = V1_ETH;
+        v1CollateralIds[1] = V1_WBTC;
+
+        bytes memory encodedData = abi.encode(v1DebtCurrencyIds, v1RepayAmounts, v1CollateralIds);
+        NotionalV2.batchBalanceAndTradeActionWithCallback(msg.sender, borrowActions, encodedData);
+    }
+
     function migrateDaiEther(
         uint128 v1RepayAmount,
         BalanceActionWithTrades[] calldata borrowAction
@@ -108,34 +125,54 @@ contract NotionalV1ToNotionalV2 is NotionalCallback {
         //   -> deposit collateral to notional v2 (account needs to have set approvals)
         //   -> exit callback
         // inside original borrow, check FC
-        bytes memory encodedData = abi.encode(V1_DAI, v1RepayAmount, V1_ETH, V2_ETH);
-        NotionalV2.batchBalanceAndTradeActionWithCallback(msg.sender, borrowAction, encodedData);
+        _migratePair(V1_DAI, v1RepayAmount, V1_ETH, borrowAction);
     }
 
     function migrateUSDCEther(
         uint128 v1RepayAmount,
         BalanceActionWithTrades[] calldata borrowAction
     ) external {
-        bytes memory encodedData = abi.encode(V1_USDC, v1RepayAmount, V1_ETH, V2_ETH);
-        NotionalV2.batchBalanceAndTradeActionWithCallback(msg.sender, borrowAction, encodedData);
+        _migratePair(V1_USDC, v1RepayAmount, V1_ETH, borrowAction);
     }
 
     function migrateDaiWBTC(
         uint128 v1RepayAmount,
         BalanceActionWithTrades[] calldata borrowAction
     ) external {
-        bytes memory encodedData = abi.encode(V1_DAI, v1RepayAmount, V1_WBTC, V2_WBTC);
-        NotionalV2.batchBalanceAndTradeActionWithCallback(msg.sender, borrowAction, encodedData);
+        _migratePair(V1_DAI, v1RepayAmount, V1_WBTC, borrowAction);
     }
 
     function migrateUSDCWBTC(
         uint128 v1RepayAmount,
         BalanceActionWithTrades[] calldata borrowAction
     ) external {
-        bytes memory encodedData = abi.encode(V1_USDC, v1RepayAmount, V1_WBTC, V2_WBTC);
+        _migratePair(V1_USDC, v1RepayAmount, V1_WBTC, borrowAction);
+    }
+
+    function _migratePair(
+        uint16 v1DebtCurrencyId,
+        uint128 v1RepayAmount,
+        uint16 v1CollateralId,
+        BalanceActionWithTrades[] calldata borrowAction
+    ) internal {
+        uint16[] memory v1DebtCurrencyIds = new uint16[](1);
+        uint128[] memory v1RepayAmounts = new uint128[](1);
+        uint16[] memory v1CollateralIds = new uint16[](1);
+        v1DebtCurrencyIds[0] = v1DebtCurrencyId;
+        v1RepayAmounts[0] = v1RepayAmount;
+        v1CollateralIds[0] = v1CollateralId;
+
+        bytes memory encodedData = abi.encode(v1DebtCurrencyIds, v1RepayAmounts, v1CollateralIds);
         NotionalV2.batchBalanceAndTradeActionWithCallback(msg.sender, borrowAction, encodedData);
     }
 
+    /// @notice Maps V1 currency ids to V2 currency ids, only ETH and WBTC are valid as collateral
+    function _v2CollateralId(uint16 v1CurrencyId) internal view returns (uint16) {
+        if (v1CurrencyId == V1_ETH) return V2_ETH;
+        if (v1CurrencyId == V1_WBTC) return V2_WBTC;
+        revert("Invalid collateral");
+    }
+
     function notionalCallback(
         address sender,
         address account,
@@ -143,59 +180,95 @@ contract NotionalV1ToNotionalV2 is NotionalCallback {
     ) external override {
         require(msg.sender == address(NotionalV2) && sender == address(this), "Unauthorized callback");
         (
-            uint16 v1DebtCurrencyId,
-            uint128 v1RepayAmount,
-            uint16 v1CollateralId,
-            uint16 v2CollateralId
-        ) = abi.decode(callbackData, (uint16, uint128, uint16, uint16));
+            uint16[] memory v1DebtCurrencyIds,
+            uint128[] memory v1RepayAmounts,
+            uint16[] memory v1CollateralIds
+        ) = abi.decode(callbackData, (uint16[], uint128[], uint16[]));
+
+        uint256[] memory collateralBalances = _withdrawFromV1(
+            account,
+            v1DebtCurrencyIds,
+            v1RepayAmounts,
+            v1CollateralIds
+        );
+
+        for (uint256 i; i < v1CollateralIds.length; i++) {
+            if (collateralBalances[i] == 0) continue;
+            uint16 v2CollateralId = _v2CollateralId(v1CollateralIds[i]);
 
+            if (v2CollateralId == V2_ETH) {
+                // Notional V1 uses WETH, but V2 uses ETH
+                WETH.withdraw(collateralBalances[i]);
+                NotionalV2.depositUnderlyingToken{value: collateralBalances[i]}(
+                    account,
+                    v2CollateralId,
+                    collateralBalances[i]
+                );
+            } else {
+                NotionalV2.depositUnderlyingToken(account, v2CollateralId, collateralBalances[i]);
+            }
+        }
+
+        // When this exits it will do a free collateral check
+    }
+
+    /// @notice Repays all V1 debts and withdraws all V1 collateral to this contract in one batch operation,
+    /// returns the collateral balance withdrawn for each collateral id
+    function _withdrawFromV1(
+        address account,
+        uint16[] memory v1DebtCurrencyIds,
+        uint128[] memory v1RepayAmounts,
+        uint16[] memory v1CollateralIds
+    ) internal returns (uint256[] memory collateralBalances) {
         int256[] memory balances = Escrow.getBalances(account);
-        // Notional V1 returns an array of balances for all listed currencies. We do not allow
-        // collateral to be USDC or DAI during migration.
-        int256 collateralBalance =
-            (v1CollateralId == V1_ETH ? balances[V1_ETH] : balances[V1_WBTC]);
-        require(0 < collateralBalance && collateralBalance <= int256(uint256(type(uint128).max)));
+        collateralBalances = new uint256[](v1CollateralIds.length);
+        uint256 numWithdraws;
 
-        {
-            INotionalV1Erc1155.Deposit[] memory deposits = new INotionalV1Erc1155.Deposit[](1);
-            INotionalV1Erc1155.Trade[] memory trades = new INotionalV1Erc1155.Trade[](0);
-            INotionalV1Erc1155.Withdraw[] memory withdraws = new INotionalV1Erc1155.Withdraw[](1);
+        for (uint256 i; i < v1CollateralIds.length; i++) {
+            // Reverts if the collateral is not ETH or WBTC, we do not allow collateral to be USDC or DAI
+            // during migration.
+            _v2CollateralId(v1CollateralIds[i]);
+            int256 collateralBalance = balances[v1CollateralIds[i]];
+            require(collateralBalance <= int256(uint256(type(uint128).max)));
 
-            // This will deposit what was borrowed from the account's wallet
-            deposits[0] = INotionalV1Erc1155.Deposit(v1DebtCurrencyId, v1RepayAmount);
+            if (collateralBalance > 0) {
+                collateralBalances[i] = uint256(collateralBalance);
+                numWithdraws += 1;
+            }
+        }
+        require(numWithdraws > 0); // dev: no collateral
 
-            // This will withdraw to the current contract the collateral to repay the flash loan,
-            // overflow checked above
-            withdraws[0] = INotionalV1Erc1155.Withdraw(
-                address(this), // Will withdraw collateral to this contract, to be deposited below
-                v1CollateralId,
-                uint128(int128(collateralBalance))
-            );
+        INotionalV1Erc1155.Deposit[] memory deposits =
+            new INotionalV1Erc1155.Deposit[](v1DebtCurrencyIds.length);
+        INotionalV1Erc1155.Trade[] memory trades = new INotionalV1Erc1155.Trade[](0);
+        INotionalV1Erc1155.Withdraw[] memory withdraws = new INotionalV1Erc1155.Withdraw[](numWithdraws);
 
-            NotionalV1Erc1155.batchOperationWithdraw(
-                account,
-                uint32(block.timestamp),
-                deposits,
-                trades,
-                withdraws
-            );
+        for (uint256 i; i < v1DebtCurrencyIds.length; i++) {
+            require(v1DebtCurrencyIds[i] == V1_DAI || v1DebtCurrencyIds[i] == V1_USDC, "Invalid debt");
+            // This will deposit what was borrowed from the account's wallet
+            deposits[i] = INotionalV1Erc1155.Deposit(v1DebtCurrencyIds[i], v1RepayAmounts[i]);
         }
 
-        // Overflow checked above, cannot be negative
-        uint256 v2CollateralBalance = uint256(collateralBalance);
-        if (v2CollateralId == V2_ETH) {
-            // Notional V1 uses WETH, but V2 uses ETH
-            WETH.withdraw(v2CollateralBalance);
-            NotionalV2.depositUnderlyingToken{value: v2CollateralBalance}(
-                account,
-                v2CollateralId,
-                v2CollateralBalance
+        uint256 w;
+        for (uint256 i; i < v1CollateralIds.length; i++) {
+            if (collateralBalances[i] == 0) continue;
+            // This will withdraw to the current contract the collateral to repay the flash loan,
+            // overflow checked above
+            withdraws[w] = INotionalV1Erc1155.Withdraw(
+                address(this), // Will withdraw collateral to this contract, to be deposited
+                v1CollateralIds[i],
+                uint128(collateralBalances[i])
             );
-        } else {
-            NotionalV2.depositUnderlyingToken(account, v2CollateralId, v2CollateralBalance);
+            w += 1;
         }
 
-        // When this exits it will do a free collateral check
+        NotionalV1Erc1155.batchOperationWithdraw(
+            account,
+            uint32(block.timestamp),
+            deposits,
+            trades,
+            withdraws
+        );
     }
 
     receive() external payable {
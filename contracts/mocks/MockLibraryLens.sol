@@ -0,0 +1,149 @@
+// SPDX-License-Identifier: GPL-3.0-only
+pragma solidity ^0.8.0;
+pragma abicoder v2;
+
+import "../lib/EncodeDecode.sol";
+import "../lib/DateTime.sol";
+import "../lib/AssetRate.sol";
+
+/// @dev Evaluates library functions over arrays of inputs so that fuzz tests can compare
+/// many examples against the python reference models in a single call
+contract MockLibraryLens {
+    function encodeERC1155Ids(
+        uint256[] calldata currencyIds,
+        uint256[] calldata maturities,
+        uint256[] calldata assetTypes
+    ) external pure returns (uint256[] memory ids) {
+        ids = new uint256[](currencyIds.length);
+        for (uint256 i; i < ids.length; i++) {
+            ids[i] = EncodeDecode.encodeERC1155Id(currencyIds[i], maturities[i], assetTypes[i]);
+        }
+    }
+
+    function decodeERC1155Ids(uint256[] calldata ids)
+        external
+        pure
+        returns (
+            uint16[] memory currencyIds,
+            uint40[] memory maturities,
+            uint8[] memory assetTypes
+        )
+    {
+        currencyIds = new uint16[](ids.length);
+        maturities = new uint40[](ids.length);
+        assetTypes = new uint8[](ids.length);
+        for (uint256 i; i < ids.length; i++) {
+            (currencyIds[i], maturities[i], assetTypes[i]) = EncodeDecode.decodeERC1155Id(ids[i]);
+        }
+    }
+
+    function getMarketIndices(
+        uint256 maxMarketIndex,
+        uint256[] calldata maturities,
+        uint256 blockTime
+    ) external pure returns (uint256[] memory marketIndices, bool[] memory isIdiosyncratic) {
+        marketIndices = new uint256[](maturities.length);
+        isIdiosyncratic = new bool[](maturities.length);
+        for (uint256 i; i < maturities.length; i++) {
+            (marketIndices[i], isIdiosyncratic[i]) = DateTime.getMarketIndex(
+                maxMarketIndex,
+                maturities[i],
+                blockTime
+            );
+        }
+    }
+
+    function getBitNumsFromMaturities(uint256 blockTime, uint256[] calldata maturities)
+        external
+        pure
+        returns (uint256[] memory bitNums, bool[] memory isExact)
+    {
+        bitNums = new uint256[](maturities.length);
+        isExact = new bool[](maturities.length);
+        for (uint256 i; i < maturities.length; i++) {
+            (bitNums[i], isExact[i]) = DateTime.getBitNumFromMaturity(blockTime, maturities[i]);
+        }
+    }
+
+    function getMaturitiesFromBitNums(uint256 blockTime, uint256[] calldata bitNums)
+        external
+        pure
+        returns (uint256[] memory maturities)
+    {
+        maturities = new uint256[](bitNums.length);
+        for (uint256 i; i < bitNums.length; i++) {
+            maturities[i] = DateTime.getMaturityFromBitNum(blockTime, bitNums[i]);
+        }
+    }
+
+    /// @notice Encodes one trade per entry, `amounts` are int88 for residual purchases and cash debt settlement
+    function encodeTrades(
+        uint8[] calldata tradeActionTypes,
+        uint8[] calldata marketIndices,
+        int256[] calldata amounts,
+        uint32[] calldata minImpliedRates,
+        uint32[] calldata maxImpliedRates
+    ) external pure returns (bytes32[] memory trades) {
+        trades = new bytes32[](tradeActionTypes.length);
+        for (uint256 i; i < trades.length; i++) {
+            TradeActionType t = TradeActionType(tradeActionTypes[i]);
+            if (t == TradeActionType.Lend) {
+                trades[i] = EncodeDecode.encodeLendTrade(marketIndices[i], uint88(uint256(amounts[i])), minImpliedRates[i]);
+            } else if (t == TradeActionType.Borrow) {
+                trades[i] = EncodeDecode.encodeBorrowTrade(marketIndices[i], uint88(uint256(amounts[i])), maxImpliedRates[i]);
+            } else if (t == TradeActionType.AddLiquidity) {
+                trades[i] = EncodeDecode.encodeAddLiquidity(
+                    marketIndices[i], uint88(uint256(amounts[i])), minImpliedRates[i], maxImpliedRates[i]
+                );
+            } else if (t == TradeActionType.RemoveLiquidity) {
+                trades[i] = EncodeDecode.encodeRemoveLiquidity(
+                    marketIndices[i], uint88(uint256(amounts[i])), minImpliedRates[i], maxImpliedRates[i]
+                );
+            } else if (t == TradeActionType.PurchaseNTokenResidual) {
+                // The min implied rate field carries the maturity
+                trades[i] = EncodeDecode.encodePurchaseNTokenResidual(minImpliedRates[i], int88(amounts[i]));
+            } else {
+                // Counterparty is derived from the index so the call data stays compact
+                trades[i] = EncodeDecode.encodeSettleCashDebt(address(uint160(i + 1)), int88(amounts[i]));
+            }
+        }
+    }
+
+    function encodeOffsettingTradesFromArrays(
+        uint256[] memory fCashMaturities,
+        int256[] memory fCashNotional,
+        uint256 blockTime
+    ) external pure returns (bytes32[] memory) {
+        return EncodeDecode.encodeOffsettingTradesFromArrays(fCashMaturities, fCashNotional, blockTime);
+    }
+
+    function encodeOffsettingTradesFromPortfolio(
+        PortfolioAsset[] memory portfolio,
+        uint256 fCashCurrency,
+        uint256 blockTime
+    ) external pure returns (bytes32[] memory) {
+        return EncodeDecode.encodeOffsettingTradesFromPortfolio(portfolio, fCashCurrency, blockTime);
+    }
+
+    function convertToUnderlying(AssetRateParameters memory ar, int256[] calldata assetBalances)
+        external
+        pure
+        returns (int256[] memory underlying)
+    {
+        underlying = new int256[](assetBalances.length);
+        for (uint256 i; i < assetBalances.length; i++) {
+            underlying[i] = AssetRate.convertToUnderlying(ar, assetBalances[i]);
+        }
+    }
+
+    function convertFromUnderlying(AssetRateParameters memory ar, int256[] calldata underlyingBalances)
+        external
+        pure
+        returns (int256[] memory asset)
+    {
+        asset = new int256[](underlyingBalances.length);
+        for (uint256 i; i < underlyingBalances.length; i++) {
+            asset[i] = AssetRate.convertFromUnderlying(ar, underlyingBalances[i]);
+        }
+    }
+}
@@ -0,0 +1,110 @@
+// SPDX-License-Identifier: GPL-3.0-only
+pragma solidity ^0.8.0;
+pragma abicoder v2;
+
+import "../abstract/NotionalV2BaseLiquidator.sol";
+
+/// @dev Exposes the liquidation action decoding for testing, along with the comparison chains it
+/// replaced so the gas of both can be benchmarked per action
+contract MockLiquidationDispatch is NotionalV2BaseLiquidator {
+    constructor(address owner_) NotionalV2BaseLiquidator(owner_) {}
+
+    function executeDexTrade(
+        address, /* from */
+        address, /* to */
+        uint256, /* amountIn */
+        uint256, /* amountOutMin */
+        bytes memory /* params */
+    ) internal pure override returns (uint256) {
+        return 0;
+    }
+
+    function decodeAction(uint8 actionType)
+        external
+        view
+        returns (
+            uint8 kind,
+            bool hasTransferFees,
+            bool shouldWithdraw,
+            bool requiresDexTrade,
+            uint256 gasUsed
+        )
+    {
+        uint256 gasBefore = gasleft();
+        LiquidationAction action = LiquidationAction(actionType);
+        kind = _liquidationKind(action);
+        hasTransferFees = _hasTransferFees(action);
+        shouldWithdraw = _shouldWithdraw(action);
+        requiresDexTrade = _requiresDexTrade(action);
+        gasUsed = gasBefore - gasleft();
+    }
+
+    function decodeActionComparisonChain(uint8 actionType)
+        external
+        view
+        returns (
+            uint8 kind,
+            bool hasTransferFees,
+            bool shouldWithdraw,
+            bool requiresDexTrade,
+            uint256 gasUsed
+        )
+    {
+        uint256 gasBefore = gasleft();
+        LiquidationAction action = LiquidationAction(actionType);
+        if (
+            action == LiquidationAction.LocalCurrency_WithTransferFee_Withdraw ||
+            action == LiquidationAction.LocalCurrency_WithTransferFee_NoWithdraw ||
+            action == LiquidationAction.LocalCurrency_NoTransferFee_Withdraw ||
+            action == LiquidationAction.LocalCurrency_NoTransferFee_NoWithdraw
+        ) {
+            kind = LOCAL_CURRENCY;
+        } else if (
+            action == LiquidationAction.CollateralCurrency_WithTransferFee_Withdraw ||
+            action == LiquidationAction.CollateralCurrency_WithTransferFee_NoWithdraw ||
+            action == LiquidationAction.CollateralCurrency_NoTransferFee_Withdraw ||
+            action == LiquidationAction.CollateralCurrency_NoTransferFee_NoWithdraw
+        ) {
+            kind = COLLATERAL_CURRENCY;
+        } else if (
+            action == LiquidationAction.LocalfCash_WithTransferFee_Withdraw ||
+            action == LiquidationAction.LocalfCash_WithTransferFee_NoWithdraw ||
+            action == LiquidationAction.LocalfCash_NoTransferFee_Withdraw ||
+            action == LiquidationAction.LocalfCash_NoTransferFee_NoWithdraw
+        ) {
+            kind = LOCAL_FCASH;
+        } else if (
+            action == LiquidationAction.CrossCurrencyfCash_WithTransferFee_Withdraw ||
+            action == LiquidationAction.CrossCurrencyfCash_WithTransferFee_NoWithdraw ||
+            action == LiquidationAction.CrossCurrencyfCash_NoTransferFee_Withdraw ||
+            action == LiquidationAction.CrossCurrencyfCash_NoTransferFee_NoWithdraw
+        ) {
+            kind = CROSS_CURRENCY_FCASH;
+        }
+
+        hasTransferFees = action >= LiquidationAction.LocalCurrency_WithTransferFee_Withdraw;
+
+        shouldWithdraw = (
+            action == LiquidationAction.LocalCurrency_WithTransferFee_Withdraw ||
+            action == LiquidationAction.LocalCurrency_NoTransferFee_Withdraw ||
+            action == LiquidationAction.CollateralCurrency_WithTransferFee_Withdraw ||
+            action == LiquidationAction.CollateralCurrency_NoTransferFee_Withdraw ||
+            action == LiquidationAction.LocalfCash_WithTransferFee_Withdraw ||
+            action == LiquidationAction.LocalfCash_NoTransferFee_Withdraw ||
+            action == LiquidationAction.CrossCurrencyfCash_WithTransferFee_Withdraw ||
+            action == LiquidationAction.CrossCurrencyfCash_NoTransferFee_Withdraw
+        );
+
+        requiresDexTrade = (
+            action == LiquidationAction.CollateralCurrency_WithTransferFee_Withdraw ||
+            action == LiquidationAction.CollateralCurrency_WithTransferFee_NoWithdraw ||
+            action == LiquidationAction.CollateralCurrency_NoTransferFee_Withdraw ||
+            action == LiquidationAction.CollateralCurrency_NoTransferFee_NoWithdraw ||
+            action == LiquidationAction.CrossCurrencyfCash_WithTransferFee_Withdraw ||
+            action == LiquidationAction.CrossCurrencyfCash_WithTransferFee_NoWithdraw ||
+            action == LiquidationAction.CrossCurrencyfCash_NoTransferFee_Withdraw ||
+            action == LiquidationAction.CrossCurrencyfCash_NoTransferFee_NoWithdraw
+        );
+        gasUsed = gasBefore - gasleft();
+    }
+}
@@ -0,0 +1,61 @@
+// SPDX-License-Identifier: GPL-3.0-only
+pragma solidity ^0.8.0;
+pragma abicoder v2;
+
+import "../migrations/NotionalV1ToNotionalV2.sol";
+
+/// @dev Stands in for the Notional V1 Escrow and ERC1155Trade contracts. Cash balances are set
+/// directly, collateral tokens must be transferred to this contract to back positive balances.
+contract MockNotionalV1 is IEscrow, INotionalV1Erc1155 {
+    /// @dev V1 currency id to token, V1 holds ETH as WETH
+    IERC20[] public tokens;
+    mapping(address => mapping(uint16 => int256)) internal balances;
+
+    constructor(IERC20[] memory tokens_) {
+        tokens = tokens_;
+    }
+
+    function setBalance(
+        address account,
+        uint16 currencyId,
+        int256 balance
+    ) external {
+        balances[account][currencyId] = balance;
+    }
+
+    function getBalances(address account) external view override returns (int256[] memory accountBalances) {
+        accountBalances = new int256[](tokens.length);
+        for (uint16 i; i < tokens.length; i++) {
+            accountBalances[i] = balances[account][i];
+        }
+    }
+
+    function batchOperationWithdraw(
+        address account,
+        uint32 maxTime,
+        Deposit[] memory deposits,
+        Trade[] memory trades,
+        Withdraw[] memory withdraws
+    ) external payable override {
+        require(maxTime >= block.timestamp, "Trade expired");
+        require(trades.length == 0, "Trades not supported");
+
+        for (uint256 i; i < deposits.length; i++) {
+            uint16 currencyId = deposits[i].currencyId;
+            require(tokens[currencyId].transferFrom(account, address(this), deposits[i].amount));
+            balances[account][currencyId] += int256(uint256(deposits[i].amount));
+        }
+
+        for (uint256 i; i < withdraws.length; i++) {
+            uint16 currencyId = withdraws[i].currencyId;
+            balances[account][currencyId] -= int256(uint256(withdraws[i].amount));
+            require(balances[account][currencyId] >= 0, "Insufficient balance");
+            require(tokens[currencyId].transfer(withdraws[i].to, withdraws[i].amount));
+        }
+
+        // V1 would check free collateral here, with all collateral withdrawn no debt may remain
+        for (uint16 i; i < tokens.length; i++) {
+            require(balances[account][i] >= 0, "V1 debt outstanding");
+        }
+    }
+}
@@ -0,0 +1,25 @@
+// SPDX-License-Identifier: GPL-3.0-only
+pragma solidity ^0.8.0;
+pragma abicoder v2;
+
+import "../liquidations/NotionalV2UniV3FlashLiquidator.sol";
+
+/// @dev Exposes the Uniswap V3 trade for testing without a flash loan
+contract MockUniV3DexTrade is NotionalV2UniV3FlashLiquidator {
+    constructor(
+        address lendingPool_,
+        address addressProvider_,
+        address owner_,
+        ISwapRouter exchange_
+    ) NotionalV2UniV3FlashLiquidator(lendingPool_, addressProvider_, owner_, exchange_) {}
+
+    function dexTrade(
+        address from,
+        address to,
+        uint256 amountIn,
+        uint256 amountOutMin,
+        bytes memory params
+    ) external returns (uint256) {
+        return executeDexTrade(from, to, amountIn, amountOutMin, params);
+    }
+}
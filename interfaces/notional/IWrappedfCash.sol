@@ -27,6 +27,10 @@ interface IWrappedfCash {
     function redeem(uint256 amount, RedeemOpts memory data) external;
     function redeemToAsset(uint256 amount, address receiver, uint32 maxImpliedRate) external;
     function redeemToUnderlying(uint256 amount, address receiver, uint32 maxImpliedRate) external;
+    function batchRedeemMatured(address[] calldata holders, bool toUnderlying) external returns (uint256 tokensTransferred);
+
+    /// @notice Re-reads cached token metadata from Notional after a governance change
+    function refreshTokenCache() external;
 
     /// @notice Returns the underlying fCash ID of the token
     function getfCashId() external view returns (uint256);
@@ -1,6 +1,7 @@
 import json
 
 from brownie import accounts
+from brownie.network import show_active
 from brownie.network.contract import Contract
 from brownie.project import NotionalSoliditySdkProject
 
@@ -55,3 +56,11 @@ class Environment:
 
 def getEnvironment(network = "mainnet"):
     return Environment(network)
+
+def getForkEnvironment():
+    """Environment of the network the active fork was taken from"""
+    name = show_active()
+    if name == 'mainnet-fork':
+        return getEnvironment('mainnet')
+    elif name == 'kovan-fork':
+        return getEnvironment('kovan')
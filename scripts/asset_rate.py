@@ -0,0 +1,214 @@
+# Port of contracts/lib/AssetRate.sol, asset rates are in 1e18 decimals and internal balances in 1e8
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from brownie.exceptions import VirtualMachineError
+from brownie.network.contract import Contract
+from brownie.network.state import Chain
+
+chain = Chain()
+
+ASSET_RATE_DECIMAL_DIFFERENCE = 10 ** 10
+
+
+def _div(a, b):
+    # Solidity signed division truncates towards zero
+    q = abs(a) // abs(b)
+    return q if (a < 0) == (b < 0) else -q
+
+
+def convert_to_underlying(assetRate, assetBalance):
+    """Converts internal asset cash to underlying, `assetRate` is an AssetRateParameters tuple"""
+    (_, rate, underlyingDecimals) = assetRate
+    return _div(_div(rate * int(assetBalance), ASSET_RATE_DECIMAL_DIFFERENCE), underlyingDecimals)
+
+
+def convert_from_underlying(assetRate, underlyingBalance):
+    (_, rate, underlyingDecimals) = assetRate
+    return _div(int(underlyingBalance) * ASSET_RATE_DECIMAL_DIFFERENCE * underlyingDecimals, rate)
+
+
+# Compound interest rate models, mirrors compound-protocol 2.8.1
+BLOCKS_PER_YEAR = 2102400
+EXP_SCALE = 10 ** 18
+# Mirrors TokenType
+CTOKEN_TYPES = (1, 2)
+MAX_CACHED_RATES = 10000
+
+
+def _load_abi(name):
+    with open("scripts/compound_artifacts/{}.json".format(name), "r") as f:
+        return json.load(f)["abi"]
+
+
+def utilization_rate(cash, borrows, reserves):
+    if borrows == 0:
+        return 0
+    return borrows * EXP_SCALE // (cash + borrows - reserves)
+
+
+class WhitePaperInterestRateModel:
+    def __init__(self, baseRatePerBlock, multiplierPerBlock):
+        self.baseRatePerBlock = baseRatePerBlock
+        self.multiplierPerBlock = multiplierPerBlock
+
+    def get_borrow_rate(self, cash, borrows, reserves):
+        ur = utilization_rate(cash, borrows, reserves)
+        return ur * self.multiplierPerBlock // EXP_SCALE + self.baseRatePerBlock
+
+
+class JumpRateModel:
+    def __init__(self, baseRatePerBlock, multiplierPerBlock, jumpMultiplierPerBlock, kink):
+        self.baseRatePerBlock = baseRatePerBlock
+        self.multiplierPerBlock = multiplierPerBlock
+        self.jumpMultiplierPerBlock = jumpMultiplierPerBlock
+        self.kink = kink
+
+    def get_borrow_rate(self, cash, borrows, reserves):
+        ur = utilization_rate(cash, borrows, reserves)
+        if ur <= self.kink:
+            return ur * self.multiplierPerBlock // EXP_SCALE + self.baseRatePerBlock
+        normalRate = self.kink * self.multiplierPerBlock // EXP_SCALE + self.baseRatePerBlock
+        return (ur - self.kink) * self.jumpMultiplierPerBlock // EXP_SCALE + normalRate
+
+
+def interest_rate_model_from_config(interestRateModel):
+    """Builds a model from a CompoundConfig entry, per year rates are divided the same way as the
+    model constructors"""
+    baseRatePerBlock = interestRateModel["baseRate"] // BLOCKS_PER_YEAR
+    multiplierPerBlock = interestRateModel["multiplier"] // BLOCKS_PER_YEAR
+    if interestRateModel["name"] == "whitepaper":
+        return WhitePaperInterestRateModel(baseRatePerBlock, multiplierPerBlock)
+    return JumpRateModel(
+        baseRatePerBlock,
+        multiplierPerBlock,
+        interestRateModel["jumpMultiplierPerYear"] // BLOCKS_PER_YEAR,
+        interestRateModel["kink"],
+    )
+
+
+def interest_rate_model_from_contract(address):
+    """Reads per block parameters from a deployed model, this also covers JumpRateModelV2 which
+    scales its multiplier by the kink on construction"""
+    model = Contract.from_abi("JumpRateModel", address, _load_abi("nJumpRateModel"))
+    try:
+        jumpMultiplierPerBlock = model.jumpMultiplierPerBlock()
+    except (ValueError, VirtualMachineError):
+        # Whitepaper models do not have a jump multiplier
+        return WhitePaperInterestRateModel(model.baseRatePerBlock(), model.multiplierPerBlock())
+
+    return JumpRateModel(
+        model.baseRatePerBlock(), model.multiplierPerBlock(), jumpMultiplierPerBlock, model.kink()
+    )
+
+
+class CTokenState:
+    """Snapshot of the cToken storage that determines its exchange rate"""
+
+    def __init__(
+        self,
+        cash,
+        totalBorrows,
+        totalReserves,
+        totalSupply,
+        reserveFactorMantissa,
+        accrualBlockNumber,
+        interestRateModel,
+        initialExchangeRate=0,
+    ):
+        self.cash = cash
+        self.totalBorrows = totalBorrows
+        self.totalReserves = totalReserves
+        self.totalSupply = totalSupply
+        self.reserveFactorMantissa = reserveFactorMantissa
+        self.accrualBlockNumber = accrualBlockNumber
+        self.interestRateModel = interestRateModel
+        self.initialExchangeRate = initialExchangeRate
+
+    @classmethod
+    def read(cls, cToken, interestRateModel, blockNumber=None):
+        call = {} if blockNumber is None else {"block_identifier": blockNumber}
+        return cls(
+            cToken.getCash(**call),
+            cToken.totalBorrows(**call),
+            cToken.totalReserves(**call),
+            cToken.totalSupply(**call),
+            cToken.reserveFactorMantissa(**call),
+            cToken.accrualBlockNumber(**call),
+            interestRateModel,
+        )
+
+    def exchange_rate(self, blockNumber):
+        """Mirrors accrueInterest followed by exchangeRateStored, exact as long as no transaction
+        touches the cToken between the snapshot and blockNumber"""
+        if self.totalSupply == 0:
+            return self.initialExchangeRate
+
+        blockDelta = max(blockNumber - self.accrualBlockNumber, 0)
+        borrowRate = self.interestRateModel.get_borrow_rate(
+            self.cash, self.totalBorrows, self.totalReserves
+        )
+        interestAccumulated = borrowRate * blockDelta * self.totalBorrows // EXP_SCALE
+        totalBorrows = self.totalBorrows + interestAccumulated
+        totalReserves = (
+            self.reserveFactorMantissa * interestAccumulated // EXP_SCALE + self.totalReserves
+        )
+        return (self.cash + totalBorrows - totalReserves) * EXP_SCALE // self.totalSupply
+
+
+class AssetRateService:
+    """
+    Caches each currency's asset rate and projects cToken exchange rates forward per block, so that
+    balances can be converted without a call per conversion. Currencies are read again once their
+    snapshot is `maxAge` blocks old, since any cToken transaction changes its interest rate.
+    """
+
+    def __init__(self, notional, maxAge=100, maxWorkers=16):
+        self.notional = notional
+        self.maxAge = maxAge
+        self.maxWorkers = maxWorkers
+        # currencyId => (assetRate, CTokenState or None, snapshot block)
+        self.snapshots = {}
+        self._rates = {}
+
+    def _read(self, currencyId, blockNumber):
+        (asset, _, _, assetRate) = self.notional.getCurrencyAndRates(
+            currencyId, block_identifier=blockNumber
+        )
+        assetRate = tuple(assetRate)
+        if asset[3] not in CTOKEN_TYPES:
+            # Non interest bearing assets have a fixed rate
+            return (currencyId, (assetRate, None, blockNumber))
+
+        cToken = Contract.from_abi("CToken", asset[0], _load_abi("nCErc20"))
+        model = interest_rate_model_from_contract(cToken.interestRateModel())
+        return (currencyId, (assetRate, CTokenState.read(cToken, model, blockNumber), blockNumber))
+
+    def refresh(self, currencyIds, blockNumber=None):
+        blockNumber = chain.height if blockNumber is None else blockNumber
+        with ThreadPoolExecutor(max_workers=self.maxWorkers) as executor:
+            self.snapshots.update(executor.map(lambda c: self._read(c, blockNumber), currencyIds))
+        self._rates = {k: v for (k, v) in self._rates.items() if k[0] not in currencyIds}
+
+    def stale(self, blockNumber):
+        return [c for (c, s) in self.snapshots.items() if s[2] + self.maxAge <= blockNumber]
+
+    def asset_rate(self, currencyId, blockNumber):
+        """Returns the projected AssetRateParameters tuple at the block"""
+        key = (currencyId, blockNumber)
+        if key not in self._rates:
+            if len(self._rates) > MAX_CACHED_RATES:
+                self._rates = {}
+            (assetRate, cTokenState, _) = self.snapshots[currencyId]
+            if cTokenState is not None:
+                assetRate = (assetRate[0], cTokenState.exchange_rate(blockNumber), assetRate[2])
+            self._rates[key] = assetRate
+        return self._rates[key]
+
+    def convert_to_underlying(self, currencyId, assetBalances, blockNumber):
+        assetRate = self.asset_rate(currencyId, blockNumber)
+        return [convert_to_underlying(assetRate, b) for b in assetBalances]
+
+    def convert_from_underlying(self, currencyId, underlyingBalances, blockNumber):
+        assetRate = self.asset_rate(currencyId, blockNumber)
+        return [convert_from_underlying(assetRate, b) for b in underlyingBalances]
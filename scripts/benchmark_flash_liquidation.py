@@ -0,0 +1,68 @@
+import json
+
+from brownie import accounts, network, NotionalV2UniV3FlashLiquidator
+from brownie.convert import to_bytes
+from brownie.network.state import Chain
+from scripts.liquidation_bundle import LiquidationBundle, build_bundles
+
+chain = Chain()
+
+
+def _gas_used(liquidator, owner, lendingPool, bundle):
+    # Each flash loan runs against the same starting state
+    chain.snapshot()
+    try:
+        txn = liquidator.flashLoan(
+            *bundle.flash_loan_args(liquidator.address, lendingPool),
+            {"from": owner}
+        )
+        return txn.gas_used
+    finally:
+        chain.revert()
+
+
+def benchmark(liquidator, lendingPool, candidates, maxBundleSize=5):
+    """
+    Compares the gas per liquidated account of one flash loan per liquidation against
+    bundled flash loans. Candidates are dicts of `asset`, `amount` and single action `params`.
+    """
+    owner = accounts.at(liquidator.OWNER(), force=True)
+
+    singleGas = 0
+    for c in candidates:
+        single = LiquidationBundle(c["asset"]).add(c["params"], c["amount"])
+        singleGas += _gas_used(liquidator, owner, lendingPool, single)
+
+    bundles = build_bundles(candidates, maxBundleSize)
+    bundleGas = 0
+    for b in bundles:
+        bundleGas += _gas_used(liquidator, owner, lendingPool, b)
+
+    return {
+        "accounts": len(candidates),
+        "flashLoans": {"single": len(candidates), "bundle": len(bundles)},
+        "totalGas": {"single": singleGas, "bundle": bundleGas},
+        "gasPerAccount": {
+            "single": singleGas // len(candidates),
+            "bundle": bundleGas // len(candidates),
+        },
+    }
+
+
+def main(liquidatorAddress, lendingPool, candidatesFile, maxBundleSize=5):
+    """
+    brownie run scripts/benchmark_flash_liquidation.py main <liquidator> <lendingPool> <candidates.json>
+    The candidates file is a list of {"asset", "amount", "params"} where params is the hex encoded
+    output of one of the encode_* methods in scripts/liquidation_bundle.py
+    """
+    liquidator = NotionalV2UniV3FlashLiquidator.at(liquidatorAddress)
+    with open(candidatesFile, "r") as f:
+        candidates = json.load(f)
+
+    for c in candidates:
+        c["params"] = to_bytes(c["params"], "bytes")
+        c["amount"] = int(c["amount"])
+
+    result = benchmark(liquidator, lendingPool, candidates, int(maxBundleSize))
+    print("Network: {}".format(network.show_active()))
+    print(json.dumps(result, indent=2))
@@ -0,0 +1,290 @@
+import json
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from brownie import accounts, network, CompoundToNotionalV2
+from brownie.exceptions import VirtualMachineError
+from brownie.network.contract import Contract
+from brownie.network.state import Chain
+from brownie.project import NotionalSoliditySdkProject
+from eth_abi.packed import encode_abi_packed
+from scripts.environment import load_currencies, load_notional
+
+chain = Chain()
+
+# Mirrors TradeActionType.Borrow and DepositActionType.None
+BORROW_TRADE_ACTION = 1
+DEPOSIT_ACTION_NONE = 0
+INTERNAL_TOKEN_PRECISION = 10 ** 8
+# ETH rate buffers and haircuts are percentages
+PERCENTAGE_DECIMALS = 100
+MAX_ALLOWANCE = 2 ** 255
+
+
+def _ceil_div(a, b):
+    return -(-a // b)
+
+
+def encode_borrow_action(currencyId, marketIndex, fCashAmount, maxSlippage=0):
+    """Borrow fCash and withdraw the entire cash balance to the account's wallet as underlying"""
+    trade = encode_abi_packed(
+        ["uint8", "uint8", "uint88", "uint32", "uint120"],
+        [BORROW_TRADE_ACTION, marketIndex, int(fCashAmount), int(maxSlippage), 0],
+    )
+    return (DEPOSIT_ACTION_NONE, currencyId, 0, 0, True, True, [trade])
+
+
+class MigrationPlanner:
+    """
+    Plans CompoundToNotionalV2.migrateBorrowFromCompound for a batch of Compound accounts. Account
+    state is read in bulk, then each account's Notional borrow and the cToken collateral moved over
+    are sized so that the migration passes the free collateral check.
+    """
+
+    def __init__(
+        self,
+        notional,
+        compToV2,
+        marketIndex=1,
+        collateralBuffer=1.05,
+        borrowBuffer=1.001,
+        accrualBlocks=100,
+        maxWorkers=16,
+    ):
+        self.notional = notional
+        self.compToV2 = compToV2
+        self.marketIndex = marketIndex
+        # Margin over the required free collateral when sizing collateral deposits
+        self.collateralBuffer = collateralBuffer
+        # Margin on the borrowed cash to cover rounding on redeeming to underlying
+        self.borrowBuffer = borrowBuffer
+        # Blocks of Compound interest accrual to cover between planning and execution
+        self.accrualBlocks = accrualBlocks
+        self.maxWorkers = maxWorkers
+        self._cTokenABI = NotionalSoliditySdkProject._build.get("ICToken")["abi"]
+        self.currencies = self._load_currencies()
+
+    def _load_currencies(self):
+        currencies = {}
+        for currencyId in range(1, self.notional.getMaxCurrencyId() + 1):
+            (assetToken, underlyingToken, ethRate, assetRate) = self.notional.getCurrencyAndRates(
+                currencyId
+            )
+            # Only cToken and cETH asset tokens can be migrated from Compound
+            if assetToken[3] not in (1, 2):
+                continue
+            currencies[currencyId] = {
+                "cToken": assetToken[0],
+                "underlyingDecimals": underlyingToken[2],
+                "ethRate": ethRate,
+                "assetRate": assetRate,
+                "isETH": assetToken[3] == 2,
+            }
+        return currencies
+
+    def _currency_id(self, cToken):
+        for (currencyId, c) in self.currencies.items():
+            if c["cToken"] == cToken:
+                return currencyId
+        raise Exception("cToken {} is not listed on Notional".format(cToken))
+
+    def _to_eth(self, currencyId, underlyingInternal, isDebt):
+        (rateDecimals, rate, buffer, haircut, _) = self.currencies[currencyId]["ethRate"]
+        multiplier = buffer if isDebt else haircut
+        return underlyingInternal * rate * multiplier // (rateDecimals * PERCENTAGE_DECIMALS)
+
+    def _asset_to_underlying(self, currencyId, assetCash):
+        # AssetRate.convertToUnderlying, cToken balances are already in internal precision
+        (_, rate, underlyingDecimals) = self.currencies[currencyId]["assetRate"]
+        return assetCash * rate // 10 ** 10 // underlyingDecimals
+
+    def _read_account(self, account, cTokenBorrow):
+        snapshots = {}
+        for (currencyId, c) in self.currencies.items():
+            cToken = Contract.from_abi("cToken", c["cToken"], self._cTokenABI)
+            (err, cTokenBalance, borrowBalance, _) = cToken.getAccountSnapshot(account)
+            if err != 0:
+                raise Exception("Compound snapshot error {}".format(err))
+            snapshots[currencyId] = (cTokenBalance, borrowBalance)
+
+        borrowCToken = Contract.from_abi("cToken", cTokenBorrow, self._cTokenABI)
+        return {
+            "account": account,
+            "snapshots": snapshots,
+            "borrowRatePerBlock": borrowCToken.borrowRatePerBlock(),
+            "freeCollateral": self.notional.getFreeCollateral(account)[0],
+        }
+
+    def read_accounts(self, accountList, cTokenBorrow):
+        """Reads Compound positions and Notional free collateral for every account concurrently"""
+        with ThreadPoolExecutor(max_workers=self.maxWorkers) as executor:
+            return list(executor.map(lambda a: self._read_account(a, cTokenBorrow), accountList))
+
+    def plan_account(self, state, cTokenBorrow, blockTime=None):
+        borrowCurrencyId = self._currency_id(cTokenBorrow)
+        if self.currencies[borrowCurrencyId]["isETH"]:
+            raise Exception("Cannot migrate ETH borrows")
+        blockTime = chain.time() if blockTime is None else blockTime
+
+        (_, borrowBalance) = state["snapshots"][borrowCurrencyId]
+        plan = {"account": state["account"], "cTokenBorrow": cTokenBorrow, "feasible": False}
+        if borrowBalance == 0:
+            plan["reason"] = "No borrow balance"
+            return plan
+
+        # Repayment uses borrowBalanceCurrent at execution, cover some blocks of accrued interest
+        repayAmount = borrowBalance + _ceil_div(
+            borrowBalance * state["borrowRatePerBlock"] * self.accrualBlocks, 10 ** 18
+        )
+        underlyingDecimals = self.currencies[borrowCurrencyId]["underlyingDecimals"]
+        cashRequired = math.ceil(
+            _ceil_div(repayAmount * INTERNAL_TOKEN_PRECISION, underlyingDecimals)
+            * self.borrowBuffer
+        )
+        fCashAmount = self.notional.getfCashAmountGivenCashAmount(
+            borrowCurrencyId, cashRequired, self.marketIndex, blockTime
+        )
+        # Borrowing returns a negative fCash amount
+        fCashBorrow = -fCashAmount
+
+        # fCash notional is an upper bound on the risk adjusted present value of the debt
+        debtETH = self._to_eth(borrowCurrencyId, fCashBorrow, True)
+        requiredETH = math.ceil(debtETH * self.collateralBuffer) - max(state["freeCollateral"], 0)
+
+        collateralIds = []
+        collateralAmounts = []
+        # Deposit the collateral with the highest haircut (least discounted) first
+        byHaircut = sorted(
+            [cid for (cid, (bal, _)) in state["snapshots"].items() if bal > 0],
+            key=lambda cid: self.currencies[cid]["ethRate"][3],
+            reverse=True,
+        )
+        for currencyId in byHaircut:
+            if requiredETH <= 0:
+                break
+            (cTokenBalance, _) = state["snapshots"][currencyId]
+            valueETH = self._to_eth(
+                currencyId, self._asset_to_underlying(currencyId, cTokenBalance), False
+            )
+            if valueETH == 0:
+                continue
+            amount = min(cTokenBalance, _ceil_div(cTokenBalance * requiredETH, valueETH))
+            requiredETH -= valueETH * amount // cTokenBalance
+            collateralIds.append(currencyId)
+            collateralAmounts.append(amount)
+
+        plan.update(
+            {
+                "repayAmount": repayAmount,
+                "fCashBorrow": fCashBorrow,
+                "collateralIds": collateralIds,
+                "collateralAmounts": collateralAmounts,
+                "borrowAction": encode_borrow_action(
+                    borrowCurrencyId, self.marketIndex, fCashBorrow
+                ),
+            }
+        )
+        if requiredETH > 0:
+            plan["reason"] = "Insufficient collateral on Compound"
+        else:
+            plan["feasible"] = True
+
+        return plan
+
+    def plan(self, accountList, cTokenBorrow):
+        blockTime = chain.time()
+        states = self.read_accounts(accountList, cTokenBorrow)
+        return [self.plan_account(s, cTokenBorrow, blockTime) for s in states]
+
+    def migrate_args(self, plan):
+        return (
+            plan["cTokenBorrow"],
+            0,
+            plan["collateralIds"],
+            plan["collateralAmounts"],
+            [plan["borrowAction"]],
+        )
+
+
+def _approvals(planner, plan, tokenContracts):
+    """Tokens the account must still allow the adapter to pull, the repayment and the collateral"""
+    if not plan["feasible"]:
+        return []
+    tokens = [tokenContracts[plan["cTokenBorrow"]]] + [
+        tokenContracts[planner.currencies[cid]["cToken"]] for cid in plan["collateralIds"]
+    ]
+    return [t for t in tokens if t.allowance(plan["account"], planner.compToV2.address) < MAX_ALLOWANCE // 2]
+
+
+def _execute(planner, plan, approvals):
+    result = {"account": plan["account"], "success": False}
+    if not plan["feasible"]:
+        result["reason"] = plan["reason"]
+        return result
+
+    account = accounts.at(plan["account"], force=True)
+    try:
+        for token in approvals:
+            token.approve(planner.compToV2.address, MAX_ALLOWANCE, {"from": account})
+        txn = planner.compToV2.migrateBorrowFromCompound(
+            *planner.migrate_args(plan), {"from": account}
+        )
+        result.update({"success": True, "gas": txn.gas_used})
+    except VirtualMachineError as e:
+        result["reason"] = e.revert_msg
+
+    return result
+
+
+def execute(planner, plans, tokenContracts, maxWorkers=8):
+    """
+    Sends the planned migrations, intended for a local fork where the accounts are unlocked.
+    `tokenContracts` maps collateral cToken addresses to their contracts and the borrowed cToken
+    address to its underlying token contract, these are the tokens the adapter pulls. Allowances
+    are read concurrently, transactions are sent one at a time as brownie's transaction history
+    and revert handling are not thread safe.
+    """
+    start = time.time()
+    with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+        approvals = list(executor.map(lambda p: _approvals(planner, p, tokenContracts), plans))
+    results = [_execute(planner, p, a) for (p, a) in zip(plans, approvals)]
+    elapsed = time.time() - start
+
+    migrated = [r for r in results if r["success"]]
+    report = {
+        "accounts": len(plans),
+        "migrated": len(migrated),
+        "failed": {r["account"]: r["reason"] for r in results if not r["success"]},
+        "totalGas": sum(r["gas"] for r in migrated),
+        "averageGas": sum(r["gas"] for r in migrated) // len(migrated) if migrated else 0,
+        "elapsedSeconds": round(elapsed, 2),
+        "accountsPerMinute": round(len(plans) / elapsed * 60, 2) if elapsed > 0 else 0,
+    }
+    return (results, report)
+
+
+def main(compToV2Address, cTokenBorrowSymbol, accountsFile, marketIndex=1):
+    """
+    brownie run scripts/compound_migration.py main <adapter> cUSDC <accounts.json> --network mainnet-fork
+    The accounts file is a json list of Compound borrower addresses.
+    """
+    notional = load_notional()
+    currencies = load_currencies(notional)
+    compToV2 = CompoundToNotionalV2.at(compToV2Address)
+    with open(accountsFile, "r") as f:
+        accountList = json.load(f)
+
+    cTokenBorrow = currencies[cTokenBorrowSymbol]["asset"]
+    tokenContracts = {cTokenBorrow.address: currencies[cTokenBorrowSymbol]["underlying"]}
+    for c in currencies.values():
+        tokenContracts.setdefault(c["asset"].address, c["asset"])
+
+    planner = MigrationPlanner(notional, compToV2, int(marketIndex))
+    start = time.time()
+    plans = planner.plan(accountList, cTokenBorrow.address)
+    print("Planned {} accounts in {:.2f}s".format(len(plans), time.time() - start))
+
+    (_, report) = execute(planner, plans, tokenContracts)
+    print("Network: {}".format(network.show_active()))
+    print(json.dumps(report, indent=2))
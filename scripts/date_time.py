@@ -0,0 +1,129 @@
+# Port of contracts/lib/DateTime.sol, uses the same 6/30/360 week/month/year convention
+DAY = 86400
+WEEK = DAY * 6
+MONTH = WEEK * 5
+QUARTER = MONTH * 3
+YEAR = QUARTER * 4
+
+DAYS_IN_WEEK = 6
+DAYS_IN_MONTH = 30
+DAYS_IN_QUARTER = 90
+
+MAX_DAY_OFFSET = 90
+MAX_WEEK_OFFSET = 360
+MAX_MONTH_OFFSET = 2160
+MAX_QUARTER_OFFSET = 7650
+
+WEEK_BIT_OFFSET = 90
+MONTH_BIT_OFFSET = 135
+QUARTER_BIT_OFFSET = 195
+
+MAX_TRADED_MARKET_INDEX = 7
+FCASH_ASSET_TYPE = 1
+MIN_LIQUIDITY_TOKEN_INDEX = 2
+MAX_LIQUIDITY_TOKEN_INDEX = 8
+
+TRADED_MARKETS = [QUARTER, 2 * QUARTER, YEAR, 2 * YEAR, 5 * YEAR, 10 * YEAR, 20 * YEAR]
+
+
+def is_liquidity_token(assetType):
+    return MIN_LIQUIDITY_TOKEN_INDEX <= assetType <= MAX_LIQUIDITY_TOKEN_INDEX
+
+
+def get_reference_time(blockTime):
+    if blockTime < QUARTER:
+        raise Exception("Invalid block time")
+    return blockTime - blockTime % QUARTER
+
+
+def get_time_utc0(time):
+    if time < DAY:
+        raise Exception("Invalid time")
+    return time - time % DAY
+
+
+def get_traded_market(index):
+    if index < 1 or index > MAX_TRADED_MARKET_INDEX:
+        raise Exception("Invalid index")
+    return TRADED_MARKETS[index - 1]
+
+
+def get_settlement_date(assetType, maturity):
+    """Liquidity tokens settle every 90 days, fCash and 3 month tokens settle at maturity"""
+    if assetType <= 0 or assetType > MAX_LIQUIDITY_TOKEN_INDEX:
+        raise Exception("Settlement date invalid asset type")
+    if assetType <= MIN_LIQUIDITY_TOKEN_INDEX:
+        return maturity
+    return maturity - get_traded_market(assetType - 1) + QUARTER
+
+
+def get_market_index(maxMarketIndex, maturity, blockTime):
+    """Returns (marketIndex, isIdiosyncratic), for an idiosyncratic maturity this is the nearest
+    market index that is larger than the maturity"""
+    if maxMarketIndex <= 0:
+        raise Exception("CG: no markets listed")
+    if maxMarketIndex > MAX_TRADED_MARKET_INDEX:
+        raise Exception("CG: market index bound")
+    tRef = get_reference_time(blockTime)
+
+    for i in range(1, maxMarketIndex + 1):
+        marketMaturity = tRef + get_traded_market(i)
+        if marketMaturity == maturity:
+            return (i, False)
+        if marketMaturity > maturity:
+            return (i, True)
+
+    raise Exception("CG: no market found")
+
+
+def get_market_maturities(maxMarketIndex, blockTime):
+    tRef = get_reference_time(blockTime)
+    return [tRef + get_traded_market(i) for i in range(1, maxMarketIndex + 1)]
+
+
+def get_bit_num_from_maturity(blockTime, maturity):
+    """Returns (bitNum, isExact) for a maturity in an account's asset bitmap"""
+    blockTimeUTC0 = get_time_utc0(blockTime)
+    if maturity % DAY != 0 or blockTimeUTC0 >= maturity:
+        return (0, False)
+
+    daysOffset = (maturity - blockTimeUTC0) // DAY
+    if daysOffset <= MAX_DAY_OFFSET:
+        return (daysOffset, True)
+
+    for (maxOffset, prevOffset, period, days, bitOffset) in [
+        (MAX_WEEK_OFFSET, MAX_DAY_OFFSET, WEEK, DAYS_IN_WEEK, WEEK_BIT_OFFSET),
+        (MAX_MONTH_OFFSET, MAX_WEEK_OFFSET, MONTH, DAYS_IN_MONTH, MONTH_BIT_OFFSET),
+        (MAX_QUARTER_OFFSET, MAX_MONTH_OFFSET, QUARTER, DAYS_IN_QUARTER, QUARTER_BIT_OFFSET),
+    ]:
+        if daysOffset <= maxOffset:
+            offsetInDays = daysOffset - prevOffset + (blockTimeUTC0 % period) // DAY
+            return (bitOffset + offsetInDays // days, offsetInDays % days == 0)
+
+    return (256, False)
+
+
+def get_maturity_from_bit_num(blockTime, bitNum):
+    """Inverse of get_bit_num_from_maturity, bit numbers are one indexed"""
+    if bitNum == 0 or bitNum > 256:
+        raise Exception("Invalid bit num")
+    blockTimeUTC0 = get_time_utc0(blockTime)
+
+    if bitNum <= WEEK_BIT_OFFSET:
+        return blockTimeUTC0 + bitNum * DAY
+    for (bitOffset, prevOffset, period, maxBit) in [
+        (WEEK_BIT_OFFSET, MAX_DAY_OFFSET, WEEK, MONTH_BIT_OFFSET),
+        (MONTH_BIT_OFFSET, MAX_WEEK_OFFSET, MONTH, QUARTER_BIT_OFFSET),
+        (QUARTER_BIT_OFFSET, MAX_MONTH_OFFSET, QUARTER, 256),
+    ]:
+        if bitNum <= maxBit:
+            # Backs up to the day that is divisible by the period
+            firstBit = blockTimeUTC0 + prevOffset * DAY - blockTimeUTC0 % period
+            return firstBit + (bitNum - bitOffset) * period
+
+
+def is_valid_maturity(maxMarketIndex, maturity, blockTime):
+    maxMaturity = get_reference_time(blockTime) + get_traded_market(maxMarketIndex)
+    if maturity > maxMaturity:
+        return False
+    return get_bit_num_from_maturity(blockTime, maturity)[1]
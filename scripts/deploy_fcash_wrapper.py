@@ -1,5 +1,5 @@
-import json
-from brownie import WrappedfCash, nUpgradeableBeacon, WrappedfCashFactory, network, accounts
+from brownie import network, accounts
+from scripts.deployment import DeploymentPipeline, wrapper_manifest
 
 notionalAddress = {
     "kovan": "0x0EAE7BAdEF8f95De91fDDb74a89A786cF891Eb0e",
@@ -9,13 +9,7 @@ notionalAddress = {
 def main():
     deployer = accounts.load("KOVAN_DEPLOYER")
 
-    impl = WrappedfCash.deploy(notionalAddress[network.show_active()], {"from": deployer}, publish_source=True)
-    beacon = nUpgradeableBeacon.deploy(impl.address, {"from": deployer}, publish_source=True)
-    factory = WrappedfCashFactory.deploy(beacon.address, {"from": deployer}, publish_source=True)
-
-    with open("wrapper.{}.json".format(network.show_active()), "w") as f:
-        json.dump({
-            "implementation": impl.address,
-            "beacon": beacon.address,
-            "factory": factory.address
-        }, f)
\ No newline at end of file
+    # Progress is checkpointed to wrapper.<network>.json, running again resumes a failed deployment
+    manifest = wrapper_manifest(None, [])
+    pipeline = DeploymentPipeline(manifest, deployer, {"notional": notionalAddress[network.show_active()]})
+    print(pipeline.run())
@@ -0,0 +1,209 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import rlp
+from brownie import accounts, network, web3
+from brownie.convert import to_address
+from brownie.network.contract import Contract
+from brownie.project import NotionalSoliditySdkProject
+from eth_utils import keccak
+
+CONFIRM_TIMEOUT = 600
+
+
+def contract_address(deployer, nonce):
+    """Address of the contract created by `deployer` at `nonce`"""
+    return to_address("0x" + keccak(rlp.encode([bytes.fromhex(deployer[2:]), nonce]))[12:].hex())
+
+
+def wrapper_manifest(notional, currencyIds):
+    """Implementation, beacon and factory plus a wrapper for every active market of each currency"""
+    return {
+        "contracts": [
+            {"name": "implementation", "contract": "WrappedfCash", "args": ["@notional"]},
+            {"name": "beacon", "contract": "nUpgradeableBeacon", "args": ["@implementation"]},
+            {"name": "factory", "contract": "WrappedfCashFactory", "args": ["@beacon"]},
+        ],
+        "wrappers": [
+            [currencyId, m[1]] for currencyId in currencyIds for m in notional.getActiveMarkets(currencyId)
+        ],
+    }
+
+
+def publish_source(container, address):
+    container.publish_source(container.at(address))
+
+
+class DeploymentPipeline:
+    """
+    Deploys the contracts in a manifest and then the WrappedfCash wrappers it lists. Transactions are
+    sent with explicit nonces without waiting for receipts, constructor args that refer to an earlier
+    contract with "@name" use the address predicted from its nonce. Every confirmation is
+    checkpointed so a failed run resumes where it stopped, source verification runs in the background.
+    """
+
+    def __init__(self, manifest, deployer, addresses=None, path=None, verify=publish_source, maxVerifiers=4):
+        self.manifest = manifest
+        self.deployer = deployer
+        # External references such as the Notional proxy
+        self.addresses = {} if addresses is None else addresses
+        self.path = "wrapper.{}.json".format(network.show_active()) if path is None else path
+        self.verify = verify
+        self.maxVerifiers = maxVerifiers
+
+        self.checkpoint = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                self.checkpoint = json.load(f)
+        self.checkpoint.setdefault("wrappers", {})
+        self.checkpoint.setdefault("pending", {})
+        self.sent = 0
+
+    def _save(self):
+        # Written to a temporary file first so a crash never leaves a truncated checkpoint
+        with open(self.path + ".tmp", "w") as f:
+            json.dump(self.checkpoint, f, indent=2)
+        os.replace(self.path + ".tmp", self.path)
+
+    def _resolve(self, arg):
+        if not isinstance(arg, str) or not arg.startswith("@"):
+            return arg
+        name = arg[1:]
+        if name in self.checkpoint:
+            return self.checkpoint[name]
+        if name in self.checkpoint["pending"]:
+            return self.checkpoint["pending"][name]["address"]
+        return self.addresses[name]
+
+    def _next_nonce(self):
+        return web3.eth.get_transaction_count(self.deployer.address, "pending")
+
+    def _send(self, key, kind, txn, address):
+        self.checkpoint["pending"][key] = {"kind": kind, "tx": txn.txid, "address": address}
+        self._save()
+        self.sent += 1
+
+    def _discard_from(self, key):
+        """
+        Drops the failed entry and every entry sent after it so they are all sent again on the next
+        run, later nonces would leave a gap or deploy to a different address than predicted.
+        """
+        pending = self.checkpoint["pending"]
+        keys = list(pending.keys())
+        for k in keys[keys.index(key):]:
+            del pending[k]
+        self._save()
+
+    def _confirm(self, verifier, verifications):
+        """Waits for pending transactions in nonce order and records them"""
+        pending = self.checkpoint["pending"]
+        for key in list(pending.keys()):
+            entry = pending[key]
+            try:
+                receipt = web3.eth.wait_for_transaction_receipt(entry["tx"], timeout=CONFIRM_TIMEOUT)
+            except Exception:
+                self._discard_from(key)
+                raise Exception("Transaction for {} was not mined".format(key))
+
+            if receipt["status"] == 0:
+                self._discard_from(key)
+                raise Exception("Transaction for {} reverted".format(key))
+
+            del pending[key]
+            if entry["kind"] == "contract":
+                self.checkpoint[key] = entry["address"]
+                if verifier is not None:
+                    container = NotionalSoliditySdkProject[self._contract_name(key)]
+                    verifications[key] = verifier.submit(self.verify, container, entry["address"])
+            else:
+                self.checkpoint["wrappers"][key] = entry["address"]
+            self._save()
+
+    def _contract_name(self, name):
+        return next(c["contract"] for c in self.manifest["contracts"] if c["name"] == name)
+
+    def _deploy_contracts(self):
+        nonce = self._next_nonce()
+        for step in self.manifest["contracts"]:
+            if step["name"] in self.checkpoint or step["name"] in self.checkpoint["pending"]:
+                continue
+            container = NotionalSoliditySdkProject[step["contract"]]
+            args = [self._resolve(a) for a in step.get("args", [])]
+            txn = container.deploy(*args, {"from": self.deployer, "nonce": nonce, "required_confs": 0})
+            self._send(step["name"], "contract", txn, contract_address(self.deployer.address, nonce))
+            nonce += 1
+
+    def _deploy_wrappers(self):
+        if len(self.manifest.get("wrappers", [])) == 0:
+            return
+        factory = NotionalSoliditySdkProject["WrappedfCashFactory"].at(self.checkpoint["factory"])
+        nonce = self._next_nonce()
+        for (currencyId, maturity) in self.manifest["wrappers"]:
+            key = "{}:{}".format(currencyId, maturity)
+            if key in self.checkpoint["wrappers"] or key in self.checkpoint["pending"]:
+                continue
+            # Wrappers are deployed with CREATE2 so the address is known before sending
+            address = factory.computeAddress(currencyId, maturity)
+            if len(web3.eth.get_code(address)) > 0:
+                self.checkpoint["wrappers"][key] = address
+                self._save()
+                continue
+            txn = factory.deployWrapper(
+                currencyId, maturity, {"from": self.deployer, "nonce": nonce, "required_confs": 0}
+            )
+            self._send(key, "wrapper", txn, address)
+            nonce += 1
+
+    def run(self):
+        """Deploys everything that is not in the checkpoint yet and returns a report"""
+        verifications = {}
+        verifier = None if self.verify is None else ThreadPoolExecutor(max_workers=self.maxVerifiers)
+        try:
+            # Transactions left pending by a previous run are confirmed before sending new ones
+            self._confirm(verifier, verifications)
+            self._deploy_contracts()
+            self._confirm(verifier, verifications)
+            self._deploy_wrappers()
+            self._confirm(verifier, verifications)
+        finally:
+            verified = {}
+            if verifier is not None:
+                for (name, future) in verifications.items():
+                    try:
+                        future.result()
+                        verified[name] = True
+                    except Exception as e:
+                        verified[name] = str(e)
+                verifier.shutdown()
+
+        return {
+            "sent": self.sent,
+            "contracts": {c["name"]: self.checkpoint.get(c["name"]) for c in self.manifest["contracts"]},
+            "wrappers": len(self.checkpoint["wrappers"]),
+            "verified": verified,
+        }
+
+
+def main(manifestPath=None):
+    """
+    brownie run scripts/deployment.py main <manifest.json> --network kovan
+    Without a manifest the wrapper contracts and a wrapper for every active market are deployed
+    """
+    networkName = network.show_active()
+    with open("v2.{}.json".format(networkName.replace("-fork", "")), "r") as f:
+        addresses = json.load(f)
+
+    isLocal = networkName == "development" or networkName.endswith("-fork")
+    deployer = accounts[0] if isLocal else accounts.load(networkName.upper() + "_DEPLOYER")
+
+    if manifestPath is None:
+        notionalABI = NotionalSoliditySdkProject._build.get("NotionalProxy")["abi"]
+        notional = Contract.from_abi("Notional", addresses["notional"], abi=notionalABI)
+        manifest = wrapper_manifest(notional, range(1, notional.getMaxCurrencyId() + 1))
+    else:
+        with open(manifestPath, "r") as f:
+            manifest = json.load(f)
+
+    pipeline = DeploymentPipeline(manifest, deployer, addresses, verify=None if isLocal else publish_source)
+    print(json.dumps(pipeline.run(), indent=2))
@@ -21,6 +21,42 @@ TokenABI = {
   4: "IErc20"
 }
 
+def load_notional():
+    """
+    Notional proxy on the active network. Forks read the addresses of the network they were taken
+    from, which unlike v2.development.json do not list the comptroller or governor.
+    """
+    with open("v2.{}.json".format(network.show_active().replace("-fork", "")), "r") as f:
+        addresses = json.load(f)
+    notionalInterfaceABI = NotionalSoliditySdkProject._build.get("NotionalProxy")["abi"]
+    return Contract.from_abi("Notional", addresses["notional"], abi=notionalInterfaceABI)
+
+def load_currencies(notional):
+    """Asset and, where there is one, underlying token contracts keyed by asset symbol"""
+    abi = {}
+    abi[0] = NotionalSoliditySdkProject._build.get("IErc20")["abi"]
+    abi[1] = NotionalSoliditySdkProject._build.get("ICToken")["abi"]
+    abi[2] = NotionalSoliditySdkProject._build.get("ICEther")["abi"]
+    abi[4] = NotionalSoliditySdkProject._build.get("IErc20")["abi"]
+
+    currencies = {}
+    for id in range(1, notional.getMaxCurrencyId() + 1):
+        (assetToken, underlyingToken) = notional.getCurrency(id)
+        at_token_address, _, _, at_token_type, _ = assetToken
+        ut_token_address, _, _, ut_token_type, _ = underlyingToken
+
+        # Load the asset contract and add it to the currencies dictionary
+        assetContract = Contract.from_abi(
+            "Token", at_token_address, abi[at_token_type])
+        currencies[assetContract.symbol()] = {}
+        currencies[assetContract.symbol()]['asset'] = assetContract
+
+        # if there is an underlying contract load it and add it to the currencies dictionary
+        if ut_token_address != '0x0000000000000000000000000000000000000000':
+            underlyingContract = Contract.from_abi("Token", ut_token_address, abi[ut_token_type])
+            currencies[assetContract.symbol()]['underlying'] = underlyingContract
+    return currencies
+
 def setup_env():
     env = {}
     network_name = network.show_active()
@@ -39,12 +75,6 @@ def setup_env():
     notionalInterfaceABI = NotionalSoliditySdkProject._build.get("NotionalProxy")[
         "abi"]
 
-    abi = {}
-    abi[0] = NotionalSoliditySdkProject._build.get("IErc20")["abi"]
-    abi[1] = NotionalSoliditySdkProject._build.get("ICToken")["abi"]
-    abi[2] = NotionalSoliditySdkProject._build.get("ICEther")["abi"]
-    abi[4] = NotionalSoliditySdkProject._build.get("IErc20")["abi"]
-
     try:
         notional = Contract.from_abi(
             "Notional", addresses["notional"], abi=notionalInterfaceABI)
@@ -52,24 +82,8 @@ def setup_env():
         env['comptroller'] = Contract.from_abi("nComptroller", addresses["comptroller"], abi=nComptrollerABI)
         env['governor'] = Contract.from_abi(
             "Governor", addresses["governor"], abi=governorABI)
-        env['currencies'] = {}
+        env['currencies'] = load_currencies(notional)
         env['multisig'] = accounts[0]
-
-        for id in range(1, notional.getMaxCurrencyId() + 1):
-            (assetToken, underlyingToken) = notional.getCurrency(id)
-            at_token_address, _, _, at_token_type, _ = assetToken
-            ut_token_address, _, _, ut_token_type, _ = underlyingToken
-
-            # Load the asset contract and add it to the currencies dictionary
-            assetContract = Contract.from_abi(
-                "Token", at_token_address, abi[at_token_type])
-            env['currencies'][assetContract.symbol()] = {}
-            env['currencies'][assetContract.symbol()]['asset'] = assetContract
-
-            # if there is an underlying contract load it and add it to the currencies dictionary
-            if ut_token_address != '0x0000000000000000000000000000000000000000':
-              underlyingContract = Contract.from_abi("Token", ut_token_address, abi[ut_token_type])
-              env['currencies'][assetContract.symbol()]['underlying'] = underlyingContract
         return env
     except ContractNotFound:
         print(f"Contract not found at address: {addresses['notional']}")
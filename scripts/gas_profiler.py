@@ -0,0 +1,133 @@
+import json
+
+from brownie import chain
+
+CALL_OPCODES = ("CALL", "CALLCODE", "STATICCALL", "DELEGATECALL", "CREATE", "CREATE2")
+
+
+def _self_gas(trace):
+    """
+    Gas spent by each step excluding any child call frame. Geth reports the gas forwarded to a
+    call as its cost, so call steps are charged their inclusive cost less what the child spent.
+    """
+    gas = [0] * len(trace)
+    # suffix[k] is the sum of gas[k:], filled from the end so child frames are always known
+    suffix = [0] * (len(trace) + 1)
+    for i in range(len(trace) - 1, -1, -1):
+        step = trace[i]
+        if i + 1 == len(trace):
+            gas[i] = step["gasCost"]
+        elif trace[i + 1]["depth"] > step["depth"]:
+            j = next((k for k in range(i + 1, len(trace)) if trace[k]["depth"] <= step["depth"]), len(trace))
+            inclusive = step["gas"] - (trace[j]["gas"] if j < len(trace) else trace[-1]["gas"])
+            gas[i] = inclusive - (suffix[i + 1] - suffix[j])
+        elif step["op"] in CALL_OPCODES:
+            # Precompiles and accounts without code do not open a frame
+            gas[i] = step["gas"] - trace[i + 1]["gas"]
+        else:
+            gas[i] = step["gasCost"]
+        suffix[i] = suffix[i + 1] + gas[i]
+    return gas
+
+
+def profile(tx):
+    """
+    Attributes the execution gas of a transaction to the functions brownie resolves for each step of
+    its debug trace. Project contracts resolve down to internal functions, other contracts to the
+    external function called on them. Returns a report of plain dicts that diffs cleanly as JSON.
+    """
+    tx = chain.get_transaction(tx) if type(tx) == str else tx
+    trace = tx.trace
+    gas = _self_gas(trace)
+
+    functions = {}
+    calls = {}
+    folded = {}
+    frames = []
+    for (i, step) in enumerate(trace):
+        depth = step["depth"]
+        if i == 0 or trace[i - 1]["depth"] < depth:
+            # Entered a frame, the function called on entry names it
+            frames = frames[0:depth] + [step["fn"]]
+        elif trace[i - 1]["depth"] > depth:
+            frames = frames[0 : depth + 1]
+
+        functions[step["fn"]] = functions.get(step["fn"], 0) + gas[i]
+        path = ";".join(frames + ([step["fn"]] if step["fn"] != frames[-1] else []))
+        folded[path] = folded.get(path, 0) + gas[i]
+
+    # Inclusive gas of each external call is its own step plus everything in the child frame
+    for (i, step) in enumerate(trace[:-1]):
+        if trace[i + 1]["depth"] > step["depth"]:
+            j = next((k for k in range(i + 1, len(trace)) if trace[k]["depth"] <= step["depth"]), len(trace))
+            call = calls.setdefault("{} -> {}".format(step["fn"], trace[i + 1]["fn"]), {"count": 0, "gas": 0})
+            call["count"] += 1
+            call["gas"] += sum(gas[i:j])
+
+    return {
+        "txid": tx.txid,
+        "gasUsed": tx.gas_used,
+        "executionGas": sum(gas),
+        "functions": functions,
+        "calls": calls,
+        "folded": folded,
+    }
+
+
+def profile_transactions(transactions):
+    """Profiles a dict of named transactions, e.g. each path of a test, into one report"""
+    return {name: profile(tx) for (name, tx) in transactions.items()}
+
+
+def write_report(report, path):
+    # Sorted keys keep reports from different commits line for line comparable
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def diff_reports(base, head, threshold=0):
+    """
+    Per transaction changes in gas used, function self gas and external call gas between two
+    reports from profile_transactions, largest changes first
+    """
+    changes = {}
+    for name in sorted(set(base.keys()) | set(head.keys())):
+        (before, after) = (base.get(name, {}), head.get(name, {}))
+        rows = [("gasUsed", before.get("gasUsed", 0), after.get("gasUsed", 0))]
+        for section in ("functions", "calls"):
+            (b, a) = (before.get(section, {}), after.get(section, {}))
+            for key in set(b.keys()) | set(a.keys()):
+                value = lambda r: r.get(key, 0) if section == "functions" else r.get(key, {}).get("gas", 0)
+                rows.append((key, value(b), value(a)))
+
+        rows = [(k, b, a, a - b) for (k, b, a) in rows if abs(a - b) > threshold]
+        if len(rows) > 0:
+            changes[name] = sorted(rows, key=lambda r: -abs(r[3]))
+    return changes
+
+
+def main(txid, output="gas_profile.json"):
+    """
+    brownie run scripts/gas_profiler.py main <txid> <output.json> --network mainnet-fork
+    Requires a node that supports debug_traceTransaction, such as a hardhat or ganache fork
+    """
+    report = {txid: profile(txid)}
+    write_report(report, output)
+    for (fn, gas) in sorted(report[txid]["functions"].items(), key=lambda f: -f[1])[0:20]:
+        print("{:>10}  {}".format(gas, fn))
+
+
+def diff(basePath, headPath, threshold=0):
+    """
+    brownie run scripts/gas_profiler.py diff <base.json> <head.json>
+    Prints where gas changed between two reports, e.g. generated on two commits
+    """
+    with open(basePath, "r") as f:
+        base = json.load(f)
+    with open(headPath, "r") as f:
+        head = json.load(f)
+
+    for (name, rows) in diff_reports(base, head, int(threshold)).items():
+        print(name)
+        for (key, before, after, delta) in rows:
+            print("  {:>+10}  {:>10} -> {:<10}  {}".format(delta, before, after, key))
@@ -0,0 +1,105 @@
+from brownie import NotionalV2Lens
+from brownie.convert import to_address
+
+WRAPPER_RECORD_LENGTH = 118
+
+
+class _Reader:
+    """Reads big endian fixed width fields from ABI packed bytes"""
+
+    def __init__(self, data):
+        self.data = bytes(data)
+        self.offset = 0
+
+    def done(self):
+        return self.offset >= len(self.data)
+
+    def bytes(self, length):
+        value = self.data[self.offset : self.offset + length]
+        if len(value) != length:
+            raise Exception("Truncated lens response")
+        self.offset += length
+        return value
+
+    def uint(self, length):
+        return int.from_bytes(self.bytes(length), "big")
+
+    def int(self, length):
+        return int.from_bytes(self.bytes(length), "big", signed=True)
+
+    def address(self):
+        return to_address(self.bytes(20))
+
+
+def decode_wrappers(data):
+    if len(data) % WRAPPER_RECORD_LENGTH != 0:
+        raise Exception("Invalid wrapper response length")
+    reader = _Reader(data)
+    wrappers = []
+    while not reader.done():
+        wrappers.append(
+            {
+                "wrapper": reader.address(),
+                "currencyId": reader.uint(2),
+                "maturity": reader.uint(5),
+                "hasMatured": reader.uint(1) == 1,
+                "marketIndex": reader.uint(1),
+                "underlyingToken": reader.address(),
+                "underlyingPrecision": reader.uint(8),
+                "assetToken": reader.address(),
+                "assetPrecision": reader.uint(8),
+                "tokenType": reader.uint(1),
+                "totalSupply": reader.uint(16),
+                "fCashNotional": reader.int(16),
+            }
+        )
+    return wrappers
+
+
+def decode_accounts(data):
+    reader = _Reader(data)
+    accounts = []
+    while not reader.done():
+        account = {
+            "account": reader.address(),
+            "context": (
+                reader.uint(5),
+                "0x" + reader.bytes(1).hex(),
+                reader.uint(1),
+                reader.uint(2),
+                "0x" + reader.bytes(18).hex(),
+            ),
+        }
+        (numBalances, numAssets) = (reader.uint(1), reader.uint(1))
+        # (currencyId, cashBalance, nTokenBalance, lastClaimTime, lastClaimIntegralSupply)
+        account["balances"] = [
+            (reader.uint(2), reader.int(16), reader.int(16), reader.uint(5), reader.uint(16))
+            for _ in range(numBalances)
+        ]
+        # (currencyId, maturity, assetType, notional)
+        account["portfolio"] = [
+            (reader.uint(2), reader.uint(5), reader.uint(1), reader.int(16)) for _ in range(numAssets)
+        ]
+        accounts.append(account)
+    return accounts
+
+
+class Lens:
+    """Reads wrapper and account state through NotionalV2Lens, chunked to stay under the eth_call gas limit"""
+
+    def __init__(self, lens, chunkSize=200):
+        self.lens = lens
+        self.chunkSize = chunkSize
+
+    @classmethod
+    def deploy(cls, notional, deployer, chunkSize=200):
+        return cls(NotionalV2Lens.deploy(notional.address, {"from": deployer}), chunkSize)
+
+    def _chunks(self, items):
+        return [items[i : i + self.chunkSize] for i in range(0, len(items), self.chunkSize)]
+
+    def wrappers(self, addresses):
+        return [w for chunk in self._chunks(addresses) for w in decode_wrappers(self.lens.getWrappers(chunk))]
+
+    def accounts(self, addresses):
+        return [a for chunk in self._chunks(addresses) for a in decode_accounts(self.lens.getAccounts(chunk))]
@@ -0,0 +1,196 @@
+import eth_abi
+
+# Mirrors NotionalV2BaseLiquidator.LiquidationAction
+LiquidationAction = {
+    "LocalCurrency_NoTransferFee_Withdraw": 0,
+    "CollateralCurrency_NoTransferFee_Withdraw": 1,
+    "LocalfCash_NoTransferFee_Withdraw": 2,
+    "CrossCurrencyfCash_NoTransferFee_Withdraw": 3,
+    "LocalCurrency_NoTransferFee_NoWithdraw": 4,
+    "CollateralCurrency_NoTransferFee_NoWithdraw": 5,
+    "LocalfCash_NoTransferFee_NoWithdraw": 6,
+    "CrossCurrencyfCash_NoTransferFee_NoWithdraw": 7,
+    "LocalCurrency_WithTransferFee_Withdraw": 8,
+    "CollateralCurrency_WithTransferFee_Withdraw": 9,
+    "LocalfCash_WithTransferFee_Withdraw": 10,
+    "CrossCurrencyfCash_WithTransferFee_Withdraw": 11,
+    "LocalCurrency_WithTransferFee_NoWithdraw": 12,
+    "CollateralCurrency_WithTransferFee_NoWithdraw": 13,
+    "LocalfCash_WithTransferFee_NoWithdraw": 14,
+    "CrossCurrencyfCash_WithTransferFee_NoWithdraw": 15,
+}
+
+# Mirrors NotionalV2FlashLiquidator.BUNDLE_ACTION
+BUNDLE_ACTION = 255
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+
+def _action_id(action):
+    return LiquidationAction[action] if isinstance(action, str) else int(action)
+
+
+def encode_univ3_trade(fee, deadline, priceLimit=0):
+    """Trade params for NotionalV2UniV3FlashLiquidator.executeDexTrade"""
+    return eth_abi.encode_abi(["uint24", "uint256", "uint160"], [fee, deadline, priceLimit])
+
+
+def encode_local_currency(action, account, localCurrency, maxNTokenLiquidation=0):
+    return eth_abi.encode_abi(
+        ["uint8", "address", "uint16", "uint96"],
+        [_action_id(action), account, localCurrency, int(maxNTokenLiquidation)],
+    )
+
+
+def encode_collateral_currency(
+    action,
+    account,
+    localCurrency,
+    localAddress,
+    collateralCurrency,
+    collateralAddress,
+    collateralUnderlyingAddress,
+    tradeCallData,
+    maxCollateralLiquidation=0,
+    maxNTokenLiquidation=0,
+):
+    return eth_abi.encode_abi(
+        [
+            "uint8", "address", "uint16", "address", "uint16",
+            "address", "address", "uint128", "uint96", "bytes",
+        ],
+        [
+            _action_id(action),
+            account,
+            localCurrency,
+            localAddress,
+            collateralCurrency,
+            collateralAddress,
+            collateralUnderlyingAddress,
+            int(maxCollateralLiquidation),
+            int(maxNTokenLiquidation),
+            tradeCallData,
+        ],
+    )
+
+
+def encode_local_fcash(action, account, localCurrency, fCashMaturities, maxfCashLiquidateAmounts):
+    return eth_abi.encode_abi(
+        ["uint8", "address", "uint16", "uint256[]", "uint256[]"],
+        [
+            _action_id(action),
+            account,
+            localCurrency,
+            list(fCashMaturities),
+            [int(a) for a in maxfCashLiquidateAmounts],
+        ],
+    )
+
+
+def encode_cross_currency_fcash(
+    action,
+    account,
+    localCurrency,
+    localAddress,
+    fCashCurrency,
+    fCashAddress,
+    fCashUnderlyingAddress,
+    fCashMaturities,
+    maxfCashLiquidateAmounts,
+    tradeCallData,
+):
+    return eth_abi.encode_abi(
+        [
+            "uint8", "address", "uint16", "address", "uint16",
+            "address", "address", "uint256[]", "uint256[]", "bytes",
+        ],
+        [
+            _action_id(action),
+            account,
+            localCurrency,
+            localAddress,
+            fCashCurrency,
+            fCashAddress,
+            fCashUnderlyingAddress,
+            list(fCashMaturities),
+            [int(a) for a in maxfCashLiquidateAmounts],
+            tradeCallData,
+        ],
+    )
+
+
+def encode_bundle(actionParams, withdrawProfits=True):
+    """
+    Packs a list of single action params (as returned by the encode_* methods above) into
+    the params for one flash loan. All actions in a bundle must share the same flash loan
+    asset and cannot have transfer fees.
+    """
+    for p in actionParams:
+        # First word of every action is the uint8 action id
+        action = int.from_bytes(p[:32], "big")
+        if action >= LiquidationAction["LocalCurrency_WithTransferFee_Withdraw"]:
+            raise Exception("Transfer fee actions cannot be bundled")
+
+    return eth_abi.encode_abi(
+        ["uint8", "bool", "bytes[]"], [BUNDLE_ACTION, withdrawProfits, list(actionParams)]
+    )
+
+
+class LiquidationBundle:
+    """
+    Accumulates liquidations that will be repaid from the same flash loan asset, the
+    flash loan amount is the sum of the local currency required by each liquidation.
+    """
+
+    def __init__(self, asset, withdrawProfits=True):
+        self.asset = asset
+        self.withdrawProfits = withdrawProfits
+        self.actionParams = []
+        self.amounts = []
+
+    def __len__(self):
+        return len(self.actionParams)
+
+    def add(self, actionParams, flashLoanAmount):
+        self.actionParams.append(actionParams)
+        self.amounts.append(int(flashLoanAmount))
+        return self
+
+    def flash_loan_amount(self):
+        return sum(self.amounts)
+
+    def params(self):
+        if len(self.actionParams) == 1:
+            # A bundle of one is cheaper as a single action
+            return self.actionParams[0]
+        return encode_bundle(self.actionParams, self.withdrawProfits)
+
+    def flash_loan_args(self, liquidator, lendingPool):
+        """Arguments for NotionalV2FlashLiquidator.flashLoan"""
+        return (
+            lendingPool,
+            liquidator,
+            [self.asset],
+            [self.flash_loan_amount()],
+            [0],
+            liquidator,
+            self.params(),
+            0,
+        )
+
+
+def build_bundles(candidates, maxBundleSize=5, withdrawProfits=True):
+    """
+    Groups candidate liquidations by flash loan asset. Each candidate is a dict with keys
+    `asset`, `amount` and `params` (single action params). Returns a list of bundles.
+    """
+    bundles = []
+    open_bundles = {}
+    for c in candidates:
+        bundle = open_bundles.get(c["asset"])
+        if bundle is None or len(bundle) >= maxBundleSize:
+            bundle = LiquidationBundle(c["asset"], withdrawProfits)
+            open_bundles[c["asset"]] = bundle
+            bundles.append(bundle)
+        bundle.add(c["params"], c["amount"])
+
+    return bundles
@@ -0,0 +1,340 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import eth_abi
+import requests
+from brownie import network, web3, NotionalV2ifCashLiquidator, NotionalV2UniV3FlashLiquidator
+from brownie.convert import to_bytes
+from brownie.network.contract import Contract
+from brownie.project import NotionalSoliditySdkProject
+from scripts.asset_rate import _div
+from scripts.liquidation_bundle import LiquidationBundle
+from scripts.metrics import ACTION_GAS, RPC_LATENCY, SIMULATIONS, cache_children
+
+# Error(string) and Panic(uint256) selectors
+ERROR_SELECTOR = "0x08c379a0"
+PANIC_SELECTOR = "0x4e487b71"
+# Mirrors NotionalV2BaseLiquidator.NO_WITHDRAW_FLAG
+NO_WITHDRAW_FLAG = 0x04
+BATCH_LATENCY = RPC_LATENCY.labels("batch")
+ETH_RATE_LOOKUPS = cache_children("eth_rate")
+TOKEN_BALANCE_LOOKUPS = cache_children("token_balance")
+
+
+def decode_revert_reason(error):
+    """Extracts the revert reason from a JSON-RPC error, nodes differ in where they put the data"""
+    data = error.get("data")
+    if type(data) == dict:
+        data = data.get("data") or data.get("result")
+    if type(data) != str or not data.startswith("0x"):
+        return error.get("message", "reverted")
+
+    if data.startswith(ERROR_SELECTOR):
+        return eth_abi.decode_abi(["string"], bytes.fromhex(data[10:]))[0]
+    if data.startswith(PANIC_SELECTOR):
+        return "Panic({})".format(eth_abi.decode_abi(["uint256"], bytes.fromhex(data[10:]))[0])
+    if data == "0x":
+        # Revert without a reason, i.e. require(x) or a `dev:` comment
+        return error.get("message", "reverted")
+    return data
+
+
+class Candidate:
+    """
+    A liquidation transaction to simulate. `profitCall` is an optional (to, data) eth_call whose
+    result is passed to `profit` along with the result of the liquidation itself. `action` labels
+    its metrics.
+    """
+
+    def __init__(self, name, to, data, profit, profitCall=None, value=0, action="liquidate"):
+        self.name = name
+        self.action = action
+        self.to = to
+        self.data = data
+        self.value = value
+        self.profit = profit
+        self.profitCall = profitCall
+
+
+class LiquidationSimulator:
+    """
+    Simulates liquidations with eth_call and eth_estimateGas against a forked node, every call is
+    made at the same pinned block so the fork's storage cache is reused across candidates. Calls
+    for each chunk of candidates are sent as a single JSON-RPC batch and chunks run concurrently.
+    """
+
+    def __init__(self, notional, owner, blockNumber=None, chunkSize=50, maxWorkers=8):
+        self.notional = notional
+        self.owner = owner
+        self.endpoint = web3.provider.endpoint_uri
+        self.block = hex(web3.eth.block_number if blockNumber is None else blockNumber)
+        self.chunkSize = chunkSize
+        self.maxWorkers = maxWorkers
+        self._session = requests.Session()
+        self._rates = {}
+        self._balances = {}
+
+    def _batch(self, calls):
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+            for (i, (method, params)) in enumerate(calls)
+        ]
+        with BATCH_LATENCY.time():
+            response = self._session.post(self.endpoint, json=payload, timeout=300)
+        response.raise_for_status()
+        return sorted(response.json(), key=lambda r: r["id"])
+
+    def _tx(self, to, data, value=0):
+        return {"from": self.owner, "to": to, "data": data, "value": hex(value)}
+
+    def _call(self, to, data):
+        (result,) = self._batch([("eth_call", [self._tx(to, data), self.block])])
+        if "error" in result:
+            raise Exception(decode_revert_reason(result["error"]))
+        return result["result"]
+
+    def eth_rate(self, currencyId):
+        """Cached (ETHRate, AssetRateParameters) for a currency at the pinned block"""
+        ETH_RATE_LOOKUPS[currencyId in self._rates].inc()
+        if currencyId not in self._rates:
+            data = self.notional.getCurrencyAndRates.encode_input(currencyId)
+            result = self.notional.getCurrencyAndRates.decode_output(
+                self._call(self.notional.address, data)
+            )
+            self._rates[currencyId] = (result[2], result[3])
+        return self._rates[currencyId]
+
+    def token_balance(self, token, holder):
+        key = (token, holder)
+        TOKEN_BALANCE_LOOKUPS[key in self._balances].inc()
+        if key not in self._balances:
+            data = "0x70a08231" + eth_abi.encode_abi(["address"], [holder]).hex()
+            self._balances[key] = int(self._call(token, data), 16)
+        return self._balances[key]
+
+    def to_eth(self, currencyId, underlyingInternal):
+        ((rateDecimals, rate, *_), _) = self.eth_rate(currencyId)
+        return _div(underlyingInternal * rate, rateDecimals)
+
+    def asset_to_underlying(self, currencyId, assetCash):
+        (_, (_, rate, underlyingDecimals)) = self.eth_rate(currencyId)
+        # Matches AssetRate.convertToUnderlying, Solidity division truncates towards zero
+        return _div(_div(assetCash * rate, 10 ** 10), underlyingDecimals)
+
+    def _simulate_chunk(self, candidates):
+        calls = []
+        for c in candidates:
+            tx = self._tx(c.to, c.data, c.value)
+            calls.append(("eth_call", [tx, self.block]))
+            calls.append(("eth_estimateGas", [tx, self.block]))
+            if c.profitCall is not None:
+                calls.append(("eth_call", [self._tx(*c.profitCall), self.block]))
+
+        responses = iter(self._batch(calls))
+        results = []
+        for c in candidates:
+            call = next(responses)
+            gas = next(responses)
+            profitCall = next(responses) if c.profitCall is not None else None
+            result = {"name": c.name, "success": "error" not in call}
+
+            if result["success"]:
+                result["gas"] = int(gas["result"], 16) if "result" in gas else None
+                try:
+                    profitData = profitCall["result"] if profitCall is not None else None
+                    result["profit"] = c.profit(call["result"], profitData)
+                except Exception as e:
+                    result["profit"] = None
+                    result["revertReason"] = "Profit calculation failed: {}".format(e)
+            else:
+                result["revertReason"] = decode_revert_reason(call["error"])
+            SIMULATIONS.labels(c.action, "success" if result["success"] else "revert").inc()
+            if result.get("gas") is not None:
+                ACTION_GAS.labels(c.action).observe(result["gas"])
+            results.append(result)
+
+        return results
+
+    def simulate(self, candidates):
+        chunks = [
+            candidates[i : i + self.chunkSize] for i in range(0, len(candidates), self.chunkSize)
+        ]
+        with ThreadPoolExecutor(max_workers=self.maxWorkers) as executor:
+            return [r for chunk in executor.map(self._simulate_chunk, chunks) for r in chunk]
+
+    def flash_loan_candidate(self, name, liquidator, lendingPool, bundle):
+        """
+        Flash liquidator candidate from a scripts.liquidation_bundle.LiquidationBundle. Profit is
+        denominated in the flash loan asset: flashLoan returns the liquidator's asset balance after
+        the loan has been repaid, so actions must not withdraw profits to the owner.
+        """
+        if len(bundle) == 1:
+            action = int.from_bytes(bundle.actionParams[0][:32], "big")
+            withdraws = action & NO_WITHDRAW_FLAG == 0
+        else:
+            withdraws = bundle.withdrawProfits
+        if withdraws:
+            raise Exception("Simulated flash loans must use NoWithdraw actions")
+
+        data = liquidator.flashLoan.encode_input(*bundle.flash_loan_args(liquidator.address, lendingPool))
+        balanceBefore = self.token_balance(bundle.asset, liquidator.address)
+
+        def profit(result, _):
+            return liquidator.flashLoan.decode_output(result) - balanceBefore
+
+        return Candidate(name, liquidator.address, data, profit, action="flashLoan")
+
+    def _fcash_profit(self, localCurrency, fCashCurrency, decode):
+        # Profit at maturity in ETH (8 decimals): fCash received less the local cash paid, the
+        # liquidator is paid fCash at a discount to its present value.
+        def profit(_, calculateResult):
+            (fCashAmounts, localAssetCashFromLiquidator) = decode(calculateResult)
+            fCashValue = self.to_eth(fCashCurrency, sum(fCashAmounts))
+            cashPaid = self.to_eth(
+                localCurrency,
+                self.asset_to_underlying(localCurrency, localAssetCashFromLiquidator),
+            )
+            return fCashValue - cashPaid
+
+        return profit
+
+    def local_fcash_candidate(
+        self, name, liquidator, account, fCashMaturities, maxfCashLiquidateAmounts, actions=None
+    ):
+        currencyId = liquidator.IFCASH_CURRENCY_ID()
+        data = liquidator.liquidateLocalfCash.encode_input(
+            actions or [], account, fCashMaturities, maxfCashLiquidateAmounts
+        )
+        calculate = self.notional.calculatefCashLocalLiquidation
+        profitCall = (
+            self.notional.address,
+            calculate.encode_input(account, currencyId, fCashMaturities, maxfCashLiquidateAmounts),
+        )
+
+        return Candidate(
+            name,
+            liquidator.address,
+            data,
+            self._fcash_profit(currencyId, currencyId, calculate.decode_output),
+            profitCall,
+            action="liquidateLocalfCash",
+        )
+
+    def cross_currency_fcash_candidate(
+        self,
+        name,
+        liquidator,
+        account,
+        localCurrencyId,
+        localCurrencyAssetToken,
+        fCashMaturities,
+        maxfCashLiquidateAmounts,
+        dexTrade=b"",
+        localHasTransferFee=False,
+        actions=None,
+    ):
+        fCashCurrency = liquidator.IFCASH_CURRENCY_ID()
+        data = liquidator.liquidateCrossCurrencyfCash.encode_input(
+            actions or [],
+            account,
+            localCurrencyId,
+            localCurrencyAssetToken,
+            fCashMaturities,
+            maxfCashLiquidateAmounts,
+            dexTrade,
+            localHasTransferFee,
+        )
+        calculate = self.notional.calculatefCashCrossCurrencyLiquidation
+        profitCall = (
+            self.notional.address,
+            calculate.encode_input(
+                account, localCurrencyId, fCashCurrency, fCashMaturities, maxfCashLiquidateAmounts
+            ),
+        )
+
+        return Candidate(
+            name,
+            liquidator.address,
+            data,
+            self._fcash_profit(localCurrencyId, fCashCurrency, calculate.decode_output),
+            profitCall,
+            action="liquidateCrossCurrencyfCash",
+        )
+
+
+def _load_candidates(simulator, candidatesFile):
+    with open(candidatesFile, "r") as f:
+        spec = json.load(f)
+
+    candidates = []
+    for (i, c) in enumerate(spec):
+        name = c.get("name", str(i))
+        if c["type"] == "flashLoan":
+            liquidator = NotionalV2UniV3FlashLiquidator.at(c["liquidator"])
+            bundle = LiquidationBundle(c["asset"], withdrawProfits=False)
+            for (params, amount) in zip(c["params"], c["amounts"]):
+                bundle.add(to_bytes(params, "bytes"), amount)
+            candidates.append(
+                simulator.flash_loan_candidate(name, liquidator, c["lendingPool"], bundle)
+            )
+        elif c["type"] == "localfCash":
+            liquidator = NotionalV2ifCashLiquidator.at(c["liquidator"])
+            candidates.append(
+                simulator.local_fcash_candidate(
+                    name, liquidator, c["account"], c["maturities"], c["maxAmounts"]
+                )
+            )
+        elif c["type"] == "crossCurrencyfCash":
+            liquidator = NotionalV2ifCashLiquidator.at(c["liquidator"])
+            candidates.append(
+                simulator.cross_currency_fcash_candidate(
+                    name,
+                    liquidator,
+                    c["account"],
+                    c["localCurrencyId"],
+                    c["localCurrencyAssetToken"],
+                    c["maturities"],
+                    c["maxAmounts"],
+                    to_bytes(c.get("dexTrade", "0x"), "bytes"),
+                    c.get("localHasTransferFee", False),
+                )
+            )
+        else:
+            raise Exception("Unknown candidate type {}".format(c["type"]))
+
+    return candidates
+
+
+def main(candidatesFile, owner, blockNumber=None):
+    """
+    brownie run scripts/liquidation_simulator.py main <candidates.json> <owner> --network mainnet-fork
+    Each candidate in the file has a `type` of flashLoan, localfCash or crossCurrencyfCash
+    """
+    networkName = network.show_active().replace("-fork", "")
+    with open("v2.{}.json".format(networkName), "r") as f:
+        addresses = json.load(f)
+
+    notionalInterfaceABI = NotionalSoliditySdkProject._build.get("NotionalProxy")["abi"]
+    notional = Contract.from_abi("Notional", addresses["notional"], abi=notionalInterfaceABI)
+    simulator = LiquidationSimulator(
+        notional, owner, None if blockNumber is None else int(blockNumber)
+    )
+
+    candidates = _load_candidates(simulator, candidatesFile)
+    start = time.time()
+    results = simulator.simulate(candidates)
+    elapsed = time.time() - start
+
+    for r in sorted(results, key=lambda r: r.get("profit") or 0, reverse=True):
+        print(json.dumps(r))
+
+    print(
+        "Simulated {} candidates at block {} in {:.2f}s ({:.0f} per minute), {} reverted".format(
+            len(results),
+            int(simulator.block, 16),
+            elapsed,
+            len(results) / elapsed * 60 if elapsed > 0 else 0,
+            len([r for r in results if not r["success"]]),
+        )
+    )
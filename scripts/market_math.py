@@ -0,0 +1,120 @@
+import math
+
+from scripts.asset_rate import _div, convert_to_underlying
+from scripts.date_time import YEAR
+from scripts.offsetting_trades import BASIS_POINT, MAX_MARKET_PROPORTION, RATE_PRECISION
+
+IMPLIED_RATE_TIME = YEAR
+PERCENTAGE_DECIMALS = 100
+MAX_IMPLIED_RATE = 2 ** 32 - 1
+
+
+# Port of the Notional V2 Market library trading math. Integer math follows the Solidity code, the
+# ABDK exp and ln calls use floating point so results can differ in the last digits.
+
+
+def get_exchange_rate_from_implied_rate(impliedRate, timeToMaturity):
+    return int(
+        RATE_PRECISION * math.exp(impliedRate * timeToMaturity // IMPLIED_RATE_TIME / RATE_PRECISION)
+    )
+
+
+def get_rate_scalar(cashGroup, marketIndex, timeToMaturity):
+    """`cashGroup` is the CashGroupSettings tuple from getCashGroup"""
+    return _div(cashGroup[10][marketIndex - 1] * RATE_PRECISION * IMPLIED_RATE_TIME, timeToMaturity)
+
+
+def _log_proportion(proportion):
+    if proportion == RATE_PRECISION:
+        return None
+    proportion = _div(proportion * RATE_PRECISION, RATE_PRECISION - proportion)
+    if proportion <= 0:
+        return None
+    return int(math.log(proportion / RATE_PRECISION) * RATE_PRECISION)
+
+
+def _rate_anchor(totalfCash, lastImpliedRate, totalCashUnderlying, rateScalar, timeToMaturity):
+    newExchangeRate = get_exchange_rate_from_implied_rate(lastImpliedRate, timeToMaturity)
+    if newExchangeRate < RATE_PRECISION:
+        return None
+    lnProportion = _log_proportion(_div(totalfCash * RATE_PRECISION, totalfCash + totalCashUnderlying))
+    if lnProportion is None:
+        return None
+    return newExchangeRate - _div(lnProportion * RATE_PRECISION, rateScalar)
+
+
+def _exchange_rate(totalfCash, totalCashUnderlying, rateScalar, rateAnchor, fCashToAccount):
+    numerator = totalfCash - fCashToAccount
+    if numerator < 0:
+        return None
+    proportion = _div(numerator * RATE_PRECISION, totalfCash + totalCashUnderlying)
+    if proportion > MAX_MARKET_PROPORTION:
+        return None
+    lnProportion = _log_proportion(proportion)
+    if lnProportion is None:
+        return None
+    rate = _div(lnProportion * RATE_PRECISION, rateScalar) + rateAnchor
+    # Exchange rates below one are negative interest rates
+    return None if rate < RATE_PRECISION else rate
+
+
+def get_implied_rate(totalfCash, totalCashUnderlying, rateScalar, rateAnchor, timeToMaturity):
+    exchangeRate = _exchange_rate(totalfCash, totalCashUnderlying, rateScalar, rateAnchor, 0)
+    if exchangeRate is None:
+        return 0
+    lnRate = int(math.log(exchangeRate / RATE_PRECISION) * RATE_PRECISION)
+    impliedRate = lnRate * IMPLIED_RATE_TIME // timeToMaturity
+    return 0 if impliedRate > MAX_IMPLIED_RATE else impliedRate
+
+
+def calculate_trade(market, cashGroup, assetRate, fCashToAccount, timeToMaturity, marketIndex):
+    """
+    Mirrors Market.calculateTrade for a MarketParameters tuple. Returns (netCashToAccount,
+    netCashToReserve, impliedRate) where cash is in underlying internal precision and the implied
+    rate is the market's lastImpliedRate after the trade, or None when the trade would fail.
+    """
+    (totalfCash, totalAssetCash, lastImpliedRate) = (market[2], market[3], market[5])
+    fCashToAccount = int(fCashToAccount)
+    if totalfCash <= fCashToAccount:
+        return None
+
+    rateScalar = get_rate_scalar(cashGroup, marketIndex, timeToMaturity)
+    totalCashUnderlying = convert_to_underlying(assetRate, totalAssetCash)
+    if totalfCash == 0 or totalCashUnderlying == 0:
+        return None
+    rateAnchor = _rate_anchor(totalfCash, lastImpliedRate, totalCashUnderlying, rateScalar, timeToMaturity)
+    if rateAnchor is None:
+        return None
+    preFeeExchangeRate = _exchange_rate(
+        totalfCash, totalCashUnderlying, rateScalar, rateAnchor, fCashToAccount
+    )
+    if preFeeExchangeRate is None:
+        return None
+
+    preFeeCashToAccount = -_div(fCashToAccount * RATE_PRECISION, preFeeExchangeRate)
+    fee = get_exchange_rate_from_implied_rate(cashGroup[2] * BASIS_POINT, timeToMaturity)
+    if fCashToAccount > 0:
+        # Lending, the fee lowers the exchange rate
+        if _div(preFeeExchangeRate * RATE_PRECISION, fee) < RATE_PRECISION:
+            return None
+        fee = _div(preFeeCashToAccount * (RATE_PRECISION - fee), RATE_PRECISION)
+    else:
+        # Borrowing, the fee raises the exchange rate
+        fee = -_div(preFeeCashToAccount * (RATE_PRECISION - fee), fee)
+
+    cashToReserve = _div(fee * cashGroup[3], PERCENTAGE_DECIMALS)
+    netCashToAccount = preFeeCashToAccount - fee
+    netCashToMarket = -(netCashToAccount + cashToReserve)
+    if netCashToAccount == 0:
+        return None
+
+    impliedRate = get_implied_rate(
+        totalfCash - fCashToAccount,
+        totalCashUnderlying + netCashToMarket,
+        rateScalar,
+        rateAnchor,
+        timeToMaturity,
+    )
+    if impliedRate == 0:
+        return None
+    return (netCashToAccount, cashToReserve, impliedRate)
@@ -0,0 +1,185 @@
+import json
+import mmap
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor
+
+from brownie import web3
+from scripts.environment import load_notional
+
+# One file per column per currency, rows are one market at one block. Values are native endian
+# fixed width integers so a column can be memory mapped and sliced without copying.
+COLUMNS = [
+    ("blockNumber", "Q"),
+    ("blockTime", "Q"),
+    ("marketIndex", "B"),
+    ("maturity", "Q"),
+    ("totalfCash", "q"),
+    ("totalAssetCash", "q"),
+    ("totalLiquidity", "q"),
+    ("lastImpliedRate", "Q"),
+    ("oracleRate", "Q"),
+    ("previousTradeTime", "Q"),
+]
+COLUMN_TYPES = dict(COLUMNS)
+
+
+class MarketStore:
+    """
+    Append only columnar store of getActiveMarkets results partitioned by currency. Columns are
+    returned as memoryviews over memory mapped files so slices do not copy any data.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        # (currencyId, column) => (size, mmap, memoryview)
+        self._maps = {}
+
+    def _file(self, currencyId, column):
+        return os.path.join(self.path, "currency_{}".format(currencyId), column + ".bin")
+
+    def currencies(self):
+        if not os.path.isdir(self.path):
+            return []
+        return sorted(
+            int(d.split("_")[1]) for d in os.listdir(self.path) if d.startswith("currency_")
+        )
+
+    def column(self, currencyId, name):
+        """Returns a read only view of the column, remapped when rows have been appended"""
+        file = self._file(currencyId, name)
+        size = os.path.getsize(file) if os.path.exists(file) else 0
+        cached = self._maps.get((currencyId, name))
+        if cached is not None and cached[0] == size:
+            return cached[2]
+
+        if size == 0:
+            view = memoryview(array(COLUMN_TYPES[name]))
+            mapped = None
+        else:
+            with open(file, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+            view = memoryview(mapped).cast(COLUMN_TYPES[name])
+        # Previous maps are released once callers drop their views
+        self._maps[(currencyId, name)] = (size, mapped, view)
+        return view
+
+    def _truncate(self, currencyId):
+        """Drops rows past the last complete block, left behind by an interrupted append"""
+        file = self._file(currencyId, "blockNumber")
+        size = os.path.getsize(file) if os.path.exists(file) else 0
+        rows = size // array(COLUMN_TYPES["blockNumber"]).itemsize
+        for (column, t) in COLUMNS:
+            file = self._file(currencyId, column)
+            if os.path.exists(file) and os.path.getsize(file) != rows * array(t).itemsize:
+                os.truncate(file, rows * array(t).itemsize)
+
+    def __len__(self):
+        return sum(len(self.column(c, "blockNumber")) for c in self.currencies())
+
+    def last_block(self, currencyId):
+        blocks = self.column(currencyId, "blockNumber")
+        return blocks[-1] if len(blocks) > 0 else None
+
+    def rows_between(self, currencyId, fromBlock, toBlock):
+        """Returns the (start, end) row range for blocks in [fromBlock, toBlock], for slicing columns"""
+        blocks = self.column(currencyId, "blockNumber")
+        return (bisect_left(blocks, fromBlock), bisect_right(blocks, toBlock))
+
+    def slice(self, currencyId, fromBlock, toBlock, columns=None):
+        """Zero copy slices of each column for blocks in [fromBlock, toBlock]"""
+        (start, end) = self.rows_between(currencyId, fromBlock, toBlock)
+        columns = [c for (c, _) in COLUMNS] if columns is None else columns
+        return {c: self.column(currencyId, c)[start:end] for c in columns}
+
+    def curve(self, currencyId, blockNumber):
+        """Returns [(maturity, oracleRate)] for the latest stored block at or before blockNumber"""
+        blocks = self.column(currencyId, "blockNumber")
+        end = bisect_right(blocks, blockNumber)
+        if end == 0:
+            return []
+        start = bisect_left(blocks, blocks[end - 1])
+        maturities = self.column(currencyId, "maturity")
+        rates = self.column(currencyId, "oracleRate")
+        return list(zip(maturities[start:end], rates[start:end]))
+
+    def append(self, currencyId, blockNumber, blockTime, markets):
+        """Appends one block of MarketParameters tuples, blocks must be appended in order"""
+        self._truncate(currencyId)
+        last = self.last_block(currencyId)
+        if last is not None and blockNumber <= last:
+            raise Exception("Block {} already stored for currency {}".format(blockNumber, currencyId))
+
+        rows = {c: array(t) for (c, t) in COLUMNS}
+        for (i, m) in enumerate(markets):
+            rows["blockNumber"].append(blockNumber)
+            rows["blockTime"].append(blockTime)
+            rows["marketIndex"].append(i + 1)
+            rows["maturity"].append(int(m[1]))
+            rows["totalfCash"].append(int(m[2]))
+            rows["totalAssetCash"].append(int(m[3]))
+            rows["totalLiquidity"].append(int(m[4]))
+            rows["lastImpliedRate"].append(int(m[5]))
+            rows["oracleRate"].append(int(m[6]))
+            rows["previousTradeTime"].append(int(m[7]))
+
+        os.makedirs(os.path.dirname(self._file(currencyId, "blockNumber")), exist_ok=True)
+        # blockNumber is written last so a partially written block is never visible to readers
+        for (column, _) in COLUMNS[1:] + COLUMNS[:1]:
+            with open(self._file(currencyId, column), "ab") as f:
+                rows[column].tofile(f)
+
+
+def backfill(store, notional, currencyIds, fromBlock, toBlock, step=1, maxWorkers=16):
+    """
+    Reads getActiveMarkets for every `step` blocks in [fromBlock, toBlock] and appends them to the
+    store, resuming after the last block already stored for each currency. Returns rows appended.
+    """
+    startBlocks = {}
+    for currencyId in currencyIds:
+        last = store.last_block(currencyId)
+        startBlocks[currencyId] = fromBlock if last is None else max(fromBlock, last + 1)
+
+    blockNumbers = list(range(min(startBlocks.values()), toBlock + 1, step))
+
+    def read(blockNumber):
+        markets = {
+            currencyId: notional.getActiveMarkets(currencyId, block_identifier=blockNumber)
+            for currencyId in currencyIds
+            if blockNumber >= startBlocks[currencyId]
+        }
+        return (blockNumber, web3.eth.get_block(blockNumber)["timestamp"], markets)
+
+    appended = 0
+    with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+        # map preserves order so blocks are appended sequentially
+        for (blockNumber, blockTime, markets) in executor.map(read, blockNumbers):
+            for (currencyId, m) in markets.items():
+                store.append(currencyId, blockNumber, blockTime, m)
+                appended += len(m)
+    return appended
+
+
+def main(path="market_history", fromBlock=None, step=1):
+    """
+    brownie run scripts/market_store.py main <path> <fromBlock> <step> --network mainnet-fork
+    Appends market history from fromBlock (or the last stored block) up to the current block
+    """
+    notional = load_notional()
+    currencyIds = list(range(1, notional.getMaxCurrencyId() + 1))
+    store = MarketStore(path)
+    toBlock = web3.eth.block_number
+    fromBlock = toBlock if fromBlock is None else int(fromBlock)
+
+    appended = backfill(store, notional, currencyIds, fromBlock, toBlock, int(step))
+    print(
+        json.dumps(
+            {
+                "appended": appended,
+                "rows": len(store),
+                "lastBlock": {c: store.last_block(c) for c in store.currencies()},
+            },
+            indent=2,
+        )
+    )
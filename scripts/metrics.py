@@ -0,0 +1,222 @@
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+
+from brownie import web3
+
+RPC_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+GAS_BUCKETS = (50_000, 100_000, 200_000, 400_000, 800_000, 1_600_000, 3_200_000, 6_400_000)
+
+
+class _Child:
+    def __init__(self):
+        self._lock = Lock()
+        self.value = 0
+
+
+class _CounterChild(_Child):
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeChild(_Child):
+    def set(self, value):
+        self.value = value
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class _HistogramChild(_Child):
+    def __init__(self, buckets):
+        super().__init__()
+        self.buckets = buckets
+        # Per bucket counts, the last one is +Inf, made cumulative on exposition
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+
+    def observe(self, value):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Metric:
+    """
+    A named metric with optional labels. Looking up `labels(...)` is a dict access, hot loops should
+    hold on to the child it returns and call inc or observe on it directly.
+    """
+
+    def __init__(self, kind, name, documentation, labelNames=(), buckets=None):
+        self.kind = kind
+        self.name = name
+        self.documentation = documentation
+        self.labelNames = tuple(labelNames)
+        self.buckets = tuple(buckets) if buckets is not None else None
+        self._children = {}
+        self._lock = Lock()
+
+    def _new_child(self):
+        if self.kind == "counter":
+            return _CounterChild()
+        elif self.kind == "gauge":
+            return _GaugeChild()
+        return _HistogramChild(self.buckets)
+
+    def labels(self, *values):
+        values = tuple(str(v) for v in values)
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelNames):
+                raise Exception("{} expects labels {}".format(self.name, self.labelNames))
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    # Unlabelled metrics are used directly
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def set(self, value):
+        self.labels().set(value)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def _label_string(self, values, extra=()):
+        pairs = list(zip(self.labelNames, values)) + list(extra)
+        if len(pairs) == 0:
+            return ""
+        return "{" + ",".join('{}="{}"'.format(k, v.replace('"', '\\"')) for (k, v) in pairs) + "}"
+
+    def expose(self):
+        lines = ["# HELP {} {}".format(self.name, self.documentation), "# TYPE {} {}".format(self.name, self.kind)]
+        for (values, child) in sorted(self._children.items()):
+            if self.kind != "histogram":
+                lines.append("{}{} {}".format(self.name, self._label_string(values), child.value))
+                continue
+            with child._lock:
+                (counts, total) = (list(child.counts), child.sum)
+            cumulative = 0
+            for (bound, count) in zip(list(self.buckets) + ["+Inf"], counts):
+                cumulative += count
+                labels = self._label_string(values, [("le", str(bound))])
+                lines.append("{}_bucket{} {}".format(self.name, labels, cumulative))
+            lines.append("{}_sum{} {}".format(self.name, self._label_string(values), total))
+            lines.append("{}_count{} {}".format(self.name, self._label_string(values), cumulative))
+        return "\n".join(lines)
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def _register(self, metric):
+        if metric.name in self.metrics:
+            raise Exception("Metric {} already registered".format(metric.name))
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelNames=()):
+        return self._register(Metric("counter", name, documentation, labelNames))
+
+    def gauge(self, name, documentation, labelNames=()):
+        return self._register(Metric("gauge", name, documentation, labelNames))
+
+    def histogram(self, name, documentation, labelNames=(), buckets=RPC_BUCKETS):
+        return self._register(Metric("histogram", name, documentation, labelNames, buckets))
+
+    def expose(self):
+        """Prometheus text exposition format"""
+        return "\n".join(m.expose() for m in self.metrics.values()) + "\n"
+
+    def serve(self, port=9100, address="127.0.0.1"):
+        """Serves /metrics from a daemon thread, returns the server so it can be shut down"""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                body = registry.expose().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((address, port), Handler)
+        Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+REGISTRY = Registry()
+
+# Rates such as accounts scanned or simulations per second are rate() over these counters
+RPC_LATENCY = REGISTRY.histogram(
+    "notional_rpc_latency_seconds", "JSON-RPC request latency", ("method",)
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "notional_cache_requests_total", "Cache lookups by cache and result (hit or miss)", ("cache", "result")
+)
+ACCOUNTS_SCANNED = REGISTRY.counter(
+    "notional_accounts_scanned_total", "Accounts read from Notional", ("source",)
+)
+SIMULATIONS = REGISTRY.counter(
+    "notional_liquidation_simulations_total", "Liquidation simulations by result", ("action", "result")
+)
+ACTION_GAS = REGISTRY.histogram(
+    "notional_action_gas", "Gas used or estimated per action", ("action",), GAS_BUCKETS
+)
+
+
+def cache_children(cache):
+    """
+    (miss, hit) children of CACHE_REQUESTS for a cache, indexed by whether the lookup hit. Bind them
+    once at module level rather than looking up labels on every access.
+    """
+    return (CACHE_REQUESTS.labels(cache, "miss"), CACHE_REQUESTS.labels(cache, "hit"))
+
+
+def instrument_provider(provider=None):
+    """Observes the latency of every request made through the brownie web3 provider"""
+    provider = web3.provider if provider is None else provider
+    makeRequest = provider.make_request
+    children = {}
+
+    def timed(method, params):
+        child = children.get(method)
+        if child is None:
+            child = children[method] = RPC_LATENCY.labels(method)
+        start = time.perf_counter()
+        try:
+            return makeRequest(method, params)
+        finally:
+            child.observe(time.perf_counter() - start)
+
+    provider.make_request = timed
+    # web3 caches the middleware chain with the make_request it was built around
+    if hasattr(provider, "_request_func_cache"):
+        provider._request_func_cache = (None, None)
+    return provider
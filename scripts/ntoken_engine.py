@@ -0,0 +1,191 @@
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+from brownie.network.state import Chain
+from scripts.asset_rate import convert_from_underlying, convert_to_underlying
+from scripts.date_time import YEAR
+from scripts.market_math import calculate_trade
+from scripts.yield_curve import YieldCurve
+
+chain = Chain()
+
+INTERNAL_TOKEN_PRECISION = 10 ** 8
+
+
+class NTokenState:
+    """
+    Snapshot of an nToken account, its portfolio and the markets it provides liquidity to at a block
+    time. `liquidityTokens` and `netfCash` are the two arrays returned by getNTokenPortfolio.
+    """
+
+    def __init__(self, currencyId, blockTime, account, liquidityTokens, netfCash, markets, cashGroup, assetRate):
+        (
+            _,
+            self.totalSupply,
+            self.emissionRate,
+            _,
+            _,
+            self.cashBalance,
+            self.integralTotalSupply,
+            self.lastSupplyChangeTime,
+        ) = [v if i == 4 else int(v) for (i, v) in enumerate(account)]
+        self.currencyId = currencyId
+        self.blockTime = blockTime
+        self.liquidityTokens = [(a[0], a[1], a[2], int(a[3])) for a in liquidityTokens]
+        self.netfCash = [(a[0], a[1], a[2], int(a[3])) for a in netfCash]
+        self.markets = [tuple(int(v) if i > 0 else v for (i, v) in enumerate(m)) for m in markets]
+        self.cashGroup = cashGroup
+        self.assetRate = tuple(assetRate)
+        self.curve = YieldCurve(currencyId, blockTime, self.markets)
+
+    def present_value(self):
+        """Mirrors nTokenCalculations.getNTokenAssetPV, returns asset cash in internal precision"""
+        assetCash = self.cashBalance
+        underlying = 0
+        for (_, maturity, assetType, tokens) in self.liquidityTokens:
+            market = self.markets[assetType - 2]
+            assetCash += tokens * market[3] // market[4]
+            underlying += self.curve.present_value(tokens * market[2] // market[4], maturity)
+        for (_, maturity, _, notional) in self.netfCash:
+            underlying += self.curve.present_value(notional, maturity)
+        return assetCash + convert_from_underlying(self.assetRate, underlying)
+
+    def quote_mint(self, assetCashAmounts):
+        """nTokens minted for each deposit of asset cash in internal precision, the same as calculateNTokensToMint"""
+        if self.totalSupply == 0:
+            return [int(a) for a in assetCashAmounts]
+        pv = self.present_value()
+        return [int(a) * self.totalSupply // pv for a in assetCashAmounts]
+
+    def quote_redeem(self, tokenAmounts, sellTokenAssets=True):
+        """
+        Returns (assetCash, {maturity: residualfCash}) for each amount of nTokens redeemed. The
+        redeemer's share of liquidity is removed from the markets first and the remaining fCash is
+        sold into them when `sellTokenAssets` is set, fCash that cannot be traded is a residual.
+        """
+        results = []
+        for tokensToRedeem in tokenAmounts:
+            tokensToRedeem = int(tokensToRedeem)
+            assetCash = self.cashBalance * tokensToRedeem // self.totalSupply
+            markets = list(self.markets)
+            fCash = {}
+
+            for (_, maturity, assetType, tokens) in self.liquidityTokens:
+                i = assetType - 2
+                (totalfCash, totalAssetCash, totalLiquidity) = markets[i][2:5]
+                tokensToRemove = tokens * tokensToRedeem // self.totalSupply
+                cashClaim = tokensToRemove * totalAssetCash // totalLiquidity
+                fCashClaim = tokensToRemove * totalfCash // totalLiquidity
+                assetCash += cashClaim
+                fCash[maturity] = fCash.get(maturity, 0) + fCashClaim
+                markets[i] = markets[i][0:2] + (
+                    totalfCash - fCashClaim,
+                    totalAssetCash - cashClaim,
+                    totalLiquidity - tokensToRemove,
+                ) + markets[i][5:]
+
+            for (_, maturity, _, notional) in self.netfCash:
+                fCash[maturity] = fCash.get(maturity, 0) + notional * tokensToRedeem // self.totalSupply
+
+            residuals = {}
+            for maturity in sorted(fCash.keys()):
+                notional = fCash[maturity]
+                if notional == 0:
+                    continue
+                trade = None
+                if sellTokenAssets and maturity in self.curve.maturities:
+                    i = self.curve.maturities.index(maturity)
+                    trade = calculate_trade(
+                        markets[i], self.cashGroup, self.assetRate, -notional, maturity - self.blockTime, i + 1
+                    )
+                if trade is None:
+                    residuals[maturity] = notional
+                else:
+                    assetCash += convert_from_underlying(self.assetRate, trade[0])
+
+            results.append((assetCash, residuals))
+        return results
+
+    def integral_total_supply(self, blockTime):
+        """Mirrors nTokenHandler.calculateIntegralTotalSupply assuming the supply does not change"""
+        return self.integralTotalSupply + self.totalSupply * (blockTime - self.lastSupplyChangeTime)
+
+    def incentives(self, nTokenBalances, lastClaimTimes, lastClaimIntegralSupplies, blockTime):
+        """
+        Mirrors Incentives.calculateIncentivesToClaim for parallel arrays of holder state, returns
+        claimable NOTE in internal precision per holder
+        """
+        integralTotalSupply = self.integral_total_supply(blockTime)
+        claimable = array("Q")
+        for (balance, lastClaimTime, lastClaimIntegralSupply) in zip(
+            nTokenBalances, lastClaimTimes, lastClaimIntegralSupplies
+        ):
+            if lastClaimTime == 0 or lastClaimTime >= blockTime:
+                claimable.append(0)
+                continue
+            timeSinceLastClaim = blockTime - lastClaimTime
+            avgTotalSupply = (integralTotalSupply - lastClaimIntegralSupply) // timeSinceLastClaim
+            if avgTotalSupply == 0:
+                claimable.append(0)
+                continue
+            incentiveRate = timeSinceLastClaim * INTERNAL_TOKEN_PRECISION * self.emissionRate // YEAR
+            claimable.append(balance * incentiveRate // avgTotalSupply)
+        return claimable
+
+    def project_incentives(self, holders, blockTimes):
+        """`holders` is the (balances, lastClaimTimes, lastClaimIntegralSupplies) columns from
+        NTokenEngine.holders, returns claimable NOTE per holder at each future block time"""
+        return {t: self.incentives(*holders, t) for t in blockTimes}
+
+
+class NTokenEngine:
+    """Loads nToken state and holder balances concurrently and quotes against the snapshots"""
+
+    def __init__(self, notional, maxWorkers=16):
+        self.notional = notional
+        self.maxWorkers = maxWorkers
+        self.states = {}
+
+    def load(self, currencyIds, blockTime=None):
+        blockTime = chain.time() if blockTime is None else blockTime
+
+        def read(currencyId):
+            nTokenAddress = self.notional.nTokenAddress(currencyId)
+            (liquidityTokens, netfCash) = self.notional.getNTokenPortfolio(nTokenAddress)
+            return NTokenState(
+                currencyId,
+                blockTime,
+                self.notional.getNTokenAccount(nTokenAddress),
+                liquidityTokens,
+                netfCash,
+                self.notional.getActiveMarketsAtBlockTime(currencyId, blockTime),
+                self.notional.getCashGroup(currencyId),
+                self.notional.getCurrencyAndRates(currencyId)[3],
+            )
+
+        with ThreadPoolExecutor(max_workers=self.maxWorkers) as executor:
+            for state in executor.map(read, currencyIds):
+                self.states[state.currencyId] = state
+        return self.states
+
+    def holders(self, currencyId, accounts):
+        """
+        Returns (balances, lastClaimTimes, lastClaimIntegralSupplies) in account order. Balances and
+        claim times are uint64 arrays, integral supplies are uint128 on chain and stay Python ints.
+        """
+
+        def read(account):
+            for b in self.notional.getAccount(account)[1]:
+                if b[0] == currencyId:
+                    return (int(b[2]), int(b[3]), int(b[4]))
+            return (0, 0, 0)
+
+        with ThreadPoolExecutor(max_workers=self.maxWorkers) as executor:
+            rows = list(executor.map(read, accounts))
+        (balances, lastClaimTimes, lastClaimIntegralSupplies) = zip(*rows) if rows else ((), (), ())
+        return (array("Q", balances), array("Q", lastClaimTimes), list(lastClaimIntegralSupplies))
+
+    def underlying_value(self, currencyId, nTokens):
+        """Underlying internal precision value of nTokens at the snapshot's present value"""
+        state = self.states[currencyId]
+        return convert_to_underlying(state.assetRate, int(nTokens) * state.present_value() // state.totalSupply)
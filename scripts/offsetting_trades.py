@@ -0,0 +1,208 @@
+from scripts.date_time import (
+    FCASH_ASSET_TYPE,
+    MAX_TRADED_MARKET_INDEX,
+    get_market_index,
+    get_settlement_date,
+)
+
+# Mirrors TradeActionType and DepositActionType
+TRADE_ACTION_TYPE = {
+    "Lend": 0,
+    "Borrow": 1,
+    "AddLiquidity": 2,
+    "RemoveLiquidity": 3,
+    "PurchaseNTokenResidual": 4,
+    "SettleCashDebt": 5,
+}
+DEPOSIT_ACTION_TYPE = {"None": 0, "DepositAsset": 1}
+RATE_PRECISION = 10 ** 9
+BASIS_POINT = RATE_PRECISION // 10000
+# Markets cannot trade past this proportion of fCash
+MAX_MARKET_PROPORTION = 96 * RATE_PRECISION // 100
+INT88_MAX = 2 ** 87 - 1
+UINT88_MAX = 2 ** 88 - 1
+
+
+def _encode_trade(actionType, marketIndex, amount, minImpliedRate=0, maxImpliedRate=0):
+    # Same bit layout as EncodeDecode.encode*Trade, returned as bytes32
+    (amount, minImpliedRate, maxImpliedRate) = (int(amount), int(minImpliedRate), int(maxImpliedRate))
+    value = (
+        (actionType << 248)
+        | (marketIndex << 240)
+        | (amount << 152)
+        | (minImpliedRate << 120)
+        | (maxImpliedRate << 88)
+    )
+    return value.to_bytes(32, "big")
+
+
+def encode_lend_trade(marketIndex, fCashAmount, minImpliedRate=0):
+    return _encode_trade(TRADE_ACTION_TYPE["Lend"], marketIndex, fCashAmount, minImpliedRate)
+
+
+def encode_borrow_trade(marketIndex, fCashAmount, maxImpliedRate=0):
+    # The borrow slippage limit shares the same bit position as the lend limit
+    return _encode_trade(TRADE_ACTION_TYPE["Borrow"], marketIndex, fCashAmount, maxImpliedRate)
+
+
+def encode_add_liquidity(marketIndex, assetCashAmount, minImpliedRate=0, maxImpliedRate=0):
+    return _encode_trade(
+        TRADE_ACTION_TYPE["AddLiquidity"],
+        marketIndex,
+        assetCashAmount,
+        minImpliedRate,
+        maxImpliedRate,
+    )
+
+
+def encode_remove_liquidity(marketIndex, tokenAmount, minImpliedRate=0, maxImpliedRate=0):
+    return _encode_trade(
+        TRADE_ACTION_TYPE["RemoveLiquidity"],
+        marketIndex,
+        tokenAmount,
+        minImpliedRate,
+        maxImpliedRate,
+    )
+
+
+def encode_purchase_ntoken_residual(maturity, fCashResidualAmount):
+    # int88 amounts are stored as 88 bit two's complement
+    value = (
+        (TRADE_ACTION_TYPE["PurchaseNTokenResidual"] << 248)
+        | (maturity << 216)
+        | ((int(fCashResidualAmount) & UINT88_MAX) << 128)
+    )
+    return value.to_bytes(32, "big")
+
+
+def encode_settle_cash_debt(counterparty, fCashAmountToSettle):
+    value = (
+        (TRADE_ACTION_TYPE["SettleCashDebt"] << 248)
+        | (int(str(counterparty), 16) << 88)
+        | (int(fCashAmountToSettle) & UINT88_MAX)
+    )
+    return value.to_bytes(32, "big")
+
+
+def encode_offsetting_trade(notional, maturity, blockTime):
+    """Mirrors EncodeDecode.encodeOffsettingTrade, returns (trade, success)"""
+    if notional == 0:
+        return (bytes(32), False)
+    (marketIndex, isIdiosyncratic) = get_market_index(MAX_TRADED_MARKET_INDEX, maturity, blockTime)
+    # Cannot trade out of an idiosyncratic asset
+    if isIdiosyncratic:
+        return (bytes(32), False)
+
+    if not (-INT88_MAX - 1 < notional < INT88_MAX):
+        raise Exception("Notional overflow")
+    if notional > 0:
+        return (encode_borrow_trade(marketIndex, abs(notional)), True)
+    return (encode_lend_trade(marketIndex, abs(notional)), True)
+
+
+def encode_offsetting_trades_from_arrays(fCashMaturities, fCashNotional, blockTime):
+    """Mirrors EncodeDecode.encodeOffsettingTradesFromArrays"""
+    if len(fCashMaturities) != len(fCashNotional):
+        raise Exception("Trade Length Mismatch")
+
+    trades = []
+    for (maturity, notional) in zip(fCashMaturities, fCashNotional):
+        (trade, success) = encode_offsetting_trade(notional, maturity, blockTime)
+        if success:
+            trades.append(trade)
+    return trades
+
+
+def encode_offsetting_trades_from_portfolio(portfolio, fCashCurrency, blockTime):
+    """Mirrors EncodeDecode.encodeOffsettingTradesFromPortfolio, portfolio assets are
+    (currencyId, maturity, assetType, notional, ...) tuples as returned by getAccountPortfolio"""
+    trades = []
+    for asset in portfolio:
+        (currencyId, maturity, assetType, notional) = asset[0:4]
+        if currencyId != fCashCurrency:
+            continue
+        elif assetType == FCASH_ASSET_TYPE:
+            (trade, success) = encode_offsetting_trade(notional, maturity, blockTime)
+            if success:
+                trades.append(trade)
+        else:
+            # Liquidity tokens past their settlement date will be settled instead
+            if get_settlement_date(assetType, maturity) <= blockTime:
+                continue
+            (marketIndex, _) = get_market_index(MAX_TRADED_MARKET_INDEX, maturity, blockTime)
+            if not (0 < notional < UINT88_MAX):
+                raise Exception("Invalid liquidity token amount")
+            trades.append(encode_remove_liquidity(marketIndex, notional))
+    return trades
+
+
+def _market_underlying_cash(market, assetRate):
+    # AssetRate.convertToUnderlying, market cash is asset cash in internal precision
+    (_, rate, underlyingDecimals) = assetRate
+    return market[3] * rate // 10 ** 10 // underlyingDecimals
+
+
+def plan_offsetting_trades(
+    fCashMaturities, fCashNotional, markets, assetRate, blockTime, slippageBasisPoints=50
+):
+    """
+    Decides which fCash can be traded out of at which market index before sending a transaction.
+    `markets` are MarketParameters tuples from getActiveMarkets and `assetRate` is the
+    AssetRateParameters tuple from getCurrencyAndRates. Returns the slippage limited trades plus
+    the maturities and notionals that were skipped with the reason why.
+    """
+    plan = {"trades": [], "maturities": [], "notional": [], "skipped": []}
+    slippage = slippageBasisPoints * BASIS_POINT
+    marketsByMaturity = {m[1]: m for m in markets}
+    lastMaturity = max(marketsByMaturity.keys(), default=0)
+
+    for (maturity, notional) in zip(fCashMaturities, fCashNotional):
+        if notional == 0:
+            continue
+        if maturity > lastMaturity:
+            # get_market_index has no market to round up to
+            plan["skipped"].append((maturity, notional, "No market for maturity"))
+            continue
+        (marketIndex, isIdiosyncratic) = get_market_index(len(markets), maturity, blockTime)
+        market = marketsByMaturity.get(maturity)
+        if isIdiosyncratic or market is None:
+            plan["skipped"].append((maturity, notional, "Idiosyncratic maturity"))
+            continue
+
+        (totalfCash, lastImpliedRate) = (market[2], market[5])
+        if notional > 0:
+            # Selling fCash to the market, conservatively assumes the cash removed from the market
+            # equals the fCash added
+            totalCash = _market_underlying_cash(market, assetRate)
+            proportion = (totalfCash + notional) * RATE_PRECISION // (totalfCash + totalCash)
+            if proportion > MAX_MARKET_PROPORTION:
+                plan["skipped"].append((maturity, notional, "Insufficient market liquidity"))
+                continue
+            trade = encode_borrow_trade(marketIndex, notional, lastImpliedRate + slippage)
+        else:
+            # Buying fCash from the market, cannot buy more fCash than the market holds
+            if -notional >= totalfCash:
+                plan["skipped"].append((maturity, notional, "Insufficient market liquidity"))
+                continue
+            trade = encode_lend_trade(marketIndex, -notional, max(lastImpliedRate - slippage, 0))
+
+        plan["trades"].append(trade)
+        plan["maturities"].append(maturity)
+        plan["notional"].append(notional)
+
+    return plan
+
+
+def offsetting_balance_action(
+    currencyId, trades, depositActionAmount=0, redeemToUnderlying=False
+):
+    """BalanceActionWithTrades equivalent to the one built in NotionalV2BaseLiquidator._sellfCashAssets"""
+    return (
+        DEPOSIT_ACTION_TYPE["DepositAsset"] if depositActionAmount > 0 else DEPOSIT_ACTION_TYPE["None"],
+        currencyId,
+        int(depositActionAmount),
+        0,
+        True,
+        redeemToUnderlying,
+        trades,
+    )
@@ -0,0 +1,296 @@
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+from brownie import web3
+from brownie.network.event import _decode_logs
+from scripts.date_time import FCASH_ASSET_TYPE, MAX_TRADED_MARKET_INDEX, get_market_index
+from scripts.metrics import ACCOUNTS_SCANNED, cache_children
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+# Events that change account state in ways that cannot be applied as deltas, the account is
+# fully read again on the next access. Value is the list of event args naming affected accounts.
+FULL_READ_EVENTS = {
+    "AccountSettled": ["account"],
+    "SettledCashDebt": ["settledAccount", "settler"],
+    "LiquidateLocalCurrency": ["liquidated", "liquidator"],
+    "LiquidateCollateralCurrency": ["liquidated", "liquidator"],
+    "LiquidatefCashEvent": ["liquidated", "liquidator"],
+}
+PORTFOLIO_SCANNED = ACCOUNTS_SCANNED.labels("portfolio_cache")
+PORTFOLIO_LOOKUPS = cache_children("portfolio")
+
+
+def decode_erc1155_id(id):
+    """Mirrors TransferHelper.decodeERC1155Id, returns (currencyId, maturity, assetType)"""
+    return ((id >> 48) & 0xFFFF, (id >> 8) & 0xFFFFFFFFFF, id & 0xFF)
+
+
+def encode_erc1155_id(currencyId, maturity, assetType):
+    return (currencyId << 48) | (maturity << 8) | assetType
+
+
+def _nonzero(balances):
+    return {k: v for (k, v) in balances.items() if v != [0, 0]}
+
+
+class PortfolioArrays:
+    """
+    Column oriented portfolio for a single account, matches the first four fields of
+    getAccountPortfolio. Notionals are stored as signed 64 bit integers, internal precision
+    balances above 2^63 / 1e8 tokens do not fit and raise an OverflowError.
+    """
+
+    __slots__ = ("currencyIds", "maturities", "assetTypes", "notionals")
+
+    def __init__(self, assets=()):
+        self.currencyIds = array("H")
+        self.maturities = array("Q")
+        self.assetTypes = array("B")
+        self.notionals = array("q")
+        for (currencyId, maturity, assetType, notional) in assets:
+            self.update(currencyId, maturity, assetType, notional)
+
+    def __len__(self):
+        return len(self.notionals)
+
+    def _find(self, currencyId, maturity, assetType):
+        for i in range(len(self.notionals)):
+            if (
+                self.maturities[i] == maturity
+                and self.currencyIds[i] == currencyId
+                and self.assetTypes[i] == assetType
+            ):
+                return i
+        return -1
+
+    def update(self, currencyId, maturity, assetType, delta):
+        """Adds delta to the asset, removing it when the notional nets off to zero"""
+        delta = int(delta)
+        i = self._find(currencyId, maturity, assetType)
+        if i == -1:
+            if delta == 0:
+                return
+            self.currencyIds.append(currencyId)
+            self.maturities.append(maturity)
+            self.assetTypes.append(assetType)
+            self.notionals.append(delta)
+            return
+
+        notional = self.notionals[i] + delta
+        if notional != 0:
+            self.notionals[i] = notional
+            return
+
+        for column in (self.currencyIds, self.maturities, self.assetTypes, self.notionals):
+            del column[i]
+
+    def to_list(self):
+        """Assets sorted the same way as getAccountPortfolio"""
+        return sorted(
+            zip(self.currencyIds, self.maturities, self.assetTypes, self.notionals),
+            key=lambda a: (a[0], a[1], a[2]),
+        )
+
+
+class CachedAccount:
+    __slots__ = ("context", "balances", "portfolio", "lastReadBlock", "dirty")
+
+    def __init__(self, context, balances, portfolio, lastReadBlock):
+        self.context = context
+        # currencyId => [cashBalance, nTokenBalance]
+        self.balances = balances
+        self.portfolio = portfolio
+        self.lastReadBlock = lastReadBlock
+        self.dirty = False
+
+
+class PortfolioCache:
+    """
+    Keeps the context, balances and portfolio of tracked accounts in memory. Notional events are
+    applied as deltas and accounts are fully read again every `reconcileInterval` blocks, or sooner
+    when an event cannot be applied as a delta (settlement, liquidation).
+    """
+
+    def __init__(self, notional, reconcileInterval=1000, maxWorkers=16):
+        self.notional = notional
+        self.reconcileInterval = reconcileInterval
+        self.maxWorkers = maxWorkers
+        self.accounts = {}
+        self.lastPolledBlock = None
+        # Number of full reads that did not match the cached state
+        self.drift = 0
+
+    def _read(self, account, blockNumber):
+        PORTFOLIO_SCANNED.inc()
+        (context, balances, portfolio) = self.notional.getAccount(
+            account, block_identifier=blockNumber
+        )
+        return CachedAccount(
+            context,
+            {b[0]: [b[1], b[2]] for b in balances if b[0] != 0},
+            PortfolioArrays(a[0:4] for a in portfolio),
+            blockNumber,
+        )
+
+    def _read_all(self, accountList, blockNumber):
+        with ThreadPoolExecutor(max_workers=self.maxWorkers) as executor:
+            results = executor.map(lambda a: self._read(a, blockNumber), accountList)
+            return dict(zip(accountList, results))
+
+    def track(self, accountList, blockNumber=None):
+        """Reads the full state of each account at a pinned block and starts tracking it"""
+        blockNumber = web3.eth.block_number if blockNumber is None else blockNumber
+        self.accounts.update(self._read_all(accountList, blockNumber))
+        if self.lastPolledBlock is None:
+            self.lastPolledBlock = blockNumber
+
+    def untrack(self, account):
+        self.accounts.pop(account, None)
+
+    def _get(self, account):
+        cached = self.accounts[account]
+        PORTFOLIO_LOOKUPS[not cached.dirty].inc()
+        if cached.dirty:
+            # Read at the last applied block so that later events are not counted twice
+            cached = self._read(account, self.lastPolledBlock)
+            self.accounts[account] = cached
+        return cached
+
+    def get_context(self, account):
+        cached = self._get(account)
+        if cached.context is None:
+            cached.context = self.notional.getAccountContext(
+                account, block_identifier=self.lastPolledBlock
+            )
+        return cached.context
+
+    def get_balance(self, currencyId, account):
+        """Returns (cashBalance, nTokenBalance), the same as the first two fields of getAccountBalance"""
+        return tuple(self._get(account).balances.get(currencyId, [0, 0]))
+
+    def get_portfolio(self, account):
+        return self._get(account).portfolio.to_list()
+
+    def _tracked(self, account, blockNumber):
+        # Events at or before the last full read are already reflected in the cache
+        cached = self.accounts.get(account)
+        if cached is None or cached.dirty or blockNumber <= cached.lastReadBlock:
+            return None
+        return cached
+
+    def _update_balance(self, cached, currencyId, index, delta):
+        balance = cached.balances.setdefault(currencyId, [0, 0])
+        balance[index] += delta
+
+    def apply_event(self, name, args, blockNumber, blockTime=None):
+        """Applies a single decoded Notional event to any tracked accounts it touches"""
+        if name == "TransferSingle" or name == "TransferBatch":
+            if name == "TransferSingle":
+                transfers = [(args["id"], args["value"])]
+            else:
+                transfers = zip(args["ids"], args["values"])
+
+            for (id, value) in transfers:
+                (currencyId, maturity, assetType) = decode_erc1155_id(id)
+                for (account, sign) in ((args["from"], -1), (args["to"], 1)):
+                    cached = self._tracked(account, blockNumber) if account != ZERO_ADDRESS else None
+                    if cached is not None:
+                        cached.portfolio.update(currencyId, maturity, assetType, sign * value)
+
+        elif name == "LendBorrowTrade":
+            cached = self._tracked(args["account"], blockNumber)
+            if cached is not None:
+                cached.portfolio.update(
+                    args["currencyId"], args["maturity"], FCASH_ASSET_TYPE, args["netfCash"]
+                )
+
+        elif name == "AddRemoveLiquidity":
+            cached = self._tracked(args["account"], blockNumber)
+            if cached is not None:
+                if blockTime is None:
+                    blockTime = web3.eth.get_block(blockNumber)["timestamp"]
+                (marketIndex, _) = get_market_index(
+                    MAX_TRADED_MARKET_INDEX, args["maturity"], blockTime
+                )
+                cached.portfolio.update(
+                    args["currencyId"], args["maturity"], FCASH_ASSET_TYPE, args["netfCash"]
+                )
+                # Liquidity token asset types are the market index plus one
+                cached.portfolio.update(
+                    args["currencyId"], args["maturity"], marketIndex + 1, args["netLiquidityTokens"]
+                )
+
+        elif name == "CashBalanceChange":
+            cached = self._tracked(args["account"], blockNumber)
+            if cached is not None:
+                self._update_balance(cached, args["currencyId"], 0, args["netCashChange"])
+
+        elif name == "nTokenSupplyChange":
+            cached = self._tracked(args["account"], blockNumber)
+            if cached is not None:
+                self._update_balance(cached, args["currencyId"], 1, args["tokenSupplyChange"])
+
+        elif name == "AccountContextUpdate":
+            # Context is read again lazily, it is updated by almost every transaction
+            cached = self._tracked(args["account"], blockNumber)
+            if cached is not None:
+                cached.context = None
+
+        elif name in FULL_READ_EVENTS:
+            for key in FULL_READ_EVENTS[name]:
+                cached = self._tracked(args[key], blockNumber)
+                if cached is not None:
+                    cached.dirty = True
+
+    def apply_transaction(self, tx):
+        """Applies the events of a brownie TransactionReceipt"""
+        for event in tx.events:
+            if event.address == self.notional.address:
+                self.apply_event(event.name, event, tx.block_number, tx.timestamp)
+        self.lastPolledBlock = max(self.lastPolledBlock or 0, tx.block_number)
+
+    def poll(self, toBlock=None):
+        """Fetches and applies all Notional events since the last poll"""
+        toBlock = web3.eth.block_number if toBlock is None else toBlock
+        if self.lastPolledBlock is None or toBlock <= self.lastPolledBlock:
+            return
+
+        logs = web3.eth.get_logs(
+            {"address": self.notional.address, "fromBlock": self.lastPolledBlock + 1, "toBlock": toBlock}
+        )
+        logsByBlock = {}
+        for log in logs:
+            logsByBlock.setdefault(log["blockNumber"], []).append(log)
+
+        for blockNumber in sorted(logsByBlock.keys()):
+            for event in _decode_logs(logsByBlock[blockNumber]):
+                self.apply_event(event.name, event, blockNumber)
+
+        self.lastPolledBlock = toBlock
+
+    def reconcile(self, blockNumber=None):
+        """
+        Fully reads any account that is dirty or has not been read for `reconcileInterval` blocks,
+        returns the accounts whose cached state did not match
+        """
+        blockNumber = web3.eth.block_number if blockNumber is None else blockNumber
+        # Apply pending events first so that the comparison is made at the same block
+        self.poll(blockNumber)
+        stale = [
+            account
+            for (account, cached) in self.accounts.items()
+            if cached.dirty or cached.lastReadBlock + self.reconcileInterval <= blockNumber
+        ]
+
+        mismatched = []
+        for (account, fresh) in self._read_all(stale, blockNumber).items():
+            cached = self.accounts[account]
+            if not cached.dirty and (
+                cached.portfolio.to_list() != fresh.portfolio.to_list()
+                or _nonzero(cached.balances) != _nonzero(fresh.balances)
+            ):
+                mismatched.append(account)
+            self.accounts[account] = fresh
+
+        self.drift += len(mismatched)
+        return mismatched
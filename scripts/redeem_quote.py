@@ -0,0 +1,118 @@
+import json
+
+from brownie import WrappedfCash, network, web3
+from brownie.network.contract import Contract
+from scripts.asset_rate import convert_from_underlying, convert_to_underlying
+from scripts.date_time import MAX_TRADED_MARKET_INDEX, get_market_index
+from scripts.environment import load_notional
+from scripts.liquidation_simulator import decode_revert_reason
+from scripts.market_math import MAX_IMPLIED_RATE, calculate_trade
+from scripts.offsetting_trades import BASIS_POINT
+
+INTERNAL_TOKEN_PRECISION = 10 ** 8
+
+
+def _matured_cash_claim(notional, wrapper, currencyId, maturity, amount, block):
+    # Mirrors the post maturity branch of WrappedfCash._burn, fCash that has not been settled yet
+    # is valued at the settlement rate
+    (cashBalance, _, _) = notional.getAccountBalance(currencyId, wrapper.address, block_identifier=block)
+    fCash = sum(
+        a[3]
+        for a in notional.getAccountPortfolio(wrapper.address, block_identifier=block)
+        if a[0] == currencyId and a[1] == maturity
+    )
+    settlementRate = notional.getSettlementRate(currencyId, maturity, block_identifier=block)
+    totalCash = cashBalance + convert_from_underlying(settlementRate, fCash)
+    return totalCash * int(amount) // wrapper.totalSupply(block_identifier=block)
+
+
+def _check(wrapper, holder, amount, opts, block):
+    """Runs redeem as an eth_call from the holder, returns the revert reason or None"""
+    tx = {"from": holder, "to": wrapper.address, "data": wrapper.redeem.encode_input(amount, opts)}
+    result = web3.provider.make_request("eth_call", [tx, hex(block)])
+    return decode_revert_reason(result["error"]) if "error" in result else None
+
+
+def quote_redeem(
+    notional,
+    wrapper,
+    holder,
+    amount,
+    slippageBasisPoints=50,
+    toUnderlying=True,
+    receiver=None,
+    transferfCash=False,
+    blockNumber=None,
+):
+    """
+    Pre-flight for WrappedfCash.redeem. Chooses between the post maturity, sell and transferfCash
+    paths, models the cash out and a maxImpliedRate `slippageBasisPoints` above the modeled post
+    trade rate, then checks the resulting RedeemOpts with a single eth_call from the holder. The
+    sell path falls back to transferring fCash when the market cannot absorb the amount.
+    """
+    block = web3.eth.block_number if blockNumber is None else blockNumber
+    blockTime = web3.eth.get_block(block)["timestamp"]
+    receiver = holder if receiver is None else receiver
+    amount = int(amount)
+    (currencyId, maturity) = wrapper.getDecodedID()
+    (_, _, _, assetRate) = notional.getCurrencyAndRates(currencyId, block_identifier=block)
+
+    quote = {"path": None, "reason": None, "assetCash": 0, "impliedRate": None, "maxImpliedRate": 0}
+    if maturity <= blockTime:
+        quote["path"] = "matured"
+        quote["assetCash"] = _matured_cash_claim(notional, wrapper, currencyId, maturity, amount, block)
+    elif transferfCash:
+        quote["path"] = "transferfCash"
+    else:
+        markets = notional.getActiveMarkets(currencyId, block_identifier=block)
+        # The wrapper always derives its index against the maximum number of markets
+        (marketIndex, isIdiosyncratic) = get_market_index(MAX_TRADED_MARKET_INDEX, maturity, blockTime)
+        trade = None
+        if isIdiosyncratic or marketIndex > len(markets):
+            quote["reason"] = "Idiosyncratic maturity"
+        else:
+            cashGroup = notional.getCashGroup(currencyId, block_identifier=block)
+            trade = calculate_trade(
+                markets[marketIndex - 1], cashGroup, assetRate, -amount, maturity - blockTime, marketIndex
+            )
+            if trade is None:
+                quote["reason"] = "Insufficient market liquidity"
+
+        if trade is None:
+            quote["path"] = "transferfCash"
+        else:
+            (netCashToAccount, _, impliedRate) = trade
+            quote["path"] = "sell"
+            quote["assetCash"] = convert_from_underlying(assetRate, netCashToAccount)
+            quote["impliedRate"] = impliedRate
+            quote["maxImpliedRate"] = min(impliedRate + slippageBasisPoints * BASIS_POINT, MAX_IMPLIED_RATE)
+
+    # Expected tokens received in external precision
+    if quote["path"] == "transferfCash":
+        quote["expectedCash"] = 0
+    elif toUnderlying:
+        (_, precision) = wrapper.getUnderlyingToken()
+        underlying = convert_to_underlying(assetRate, quote["assetCash"])
+        quote["expectedCash"] = underlying * precision // INTERNAL_TOKEN_PRECISION
+    else:
+        (_, precision, _) = wrapper.getAssetToken()
+        quote["expectedCash"] = quote["assetCash"] * precision // INTERNAL_TOKEN_PRECISION
+
+    quote["opts"] = (toUnderlying, quote["path"] == "transferfCash", receiver, quote["maxImpliedRate"])
+    quote["revertReason"] = _check(wrapper, holder, amount, quote["opts"], block)
+    quote["success"] = quote["revertReason"] is None
+    return quote
+
+
+def main(wrapperAddress, holder, amount, slippageBasisPoints=50, toUnderlying=True):
+    """
+    brownie run scripts/redeem_quote.py main <wrapper> <holder> <amount> <slippageBPS> --network mainnet-fork
+    Prints the redemption path, expected cash and the RedeemOpts to send
+    """
+    notional = load_notional()
+    wrapper = Contract.from_abi("Wrapper", wrapperAddress, WrappedfCash.abi)
+    toUnderlying = toUnderlying in (True, "true", "True", "1")
+
+    quote = quote_redeem(notional, wrapper, holder, int(amount), int(slippageBasisPoints), toUnderlying)
+    print("Network: {}".format(network.show_active()))
+    print(json.dumps(quote, indent=2, default=str))
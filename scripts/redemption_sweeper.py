@@ -0,0 +1,90 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from brownie import WrappedfCash, accounts, network, web3
+from brownie.convert import to_address
+from brownie.exceptions import VirtualMachineError
+from brownie.network.contract import Contract
+from scripts.metrics import ACCOUNTS_SCANNED, ACTION_GAS
+
+TRANSFER_TOPIC = "0x" + bytes(web3.keccak(text="Transfer(address,address,uint256)")).hex()
+SWEEPER_SCANNED = ACCOUNTS_SCANNED.labels("redemption_sweeper")
+BATCH_REDEEM_GAS = ACTION_GAS.labels("batchRedeemMatured")
+
+
+def find_holders(wrapper, fromBlock=0, toBlock="latest"):
+    """Returns every account that has received the wrapper, in the order they first received it"""
+    logs = web3.eth.get_logs(
+        {"address": wrapper.address, "fromBlock": fromBlock, "toBlock": toBlock, "topics": [TRANSFER_TOPIC]}
+    )
+    holders = {}
+    for log in logs:
+        holders.setdefault(to_address("0x" + bytes(log["topics"][2])[-20:].hex()), None)
+    return list(holders.keys())
+
+
+def redeemable(wrapper, keeper, holders, maxWorkers=16):
+    """Filters holders to those with a balance that have authorized the keeper as an operator"""
+
+    def read(holder):
+        SWEEPER_SCANNED.inc()
+        return (holder, wrapper.balanceOf(holder), wrapper.isOperatorFor(keeper, holder))
+
+    with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+        return [h for (h, balance, isOperator) in executor.map(read, holders) if balance > 0 and isOperator]
+
+
+def _sweep_chunk(wrapper, keeper, chunk, toUnderlying, results):
+    try:
+        txn = wrapper.batchRedeemMatured(chunk, toUnderlying, {"from": keeper})
+        results["batches"].append({"holders": len(chunk), "gas": txn.gas_used})
+        BATCH_REDEEM_GAS.observe(txn.gas_used)
+    except VirtualMachineError as e:
+        # A single holder can fail the batch (i.e. a contract rejecting ETH), split until it is isolated
+        if len(chunk) == 1:
+            results["failed"][chunk[0]] = e.revert_msg
+            return
+        mid = len(chunk) // 2
+        _sweep_chunk(wrapper, keeper, chunk[:mid], toUnderlying, results)
+        _sweep_chunk(wrapper, keeper, chunk[mid:], toUnderlying, results)
+
+
+def sweep(wrapper, keeper, holders, toUnderlying=False, chunkSize=100):
+    """
+    Redeems every holder's balance of a matured wrapper in batches of `chunkSize`. The wrapper is
+    settled by the first batch, later batches only withdraw. Returns a report of gas and throughput.
+    """
+    results = {"batches": [], "failed": {}}
+    start = time.time()
+    for i in range(0, len(holders), chunkSize):
+        _sweep_chunk(wrapper, keeper, holders[i : i + chunkSize], toUnderlying, results)
+    elapsed = time.time() - start
+
+    redeemed = sum(b["holders"] for b in results["batches"])
+    totalGas = sum(b["gas"] for b in results["batches"])
+    return {
+        "holders": len(holders),
+        "redeemed": redeemed,
+        "failed": results["failed"],
+        "batches": len(results["batches"]),
+        "totalGas": totalGas,
+        "gasPerHolder": totalGas // redeemed if redeemed else 0,
+        "elapsedSeconds": round(elapsed, 2),
+        "holdersPerSecond": round(redeemed / elapsed, 2) if elapsed > 0 else 0,
+    }
+
+
+def main(wrapperAddress, keeper, chunkSize=100, toUnderlying=False):
+    """
+    brownie run scripts/redemption_sweeper.py main <wrapper> <keeper> <chunkSize> --network mainnet-fork
+    Holders must have authorized the keeper with authorizeOperator on the wrapper
+    """
+    wrapper = Contract.from_abi("Wrapper", wrapperAddress, WrappedfCash.abi)
+    keeper = accounts.at(keeper, force=True)
+    toUnderlying = toUnderlying in (True, "true", "True", "1")
+
+    holders = redeemable(wrapper, keeper, find_holders(wrapper))
+    report = sweep(wrapper, keeper, holders, toUnderlying, int(chunkSize))
+    print("Network: {}".format(network.show_active()))
+    print(json.dumps(report, indent=2))
@@ -0,0 +1,172 @@
+import gzip
+import json
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+
+import requests
+
+RECORD = "record"
+REPLAY = "replay"
+
+
+def _key(request):
+    # Request ids differ between runs, the method and params at a pinned block do not
+    return json.dumps([request["method"], request.get("params", [])], sort_keys=True)
+
+
+class Cassette:
+    """
+    Gzipped JSON of upstream JSON-RPC responses keyed by method and params, plus the block the fork
+    was pinned to when they were recorded
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.block = None
+        self.responses = {}
+        self._lock = Lock()
+        if os.path.exists(path):
+            with gzip.open(path, "rt") as f:
+                data = json.load(f)
+            self.block = data["block"]
+            self.responses = data["responses"]
+
+    def get(self, request):
+        return self.responses.get(_key(request))
+
+    def put(self, request, response):
+        with self._lock:
+            self.responses[_key(request)] = response
+
+    def save(self):
+        with self._lock:
+            data = {"block": self.block, "responses": self.responses}
+        with gzip.open(self.path + ".tmp", "wt") as f:
+            json.dump(data, f, sort_keys=True)
+        os.replace(self.path + ".tmp", self.path)
+
+
+class CassetteProxy:
+    """
+    JSON-RPC proxy that sits between a local fork node and its archive node. In record mode every
+    request is forwarded upstream and the result stored, in replay mode results are served from the
+    cassette and a request that was never recorded is answered with an error, no network is used.
+    The fork must be pinned to a block for the node's requests to repeat between runs.
+    """
+
+    def __init__(self, cassette, mode=REPLAY, upstream=None, port=0):
+        if mode == RECORD and upstream is None:
+            raise Exception("Recording requires an upstream node")
+        self.cassette = cassette
+        self.mode = mode
+        self.upstream = upstream
+        self.port = port
+        self.misses = 0
+        self._session = requests.Session()
+        self._server = None
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:{}".format(self._server.server_address[1])
+
+    def pin_block(self):
+        """Block to fork from, the upstream head when recording a new cassette"""
+        if self.cassette.block is None:
+            if self.mode == REPLAY:
+                raise Exception("Cassette {} has not been recorded".format(self.cassette.path))
+            response = self._forward({"jsonrpc": "2.0", "id": 0, "method": "eth_blockNumber", "params": []})
+            self.cassette.block = int(response["result"], 16)
+        return self.cassette.block
+
+    def _forward(self, request):
+        response = self._session.post(self.upstream, json=request, timeout=300)
+        response.raise_for_status()
+        return response.json()
+
+    def handle(self, request):
+        if self.mode == REPLAY:
+            recorded = self.cassette.get(request)
+            if recorded is None:
+                self.misses += 1
+                return {
+                    "jsonrpc": "2.0",
+                    "id": request.get("id"),
+                    "error": {"code": -32000, "message": "Not in cassette: {}".format(_key(request))},
+                }
+            return dict(recorded, id=request.get("id"))
+
+        response = self._forward(request)
+        if "error" not in response:
+            self.cassette.put(request, {k: v for (k, v) in response.items() if k != "id"})
+        return response
+
+    def start(self):
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                if type(request) == list:
+                    response = [proxy.handle(r) for r in request]
+                else:
+                    response = proxy.handle(request)
+                body = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
+        if self.mode == RECORD:
+            self.cassette.save()
+
+
+def use_cassette(networks, networkId, path, mode=REPLAY):
+    """
+    Points the fork of a brownie development network at a cassette proxy and pins the fork block,
+    `networks` is brownie's CONFIG.networks. Must run before brownie connects, returns the started
+    proxy.
+    """
+    if mode == REPLAY and not os.path.exists(path):
+        raise Exception("Cassette {} has not been recorded".format(path))
+    network = networks[networkId]
+    cmdSettings = network["cmd_settings"]
+    (fork, block) = (cmdSettings["fork"], None)
+    (url, pinned, number) = fork.rpartition("@")
+    if pinned and number.isdigit():
+        (fork, block) = (url, number)
+    if fork in networks:
+        # Resolved here the same way brownie resolves a named fork, which it can no longer do
+        forkSettings = networks[fork]
+        fork = forkSettings["host"]
+        network["chainid"] = forkSettings["chainid"]
+        cmdSettings.setdefault("chain_id", int(forkSettings["chainid"]))
+        if "explorer" in forkSettings:
+            network["explorer"] = forkSettings["explorer"]
+
+    cassette = Cassette(path)
+    if cassette.block is None and (block or "fork_block" in cmdSettings):
+        cassette.block = int(block or cmdSettings["fork_block"])
+    upstream = os.path.expandvars(fork) if mode == RECORD else None
+    proxy = CassetteProxy(cassette, mode, upstream).start()
+    block = proxy.pin_block()
+
+    if "hardhat" in network["cmd"]:
+        cmdSettings["fork"] = proxy.url
+        cmdSettings["fork_block"] = block
+    else:
+        # Ganache takes the block as part of the fork url
+        cmdSettings["fork"] = "{}@{}".format(proxy.url, block)
+    return proxy
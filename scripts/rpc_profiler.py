@@ -0,0 +1,171 @@
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+from threading import Lock
+
+from brownie import web3
+from brownie.convert import to_address
+from brownie.network.state import _contract_map
+
+# Calls whose first parameter is a transaction object with a `to` address and calldata
+TX_METHODS = {"eth_call", "eth_estimateGas", "eth_sendTransaction", "eth_createAccessList"}
+PROJECT_DIRS = ("scripts", "tests")
+
+
+def _project_stack(frame):
+    """Names of the project frames (scripts and tests) on the stack, outermost first"""
+    stack = []
+    root = os.getcwd()
+    while frame is not None:
+        path = frame.f_code.co_filename
+        if path.startswith(root) and os.path.relpath(path, root).split(os.sep)[0] in PROJECT_DIRS:
+            if not path.endswith("rpc_profiler.py"):
+                module = os.path.splitext(os.path.relpath(path, root))[0].replace(os.sep, ".")
+                stack.append("{}.{}".format(module, frame.f_code.co_name))
+        frame = frame.f_back
+    return stack[::-1]
+
+
+class RPCProfiler:
+    """
+    Records every JSON-RPC request made through the brownie web3 provider with its latency, payload
+    sizes and the script or test frames that made it. The provider is shared by getEnvironment,
+    setup_env and all contract objects so wrapping it once covers everything.
+
+        with RPCProfiler() as profiler:
+            env = getEnvironment()
+        print(profiler.report())
+    """
+
+    def __init__(self, provider=None):
+        self.provider = web3.provider if provider is None else provider
+        self.calls = []
+        self._lock = Lock()
+        self._makeRequest = None
+
+    def start(self):
+        self._makeRequest = self.provider.make_request
+        # Shadows the bound method on the instance, `stop` removes it again
+        self.provider.make_request = self._profiled
+        self._clear_request_cache()
+        return self
+
+    def stop(self):
+        if self._makeRequest is not None:
+            del self.provider.make_request
+            self._makeRequest = None
+            self._clear_request_cache()
+
+    def _clear_request_cache(self):
+        # web3 caches the middleware chain with the make_request it was built around
+        if hasattr(self.provider, "_request_func_cache"):
+            self.provider._request_func_cache = (None, None)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def _profiled(self, method, params):
+        stack = _project_stack(sys._getframe(1))
+        start = time.perf_counter()
+        response = self._makeRequest(method, params)
+        latency = time.perf_counter() - start
+
+        (to, selector) = (None, None)
+        if method in TX_METHODS and len(params) > 0 and type(params[0]) == dict:
+            to = params[0].get("to")
+            data = params[0].get("data") or params[0].get("input") or "0x"
+            selector = data[0:10] if len(data) >= 10 else None
+
+        call = {
+            "method": method,
+            "to": to,
+            "selector": selector,
+            "latency": latency,
+            "requestBytes": len(json.dumps(params, default=str)),
+            "responseBytes": len(json.dumps(response, default=str)),
+            "stack": stack,
+            "key": json.dumps([method, params], default=str, sort_keys=True),
+        }
+        with self._lock:
+            self.calls.append(call)
+        return response
+
+    def reset(self):
+        with self._lock:
+            self.calls = []
+
+    def _name(self, address, selector):
+        if address is None:
+            return (None, selector)
+        # Only contracts brownie already knows about are named, this never makes a request itself
+        contract = _contract_map.get(to_address(address))
+        if contract is None:
+            return (address, selector)
+        name = contract._name
+        if selector is not None and selector in contract.selectors:
+            return (name, contract.selectors[selector])
+        return (name, selector)
+
+    def report(self):
+        """Totals grouped by method, contract and function, slowest first, plus repeated requests"""
+        groups = defaultdict(lambda: {"count": 0, "seconds": 0.0, "requestBytes": 0, "responseBytes": 0})
+        callers = defaultdict(lambda: {"count": 0, "seconds": 0.0})
+        repeated = defaultdict(int)
+        for call in self.calls:
+            (contract, function) = self._name(call["to"], call["selector"])
+            group = groups[(call["method"], contract, function)]
+            group["count"] += 1
+            group["seconds"] += call["latency"]
+            group["requestBytes"] += call["requestBytes"]
+            group["responseBytes"] += call["responseBytes"]
+
+            caller = callers[call["stack"][-1] if call["stack"] else "<unknown>"]
+            caller["count"] += 1
+            caller["seconds"] += call["latency"]
+            repeated[call["key"]] += 1
+
+        return {
+            "requests": len(self.calls),
+            "seconds": sum(c["latency"] for c in self.calls),
+            "calls": sorted(
+                [dict(method=k[0], contract=k[1], function=k[2], **v) for (k, v) in groups.items()],
+                key=lambda g: -g["seconds"],
+            ),
+            "callers": dict(sorted(callers.items(), key=lambda c: -c[1]["seconds"])),
+            # Identical method and params, anything here that is not a send is a cacheable read
+            "redundant": sum(n - 1 for n in repeated.values()),
+        }
+
+    def folded(self):
+        """Folded stacks weighted by microseconds of latency, the input format of flamegraph.pl"""
+        weights = defaultdict(int)
+        for call in self.calls:
+            (contract, function) = self._name(call["to"], call["selector"])
+            leaf = call["method"] if contract is None else "{}:{}.{}".format(call["method"], contract, function)
+            weights[";".join(call["stack"] + [leaf])] += int(call["latency"] * 1_000_000)
+        return "\n".join("{} {}".format(stack, weight) for (stack, weight) in sorted(weights.items()))
+
+    def write(self, path):
+        """Writes `<path>.json` with the report and `<path>.folded` with the trace"""
+        with open(path + ".json", "w") as f:
+            json.dump(self.report(), f, indent=2)
+        with open(path + ".folded", "w") as f:
+            f.write(self.folded())
+
+
+def main(script, function="main"):
+    """
+    brownie run scripts/rpc_profiler.py main <module> <function> --network mainnet-fork
+    Profiles a script entry point such as `scripts.environment setup_env` and prints the report
+    """
+    import importlib
+
+    with RPCProfiler() as profiler:
+        getattr(importlib.import_module(script), function)()
+    print(json.dumps(profiler.report(), indent=2))
+    profiler.write("rpc_profile")
@@ -0,0 +1,230 @@
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from brownie.network.state import Chain
+from scripts.asset_rate import _div, convert_to_underlying
+from scripts.date_time import FCASH_ASSET_TYPE, is_liquidity_token
+from scripts.offsetting_trades import BASIS_POINT, MAX_MARKET_PROPORTION, RATE_PRECISION
+from scripts.yield_curve import YieldCurve, discount_factor
+
+chain = Chain()
+
+PERCENTAGE_DECIMALS = 100
+FIVE_BASIS_POINTS = 5 * BASIS_POINT
+
+
+def _to_eth(ethRate, underlying):
+    # Mirrors ExchangeRate.convertToETH, haircut applies to positive and buffer to negative balances
+    (rateDecimals, rate, buffer, haircut, _) = ethRate
+    multiplier = haircut if underlying > 0 else buffer
+    return _div(_div(underlying * rate * multiplier, PERCENTAGE_DECIMALS), rateDecimals)
+
+
+class Scenario:
+    """
+    A market shock. `rateShock` is a parallel oracle rate shift in basis points or a list with one shift
+    per market index, `assetRateShock` changes the asset exchange rate in basis points and
+    `liquidityDrain` is the percentage of cash, fCash and liquidity removed from every market.
+    """
+
+    def __init__(self, name, rateShock=0, assetRateShock=0, liquidityDrain=0):
+        self.name = name
+        self.rateShock = rateShock
+        self.assetRateShock = assetRateShock
+        self.liquidityDrain = liquidityDrain
+
+    def _rate_shock(self, marketIndex):
+        if type(self.rateShock) in (list, tuple):
+            return self.rateShock[marketIndex - 1] * BASIS_POINT
+        return self.rateShock * BASIS_POINT
+
+    def apply(self, markets, assetRate):
+        """Returns shocked copies of MarketParameters tuples and the AssetRateParameters tuple"""
+        remaining = PERCENTAGE_DECIMALS - self.liquidityDrain
+        shocked = []
+        for (i, m) in enumerate(markets):
+            (storageSlot, maturity, totalfCash, totalAssetCash, totalLiquidity) = m[0:5]
+            (lastImpliedRate, oracleRate, previousTradeTime) = m[5:8]
+            shift = self._rate_shock(i + 1)
+            shocked.append(
+                (
+                    storageSlot,
+                    maturity,
+                    totalfCash * remaining // PERCENTAGE_DECIMALS,
+                    totalAssetCash * remaining // PERCENTAGE_DECIMALS,
+                    totalLiquidity * remaining // PERCENTAGE_DECIMALS,
+                    max(lastImpliedRate + shift, 0),
+                    max(oracleRate + shift, 0),
+                    previousTradeTime,
+                )
+            )
+
+        (rateOracle, rate, underlyingDecimals) = assetRate
+        rate = rate * (10000 + self.assetRateShock) // 10000
+        return (shocked, (rateOracle, rate, underlyingDecimals))
+
+
+class CurrencySnapshot:
+    """Market state for one currency, every field is a plain tuple so snapshots can be sent to workers"""
+
+    def __init__(self, currencyId, blockTime, markets, assetRate, ethRate, cashGroup):
+        self.currencyId = currencyId
+        self.blockTime = blockTime
+        self.markets = [tuple(int(v) if i > 0 else v for (i, v) in enumerate(m)) for m in markets]
+        self.assetRate = tuple(assetRate)
+        self.ethRate = tuple(ethRate)
+        # (fCashHaircut5BPS, debtBuffer5BPS, liquidityTokenHaircuts)
+        self.cashGroup = (cashGroup[5], cashGroup[4], tuple(cashGroup[9]))
+
+
+def load_snapshots(notional, currencyIds, blockTime=None, maxWorkers=16):
+    blockTime = chain.time() if blockTime is None else blockTime
+
+    def read(currencyId):
+        (_, _, ethRate, assetRate) = notional.getCurrencyAndRates(currencyId)
+        return CurrencySnapshot(
+            currencyId,
+            blockTime,
+            notional.getActiveMarketsAtBlockTime(currencyId, blockTime),
+            assetRate,
+            ethRate,
+            notional.getCashGroup(currencyId),
+        )
+
+    with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+        return {s.currencyId: s for s in executor.map(read, currencyIds)}
+
+
+def load_account(notional, account):
+    """Returns ({currencyId: cashBalance}, portfolio) in the form used by evaluate"""
+    (_, balances, portfolio) = notional.getAccount(account)
+    return (
+        {b[0]: int(b[1]) for b in balances if b[0] != 0},
+        [(a[0], a[1], a[2], int(a[3])) for a in portfolio],
+    )
+
+
+def wrapper_positions(wrappers, holder, maxWorkers=16):
+    """Returns (currencyId, maturity, fCash) for the holder's balance of each WrappedfCash"""
+
+    def read(wrapper):
+        (currencyId, maturity) = wrapper.getDecodedID()
+        return (currencyId, maturity, wrapper.balanceOf(holder))
+
+    with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+        return list(executor.map(read, wrappers))
+
+
+def _risk_adjusted_pv(curve, cashGroup, notional, maturity):
+    # Mirrors AssetHandler.getRiskAdjustedPresentfCashValue
+    (fCashHaircut, debtBuffer, _) = cashGroup
+    rate = curve.rate(maturity)
+    if notional > 0:
+        rate = rate + fCashHaircut * FIVE_BASIS_POINTS
+    else:
+        rate = max(rate - debtBuffer * FIVE_BASIS_POINTS, 0)
+    return _div(notional * discount_factor(rate, maturity - curve.blockTime), RATE_PRECISION)
+
+
+def _free_collateral(snapshots, curves, assetRates, account):
+    """Free collateral in ETH internal precision for ({currencyId: cashBalance}, portfolio)"""
+    (balances, portfolio) = account
+    netUnderlying = {}
+    for (currencyId, cashBalance) in balances.items():
+        netUnderlying[currencyId] = convert_to_underlying(assetRates[currencyId], int(cashBalance))
+
+    for (currencyId, maturity, assetType, notional) in portfolio:
+        notional = int(notional)
+        snapshot = snapshots[currencyId]
+        curve = curves[currencyId]
+        if assetType == FCASH_ASSET_TYPE:
+            value = _risk_adjusted_pv(curve, snapshot.cashGroup, notional, maturity)
+        elif is_liquidity_token(assetType):
+            market = curve.markets[assetType - 2]
+            haircut = snapshot.cashGroup[2][assetType - 2]
+            tokens = notional * haircut // PERCENTAGE_DECIMALS
+            assetCashClaim = tokens * market[3] // market[4]
+            fCashClaim = tokens * market[2] // market[4]
+            value = convert_to_underlying(assetRates[currencyId], assetCashClaim) + _risk_adjusted_pv(
+                curve, snapshot.cashGroup, fCashClaim, maturity
+            )
+        else:
+            raise Exception("Invalid asset type")
+        netUnderlying[currencyId] = netUnderlying.get(currencyId, 0) + value
+
+    return sum(_to_eth(snapshots[c].ethRate, v) for (c, v) in netUnderlying.items())
+
+
+def evaluate(snapshots, scenario, positions, account=None):
+    """
+    Returns ([presentValue], [sellable], freeCollateral) for one scenario. A position is sellable when
+    the shocked market can absorb it without breaching the maximum market proportion.
+    """
+    curves = {}
+    assetRates = {}
+    for (currencyId, snapshot) in snapshots.items():
+        (markets, assetRate) = scenario.apply(snapshot.markets, snapshot.assetRate)
+        curves[currencyId] = YieldCurve(currencyId, snapshot.blockTime, markets)
+        assetRates[currencyId] = assetRate
+
+    values = []
+    sellable = []
+    for (currencyId, maturity, fCash) in positions:
+        curve = curves[currencyId]
+        values.append(curve.present_value(fCash, maturity))
+        if maturity not in curve.maturities:
+            # Idiosyncratic maturities cannot be sold to a market
+            sellable.append(False)
+            continue
+        market = curve.markets[curve.maturities.index(maturity)]
+        totalCash = convert_to_underlying(assetRates[currencyId], market[3])
+        totalfCash = market[2] + int(fCash)
+        sellable.append(
+            totalfCash + totalCash > 0
+            and totalfCash * RATE_PRECISION // (totalfCash + totalCash) <= MAX_MARKET_PROPORTION
+        )
+
+    freeCollateral = 0 if account is None else _free_collateral(snapshots, curves, assetRates, account)
+    return (values, sellable, freeCollateral)
+
+
+def _evaluate_chunk(snapshots, scenarios, positions, account):
+    return [evaluate(snapshots, s, positions, account) for s in scenarios]
+
+
+def run_scenarios(snapshots, scenarios, positions, account=None, maxWorkers=None, chunkSize=16):
+    """
+    Evaluates every scenario against every position across processes. Results are flat arrays in
+    scenario major order, i.e. the value of position j in scenario i is values[i * len(positions) + j].
+    """
+    maxWorkers = os.cpu_count() if maxWorkers is None else maxWorkers
+    chunks = [scenarios[i : i + chunkSize] for i in range(0, len(scenarios), chunkSize)]
+    results = {
+        "scenarios": [s.name for s in scenarios],
+        "values": array("q"),
+        "sellable": array("B"),
+        "freeCollateral": array("q"),
+    }
+
+    with ProcessPoolExecutor(max_workers=maxWorkers) as executor:
+        futures = [
+            executor.submit(_evaluate_chunk, snapshots, chunk, positions, account) for chunk in chunks
+        ]
+        for future in futures:
+            for (values, sellable, freeCollateral) in future.result():
+                results["values"].extend(values)
+                results["sellable"].extend(sellable)
+                results["freeCollateral"].append(freeCollateral)
+
+    return results
+
+
+def scenario_grid(rateShocks, assetRateShocks=(0,), liquidityDrains=(0,)):
+    """Every combination of the given shocks"""
+    return [
+        Scenario("rate{}_asset{}_drain{}".format(r, a, d), r, a, d)
+        for r in rateShocks
+        for a in assetRateShocks
+        for d in liquidityDrains
+    ]
@@ -0,0 +1,491 @@
+import eth_abi
+from eth_abi.packed import encode_abi_packed
+
+# Constants and math are ported from Uniswap V3 TickMath, SqrtPriceMath and SwapMath so that
+# quotes match the pool contracts exactly.
+MIN_TICK = -887272
+MAX_TICK = 887272
+MIN_SQRT_RATIO = 4295128739
+MAX_SQRT_RATIO = 1461446703485210103287273052203988822378723970342
+Q96 = 2 ** 96
+UINT256_MAX = 2 ** 256 - 1
+FEE_DENOMINATOR = 1_000_000
+# Aave V2 flash loan premium, in basis points
+AAVE_FLASH_LOAN_PREMIUM_BPS = 9
+
+TICK_RATIO_MULTIPLIERS = [
+    (0x2, 0xFFF97272373D413259A46990580E213A),
+    (0x4, 0xFFF2E50F5F656932EF12357CF3C7FDCC),
+    (0x8, 0xFFE5CACA7E10E4E61C3624EAA0941CD0),
+    (0x10, 0xFFCB9843D60F6159C9DB58835C926644),
+    (0x20, 0xFF973B41FA98C081472E6896DFB254C0),
+    (0x40, 0xFF2EA16466C96A3843EC78B326B52861),
+    (0x80, 0xFE5DEE046A99A2A811C461F1969C3053),
+    (0x100, 0xFCBE86C7900A88AEDCFFC83B479AA3A4),
+    (0x200, 0xF987A7253AC413176F2B074CF7815E54),
+    (0x400, 0xF3392B0822B70005940C7A398E4B70F3),
+    (0x800, 0xE7159475A2C29B7443B29C7FA6E889D9),
+    (0x1000, 0xD097F3BDFD2022B8845AD8F792AA5825),
+    (0x2000, 0xA9F746462D870FDF8A65DC1F90E061E5),
+    (0x4000, 0x70D869A156D2A1B890BB3DF62BAF32F7),
+    (0x8000, 0x31BE135F97D08FD981231505542FCFA6),
+    (0x10000, 0x9AA508B5B7A84E1C677DE54F3E99BC9),
+    (0x20000, 0x5D6AF8DEDB81196699C329225EE604),
+    (0x40000, 0x2216E584F5FA1EA926041BEDFE98),
+    (0x80000, 0x48A170391F7DC42444E8FA2),
+]
+
+
+def _mul_div(a, b, denominator):
+    return (a * b) // denominator
+
+
+def _mul_div_rounding_up(a, b, denominator):
+    (result, remainder) = divmod(a * b, denominator)
+    return result + 1 if remainder > 0 else result
+
+
+def _div_rounding_up(a, b):
+    return -(-a // b)
+
+
+def get_sqrt_ratio_at_tick(tick):
+    absTick = abs(tick)
+    if absTick > MAX_TICK:
+        raise Exception("Tick out of range")
+
+    ratio = (
+        0xFFFCB933BD6FAD37AA2D162D1A594001
+        if absTick & 0x1 != 0
+        else 0x100000000000000000000000000000000
+    )
+    for (bit, multiplier) in TICK_RATIO_MULTIPLIERS:
+        if absTick & bit != 0:
+            ratio = (ratio * multiplier) >> 128
+
+    if tick > 0:
+        ratio = UINT256_MAX // ratio
+
+    # Divides by 1 << 32 rounding up to go from Q128.128 to Q128.96
+    return (ratio >> 32) + (0 if ratio % (1 << 32) == 0 else 1)
+
+
+def get_tick_at_sqrt_ratio(sqrtPriceX96):
+    """Greatest tick such that get_sqrt_ratio_at_tick(tick) <= sqrtPriceX96"""
+    if sqrtPriceX96 < MIN_SQRT_RATIO or sqrtPriceX96 >= MAX_SQRT_RATIO:
+        raise Exception("Sqrt ratio out of range")
+
+    (low, high) = (MIN_TICK, MAX_TICK)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if get_sqrt_ratio_at_tick(mid) <= sqrtPriceX96:
+            low = mid
+        else:
+            high = mid - 1
+
+    return low
+
+
+def get_amount0_delta(sqrtRatioA, sqrtRatioB, liquidity, roundUp):
+    if sqrtRatioA > sqrtRatioB:
+        (sqrtRatioA, sqrtRatioB) = (sqrtRatioB, sqrtRatioA)
+
+    numerator1 = liquidity << 96
+    numerator2 = sqrtRatioB - sqrtRatioA
+    if roundUp:
+        return _div_rounding_up(
+            _mul_div_rounding_up(numerator1, numerator2, sqrtRatioB), sqrtRatioA
+        )
+    return _mul_div(numerator1, numerator2, sqrtRatioB) // sqrtRatioA
+
+
+def get_amount1_delta(sqrtRatioA, sqrtRatioB, liquidity, roundUp):
+    if sqrtRatioA > sqrtRatioB:
+        (sqrtRatioA, sqrtRatioB) = (sqrtRatioB, sqrtRatioA)
+
+    if roundUp:
+        return _mul_div_rounding_up(liquidity, sqrtRatioB - sqrtRatioA, Q96)
+    return _mul_div(liquidity, sqrtRatioB - sqrtRatioA, Q96)
+
+
+def _next_sqrt_price_from_amount0(sqrtPX96, liquidity, amount, add):
+    if amount == 0:
+        return sqrtPX96
+    numerator1 = liquidity << 96
+
+    if add:
+        product = amount * sqrtPX96
+        # Mirrors the overflow checks on the 256 bit intermediate values
+        if product <= UINT256_MAX and numerator1 + product <= UINT256_MAX:
+            return _mul_div_rounding_up(numerator1, sqrtPX96, numerator1 + product)
+        return _div_rounding_up(numerator1, numerator1 // sqrtPX96 + amount)
+    else:
+        product = amount * sqrtPX96
+        if product > UINT256_MAX or numerator1 <= product:
+            raise Exception("Insufficient liquidity")
+        return _mul_div_rounding_up(numerator1, sqrtPX96, numerator1 - product)
+
+
+def _next_sqrt_price_from_amount1(sqrtPX96, liquidity, amount, add):
+    if add:
+        return sqrtPX96 + _mul_div(amount, Q96, liquidity)
+
+    quotient = _mul_div_rounding_up(amount, Q96, liquidity)
+    if sqrtPX96 <= quotient:
+        raise Exception("Insufficient liquidity")
+    return sqrtPX96 - quotient
+
+
+def get_next_sqrt_price_from_input(sqrtPX96, liquidity, amountIn, zeroForOne):
+    if zeroForOne:
+        return _next_sqrt_price_from_amount0(sqrtPX96, liquidity, amountIn, True)
+    return _next_sqrt_price_from_amount1(sqrtPX96, liquidity, amountIn, True)
+
+
+def get_next_sqrt_price_from_output(sqrtPX96, liquidity, amountOut, zeroForOne):
+    if zeroForOne:
+        return _next_sqrt_price_from_amount1(sqrtPX96, liquidity, amountOut, False)
+    return _next_sqrt_price_from_amount0(sqrtPX96, liquidity, amountOut, False)
+
+
+def compute_swap_step(sqrtRatioCurrent, sqrtRatioTarget, liquidity, amountRemaining, feePips):
+    """Returns (sqrtRatioNext, amountIn, amountOut, feeAmount) as in SwapMath.computeSwapStep"""
+    zeroForOne = sqrtRatioCurrent >= sqrtRatioTarget
+    exactIn = amountRemaining >= 0
+    amountIn = 0
+    amountOut = 0
+
+    if exactIn:
+        amountRemainingLessFee = _mul_div(
+            amountRemaining, FEE_DENOMINATOR - feePips, FEE_DENOMINATOR
+        )
+        amountIn = (
+            get_amount0_delta(sqrtRatioTarget, sqrtRatioCurrent, liquidity, True)
+            if zeroForOne
+            else get_amount1_delta(sqrtRatioCurrent, sqrtRatioTarget, liquidity, True)
+        )
+        if amountRemainingLessFee >= amountIn:
+            sqrtRatioNext = sqrtRatioTarget
+        else:
+            sqrtRatioNext = get_next_sqrt_price_from_input(
+                sqrtRatioCurrent, liquidity, amountRemainingLessFee, zeroForOne
+            )
+    else:
+        amountOut = (
+            get_amount1_delta(sqrtRatioTarget, sqrtRatioCurrent, liquidity, False)
+            if zeroForOne
+            else get_amount0_delta(sqrtRatioCurrent, sqrtRatioTarget, liquidity, False)
+        )
+        if -amountRemaining >= amountOut:
+            sqrtRatioNext = sqrtRatioTarget
+        else:
+            sqrtRatioNext = get_next_sqrt_price_from_output(
+                sqrtRatioCurrent, liquidity, -amountRemaining, zeroForOne
+            )
+
+    isMax = sqrtRatioTarget == sqrtRatioNext
+    if zeroForOne:
+        if not (isMax and exactIn):
+            amountIn = get_amount0_delta(sqrtRatioNext, sqrtRatioCurrent, liquidity, True)
+        if not (isMax and not exactIn):
+            amountOut = get_amount1_delta(sqrtRatioNext, sqrtRatioCurrent, liquidity, False)
+    else:
+        if not (isMax and exactIn):
+            amountIn = get_amount1_delta(sqrtRatioCurrent, sqrtRatioNext, liquidity, True)
+        if not (isMax and not exactIn):
+            amountOut = get_amount0_delta(sqrtRatioCurrent, sqrtRatioNext, liquidity, False)
+
+    # Cap the output amount to not exceed the remaining output amount
+    if not exactIn and amountOut > -amountRemaining:
+        amountOut = -amountRemaining
+
+    if exactIn and sqrtRatioNext != sqrtRatioTarget:
+        # We didn't reach the target, so take the remainder of the maximum input as fee
+        feeAmount = amountRemaining - amountIn
+    else:
+        feeAmount = _mul_div_rounding_up(amountIn, feePips, FEE_DENOMINATOR - feePips)
+
+    return (sqrtRatioNext, amountIn, amountOut, feeAmount)
+
+
+class Pool:
+    """
+    Cached state of a Uniswap V3 pool. `ticks` maps each initialized tick to its liquidityNet,
+    ticks are only known inside the tick bitmap words in [minWord, maxWord]. Swaps that would
+    leave the cached words raise an exception rather than return an inaccurate quote.
+    """
+
+    def __init__(
+        self,
+        address,
+        token0,
+        token1,
+        fee,
+        tickSpacing,
+        sqrtPriceX96,
+        tick,
+        liquidity,
+        ticks,
+        minWord=None,
+        maxWord=None,
+    ):
+        self.address = address
+        self.token0 = token0
+        self.token1 = token1
+        self.fee = fee
+        self.tickSpacing = tickSpacing
+        self.sqrtPriceX96 = sqrtPriceX96
+        self.tick = tick
+        self.liquidity = liquidity
+        self.ticks = dict(ticks)
+        self._initialized = sorted(t // tickSpacing for t in self.ticks.keys())
+        self.minWord = (MIN_TICK // tickSpacing) >> 8 if minWord is None else minWord
+        self.maxWord = (MAX_TICK // tickSpacing) >> 8 if maxWord is None else maxWord
+
+    @classmethod
+    def from_contract(cls, pool, wordRadius=2, block_identifier=None):
+        """Loads pool state from an IUniswapV3Pool contract, caching `wordRadius` tick bitmap words
+        on either side of the current tick."""
+        kwargs = {} if block_identifier is None else {"block_identifier": block_identifier}
+        (sqrtPriceX96, tick, *_) = pool.slot0(**kwargs)
+        tickSpacing = pool.tickSpacing(**kwargs)
+        word = (tick // tickSpacing) >> 8
+
+        ticks = {}
+        for w in range(word - wordRadius, word + wordRadius + 1):
+            bitmap = pool.tickBitmap(w, **kwargs)
+            for bit in range(256):
+                if bitmap >> bit & 1:
+                    t = ((w << 8) + bit) * tickSpacing
+                    ticks[t] = pool.ticks(t, **kwargs)[1]
+
+        return cls(
+            pool.address,
+            pool.token0(**kwargs),
+            pool.token1(**kwargs),
+            pool.fee(**kwargs),
+            tickSpacing,
+            sqrtPriceX96,
+            tick,
+            pool.liquidity(**kwargs),
+            ticks,
+            word - wordRadius,
+            word + wordRadius,
+        )
+
+    def other(self, token):
+        return self.token1 if token == self.token0 else self.token0
+
+    def _next_initialized_tick(self, tick, lte):
+        # Same stepping as TickBitmap.nextInitializedTickWithinOneWord, the swap loop will stop at
+        # word boundaries so that rounding matches the pool contract exactly.
+        compressed = tick // self.tickSpacing
+        if lte:
+            wordStart = compressed - (compressed % 256)
+            if (compressed >> 8) < self.minWord:
+                raise Exception("Swap exceeds cached ticks")
+            candidates = [c for c in self._initialized if wordStart <= c <= compressed]
+            if candidates:
+                return (candidates[-1] * self.tickSpacing, True)
+            return (wordStart * self.tickSpacing, False)
+        else:
+            compressed += 1
+            wordEnd = compressed + (255 - compressed % 256)
+            if (compressed >> 8) > self.maxWord:
+                raise Exception("Swap exceeds cached ticks")
+            candidates = [c for c in self._initialized if compressed <= c <= wordEnd]
+            if candidates:
+                return (candidates[0] * self.tickSpacing, True)
+            return (wordEnd * self.tickSpacing, False)
+
+    def swap(self, tokenIn, amountSpecified, sqrtPriceLimitX96=None, update=False):
+        """
+        Simulates IUniswapV3Pool.swap. A positive amountSpecified is an exact input amount and a
+        negative amountSpecified is an exact output amount. Returns (amountIn, amountOut).
+        """
+        if amountSpecified == 0:
+            raise Exception("Zero swap amount")
+        zeroForOne = tokenIn == self.token0
+        if sqrtPriceLimitX96 is None:
+            sqrtPriceLimitX96 = MIN_SQRT_RATIO + 1 if zeroForOne else MAX_SQRT_RATIO - 1
+
+        exactInput = amountSpecified > 0
+        remaining = amountSpecified
+        calculated = 0
+        sqrtPriceX96 = self.sqrtPriceX96
+        tick = self.tick
+        liquidity = self.liquidity
+
+        while remaining != 0 and sqrtPriceX96 != sqrtPriceLimitX96:
+            sqrtPriceStart = sqrtPriceX96
+            (tickNext, initialized) = self._next_initialized_tick(tick, zeroForOne)
+            tickNext = min(max(tickNext, MIN_TICK), MAX_TICK)
+            sqrtPriceNext = get_sqrt_ratio_at_tick(tickNext)
+
+            if zeroForOne:
+                target = sqrtPriceLimitX96 if sqrtPriceNext < sqrtPriceLimitX96 else sqrtPriceNext
+            else:
+                target = sqrtPriceLimitX96 if sqrtPriceNext > sqrtPriceLimitX96 else sqrtPriceNext
+
+            (sqrtPriceX96, stepIn, stepOut, feeAmount) = compute_swap_step(
+                sqrtPriceX96, target, liquidity, remaining, self.fee
+            )
+
+            if exactInput:
+                remaining -= stepIn + feeAmount
+                calculated -= stepOut
+            else:
+                remaining += stepOut
+                calculated += stepIn + feeAmount
+
+            if sqrtPriceX96 == sqrtPriceNext:
+                if initialized:
+                    liquidityNet = self.ticks[tickNext]
+                    liquidity += -liquidityNet if zeroForOne else liquidityNet
+                tick = tickNext - 1 if zeroForOne else tickNext
+            elif sqrtPriceX96 != sqrtPriceStart:
+                tick = get_tick_at_sqrt_ratio(sqrtPriceX96)
+
+        if update:
+            (self.sqrtPriceX96, self.tick, self.liquidity) = (sqrtPriceX96, tick, liquidity)
+
+        if exactInput:
+            return (amountSpecified - remaining, -calculated)
+        return (calculated, -amountSpecified + remaining)
+
+
+def encode_path(tokens, fees):
+    """Packed Uniswap V3 path: token (20 bytes) | fee (3 bytes) | token | ..."""
+    types = ["address"]
+    values = [tokens[0]]
+    for (fee, token) in zip(fees, tokens[1:]):
+        types.extend(["uint24", "address"])
+        values.extend([fee, token])
+
+    return encode_abi_packed(types, values)
+
+
+class Route:
+    def __init__(self, tokenIn, pools):
+        self.pools = pools
+        self.tokens = [tokenIn]
+        for p in pools:
+            self.tokens.append(p.other(self.tokens[-1]))
+
+    @property
+    def fees(self):
+        return [p.fee for p in self.pools]
+
+    def path(self):
+        return encode_path(self.tokens, self.fees)
+
+    def quote_exact_input(self, amountIn):
+        amount = amountIn
+        for (pool, token) in zip(self.pools, self.tokens):
+            (_, amount) = pool.swap(token, amount)
+        return amount
+
+    def quote_exact_output(self, amountOut):
+        amount = amountOut
+        for (pool, token) in reversed(list(zip(self.pools, self.tokens))):
+            (amount, _) = pool.swap(token, -amount)
+        return amount
+
+    def trade_params(self, deadline, priceLimit=0):
+        """Params expected by NotionalV2UniV3FlashLiquidator.executeDexTrade"""
+        if len(self.pools) == 1:
+            return eth_abi.encode_abi(
+                ["uint24", "uint256", "uint160"], [self.pools[0].fee, deadline, priceLimit]
+            )
+        return eth_abi.encode_abi(
+            ["uint24", "uint256", "uint160", "bytes"], [0, deadline, 0, self.path()]
+        )
+
+
+class Router:
+    def __init__(self, pools):
+        self.pools = list(pools)
+
+    def routes(self, tokenIn, tokenOut, maxHops=2):
+        routes = []
+
+        def search(token, pools, visited):
+            for p in self.pools:
+                if p in pools or token not in (p.token0, p.token1):
+                    continue
+                nextToken = p.other(token)
+                if nextToken in visited:
+                    continue
+                if nextToken == tokenOut:
+                    routes.append(Route(tokenIn, pools + [p]))
+                elif len(pools) + 1 < maxHops:
+                    search(nextToken, pools + [p], visited | {nextToken})
+
+        search(tokenIn, [], {tokenIn})
+        return routes
+
+    def _best(self, routes, quote, better):
+        best = None
+        for r in routes:
+            try:
+                amount = quote(r)
+            except Exception:
+                # Route is not quotable within the cached state
+                continue
+            if best is None or better(amount, best[1]):
+                best = (r, amount)
+
+        if best is None:
+            raise Exception("No route found")
+        return best
+
+    def best_exact_input(self, tokenIn, tokenOut, amountIn, maxHops=2):
+        """Returns (route, amountOut) maximizing the output for a fixed input"""
+        return self._best(
+            self.routes(tokenIn, tokenOut, maxHops),
+            lambda r: r.quote_exact_input(amountIn),
+            lambda a, b: a > b,
+        )
+
+    def best_exact_output(self, tokenIn, tokenOut, amountOut, maxHops=2):
+        """Returns (route, amountIn) minimizing the input for a fixed output"""
+        return self._best(
+            self.routes(tokenIn, tokenOut, maxHops),
+            lambda r: r.quote_exact_output(amountOut),
+            lambda a, b: a < b,
+        )
+
+
+def flash_loan_repay_amount(flashLoanAmount, premiumBps=AAVE_FLASH_LOAN_PREMIUM_BPS):
+    return flashLoanAmount + flashLoanAmount * premiumBps // 10000
+
+
+def plan_repayment_trade(
+    router, collateralToken, collateralAmount, repayToken, flashLoanAmount, deadline, maxHops=2
+):
+    """
+    Chooses the route for the liquidator's DEX trade. The liquidator sells its entire collateral
+    balance and requires at least the flash loan plus premium back.
+    """
+    repayAmount = flash_loan_repay_amount(flashLoanAmount)
+    (route, amountOut) = router.best_exact_input(
+        collateralToken, repayToken, collateralAmount, maxHops
+    )
+    if amountOut < repayAmount:
+        raise Exception("Collateral does not cover flash loan repayment")
+
+    (_, collateralRequired) = router.best_exact_output(
+        collateralToken, repayToken, repayAmount, maxHops
+    )
+
+    return {
+        "route": route,
+        "tokens": route.tokens,
+        "fees": route.fees,
+        "amountIn": collateralAmount,
+        "amountOut": amountOut,
+        "repayAmount": repayAmount,
+        "profit": amountOut - repayAmount,
+        "collateralRequired": collateralRequired,
+        "tradeCallData": route.trade_params(deadline),
+    }
@@ -0,0 +1,169 @@
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+from brownie import network, NotionalV1ToNotionalV2
+from brownie.network.contract import Contract
+from brownie.network.state import Chain
+from scripts.compound_migration import encode_borrow_action
+from scripts.environment import load_notional
+
+chain = Chain()
+
+# Notional V1 currency ids, mirrors NotionalV1ToNotionalV2
+V1_ETH = 0
+V1_DAI = 1
+V1_USDC = 2
+V1_WBTC = 3
+V1_DEBT_CURRENCIES = [V1_DAI, V1_USDC]
+V1_COLLATERAL_CURRENCIES = [V1_ETH, V1_WBTC]
+# V1 balances are in token decimals
+V1_DECIMALS = {V1_ETH: 10 ** 18, V1_DAI: 10 ** 18, V1_USDC: 10 ** 6, V1_WBTC: 10 ** 8}
+INTERNAL_TOKEN_PRECISION = 10 ** 8
+PERCENTAGE_DECIMALS = 100
+
+ESCROW_ABI = [
+    {
+        "inputs": [{"name": "account", "type": "address"}],
+        "name": "getBalances",
+        "outputs": [{"name": "", "type": "int256[]"}],
+        "stateMutability": "view",
+        "type": "function",
+    }
+]
+
+
+def _ceil_div(a, b):
+    return -(-a // b)
+
+
+class V1MigrationPlanner:
+    """
+    Builds NotionalV1ToNotionalV2.migrateAccount calls that move all of an account's V1 cash debts and
+    collateral to V2 in a single transaction.
+    """
+
+    def __init__(self, notional, migrator, escrow, marketIndex=1, borrowBuffer=1.001, maxWorkers=16):
+        self.notional = notional
+        self.escrow = escrow
+        self.marketIndex = marketIndex
+        # Margin on the borrowed cash to cover rounding when withdrawing to the wallet
+        self.borrowBuffer = borrowBuffer
+        self.maxWorkers = maxWorkers
+        self.v2CurrencyIds = {
+            V1_ETH: migrator.V2_ETH(),
+            V1_DAI: migrator.V2_DAI(),
+            V1_USDC: migrator.V2_USDC(),
+            V1_WBTC: migrator.V2_WBTC(),
+        }
+        self.ethRates = {
+            v1Id: notional.getCurrencyAndRates(v2Id)[2] for (v1Id, v2Id) in self.v2CurrencyIds.items()
+        }
+
+    def read_balances(self, accountList):
+        """Reads Escrow.getBalances for every account concurrently"""
+        with ThreadPoolExecutor(max_workers=self.maxWorkers) as executor:
+            balances = executor.map(self.escrow.getBalances, accountList)
+            return dict(zip(accountList, balances))
+
+    def _to_eth(self, v1CurrencyId, internal, isDebt):
+        (rateDecimals, rate, buffer, haircut, _) = self.ethRates[v1CurrencyId]
+        multiplier = buffer if isDebt else haircut
+        return internal * rate * multiplier // (rateDecimals * PERCENTAGE_DECIMALS)
+
+    def plan_account(self, account, balances, blockTime):
+        plan = {"account": account, "feasible": False}
+        debts = [(cid, -balances[cid]) for cid in V1_DEBT_CURRENCIES if balances[cid] < 0]
+        collateral = [(cid, balances[cid]) for cid in V1_COLLATERAL_CURRENCIES if balances[cid] > 0]
+        if len(debts) == 0:
+            plan["reason"] = "No V1 debt"
+            return plan
+        if len(collateral) == 0:
+            plan["reason"] = "No V1 collateral"
+            return plan
+
+        borrowActions = []
+        debtETH = 0
+        for (v1Id, repayAmount) in debts:
+            v2Id = self.v2CurrencyIds[v1Id]
+            cashRequired = math.ceil(
+                _ceil_div(repayAmount * INTERNAL_TOKEN_PRECISION, V1_DECIMALS[v1Id])
+                * self.borrowBuffer
+            )
+            fCashBorrow = -self.notional.getfCashAmountGivenCashAmount(
+                v2Id, cashRequired, self.marketIndex, blockTime
+            )
+            # fCash notional is an upper bound on the risk adjusted value of the debt
+            debtETH += self._to_eth(v1Id, fCashBorrow, True)
+            borrowActions.append(encode_borrow_action(v2Id, self.marketIndex, fCashBorrow))
+
+        collateralETH = sum(
+            self._to_eth(cid, amount * INTERNAL_TOKEN_PRECISION // V1_DECIMALS[cid], False)
+            for (cid, amount) in collateral
+        )
+        plan.update(
+            {
+                "v1DebtCurrencyIds": [cid for (cid, _) in debts],
+                "v1RepayAmounts": [amount for (_, amount) in debts],
+                # Notional requires batch actions sorted by currency id
+                "borrowActions": sorted(borrowActions, key=lambda a: a[1]),
+                "collateralETH": collateralETH,
+                "debtETH": debtETH,
+                # The legacy entry points repay one debt and withdraw one collateral per transaction
+                "legacyTransactions": max(len(debts), len(collateral)),
+            }
+        )
+
+        if collateralETH < debtETH:
+            plan["reason"] = "Insufficient collateral for Notional V2"
+        else:
+            plan["feasible"] = True
+        return plan
+
+    def plan(self, accountList):
+        blockTime = chain.time()
+        balances = self.read_balances(accountList)
+        return [self.plan_account(a, balances[a], blockTime) for a in accountList]
+
+    def migrate_args(self, plan):
+        return (plan["v1DebtCurrencyIds"], plan["v1RepayAmounts"], plan["borrowActions"])
+
+
+def main(migratorAddress, escrowAddress, accountsFile, marketIndex=1):
+    """
+    brownie run scripts/v1_migration.py main <migrator> <v1 escrow> <accounts.json> --network mainnet
+    Writes the migrateAccount arguments for each feasible account to v1_migration.<network>.json
+    """
+    notional = load_notional()
+    migrator = NotionalV1ToNotionalV2.at(migratorAddress)
+    escrow = Contract.from_abi("Escrow", escrowAddress, ESCROW_ABI)
+    with open(accountsFile, "r") as f:
+        accountList = json.load(f)
+
+    planner = V1MigrationPlanner(notional, migrator, escrow, int(marketIndex))
+    plans = planner.plan(accountList)
+    feasible = [p for p in plans if p["feasible"]]
+
+    output = {
+        p["account"]: {
+            "calldata": migrator.migrateAccount.encode_input(*planner.migrate_args(p)),
+            "debtETH": p["debtETH"],
+            "collateralETH": p["collateralETH"],
+        }
+        for p in feasible
+    }
+    outputFile = "v1_migration.{}.json".format(network.show_active())
+    with open(outputFile, "w") as f:
+        json.dump(output, f, indent=2, sort_keys=True)
+
+    print(
+        "{} of {} accounts can migrate in {} transactions, {} with the per pair entry points".format(
+            len(feasible),
+            len(plans),
+            len(feasible),
+            sum(p["legacyTransactions"] for p in feasible),
+        )
+    )
+    for p in plans:
+        if not p["feasible"]:
+            print("Skipped {}: {}".format(p["account"], p["reason"]))
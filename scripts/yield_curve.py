@@ -0,0 +1,164 @@
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+from brownie.network.state import Chain
+from scripts.asset_rate import _div
+from scripts.date_time import (
+    FCASH_ASSET_TYPE,
+    YEAR,
+    get_market_index,
+    get_reference_time,
+    get_traded_market,
+    is_liquidity_token,
+)
+
+chain = Chain()
+
+RATE_PRECISION = 10 ** 9
+
+
+def interpolate_oracle_rate(shortMaturity, longMaturity, shortRate, longRate, maturity):
+    """Mirrors CashGroup.interpolateOracleRate, linear interpolation in rate precision"""
+    if maturity <= shortMaturity:
+        return shortRate
+    if longRate >= shortRate:
+        return (longRate - shortRate) * (maturity - shortMaturity) // (
+            longMaturity - shortMaturity
+        ) + shortRate
+    return shortRate - (shortRate - longRate) * (maturity - shortMaturity) // (
+        longMaturity - shortMaturity
+    )
+
+
+def discount_factor(oracleRate, timeToMaturity):
+    """Continuously compounded discount factor in rate precision, the same as AssetHandler. Uses
+    floating point exp so results can differ from the ABDK fixed point result in the last digits."""
+    return int(RATE_PRECISION * math.exp(-oracleRate * timeToMaturity / (YEAR * RATE_PRECISION)))
+
+
+class YieldCurve:
+    """
+    Fixed rate curve for one currency at a block time built from getActiveMarkets oracle rates.
+    Rates for maturities between markets are interpolated the same way as CashGroup.calculateOracleRate.
+    """
+
+    def __init__(self, currencyId, blockTime, markets, supplyRate=None):
+        self.currencyId = currencyId
+        self.blockTime = blockTime
+        self.maturities = [m[1] for m in markets]
+        self.oracleRates = [m[6] for m in markets]
+        self.markets = markets
+        # Notional interpolates from the cToken supply rate before the first market, when that is
+        # not given the curve is flat before the three month market
+        self.supplyRate = self.oracleRates[0] if supplyRate is None else supplyRate
+        self._discountFactors = {}
+
+    def rate(self, maturity):
+        if maturity <= self.blockTime:
+            raise Exception("Asset matured")
+        (marketIndex, isIdiosyncratic) = get_market_index(
+            len(self.maturities), maturity, self.blockTime
+        )
+        if not isIdiosyncratic:
+            return self.oracleRates[marketIndex - 1]
+
+        tRef = get_reference_time(self.blockTime)
+        longMaturity = tRef + get_traded_market(marketIndex)
+        longRate = self.oracleRates[marketIndex - 1]
+        if marketIndex == 1:
+            (shortMaturity, shortRate) = (self.blockTime, self.supplyRate)
+        else:
+            shortMaturity = tRef + get_traded_market(marketIndex - 1)
+            shortRate = self.oracleRates[marketIndex - 2]
+
+        return interpolate_oracle_rate(shortMaturity, longMaturity, shortRate, longRate, maturity)
+
+    def discount_factor(self, maturity):
+        # Portfolios and wrappers share a handful of maturities, each factor is computed once
+        factor = self._discountFactors.get(maturity)
+        if factor is None:
+            factor = discount_factor(self.rate(maturity), maturity - self.blockTime)
+            self._discountFactors[maturity] = factor
+        return factor
+
+    def present_value(self, notional, maturity):
+        # Debts are negative, truncates towards zero as Solidity does
+        return _div(int(notional) * self.discount_factor(maturity), RATE_PRECISION)
+
+    def liquidity_token_value(self, tokens, maturity, assetRate):
+        """
+        Returns (assetCashClaim, fCashClaimPresentValue) for liquidity tokens, the fCash claim is in
+        underlying internal precision and the cash claim in asset cash internal precision
+        """
+        market = self.markets[self.maturities.index(maturity)]
+        (totalfCash, totalAssetCash, totalLiquidity) = market[2:5]
+        assetCashClaim = int(tokens) * totalAssetCash // totalLiquidity
+        fCashClaim = int(tokens) * totalfCash // totalLiquidity
+        (_, rate, underlyingDecimals) = assetRate
+        return (
+            assetCashClaim * rate // 10 ** 10 // underlyingDecimals,
+            self.present_value(fCashClaim, maturity),
+        )
+
+
+class YieldCurveEngine:
+    """Builds a curve per currency and reprices many portfolios or wrappers against it"""
+
+    def __init__(self, notional, maxWorkers=16):
+        self.notional = notional
+        self.maxWorkers = maxWorkers
+        self.curves = {}
+        self.assetRates = {}
+
+    def refresh(self, currencyIds, blockTime=None):
+        """Reads markets and asset rates for every currency at the block time"""
+        blockTime = chain.time() if blockTime is None else blockTime
+
+        def read(currencyId):
+            markets = self.notional.getActiveMarketsAtBlockTime(currencyId, blockTime)
+            assetRate = self.notional.getCurrencyAndRates(currencyId)[3]
+            return (currencyId, markets, assetRate)
+
+        with ThreadPoolExecutor(max_workers=self.maxWorkers) as executor:
+            for (currencyId, markets, assetRate) in executor.map(read, currencyIds):
+                self.curves[currencyId] = YieldCurve(currencyId, blockTime, markets)
+                self.assetRates[currencyId] = assetRate
+
+    def reprice(self, assets):
+        """
+        Returns the present value per currency, in underlying internal precision, of a list of
+        (currencyId, maturity, assetType, notional, ...) portfolio assets
+        """
+        values = {}
+        for asset in assets:
+            (currencyId, maturity, assetType, notional) = asset[0:4]
+            curve = self.curves[currencyId]
+            if assetType == FCASH_ASSET_TYPE:
+                value = curve.present_value(notional, maturity)
+            elif is_liquidity_token(assetType):
+                value = sum(
+                    curve.liquidity_token_value(notional, maturity, self.assetRates[currencyId])
+                )
+            else:
+                raise Exception("Invalid asset type")
+            values[currencyId] = values.get(currencyId, 0) + value
+        return values
+
+    def reprice_portfolios(self, portfolios):
+        """`portfolios` maps accounts to getAccountPortfolio results"""
+        return {account: self.reprice(assets) for (account, assets) in portfolios.items()}
+
+    def reprice_wrappers(self, wrappers):
+        """Returns the present value of the total supply of each WrappedfCash contract"""
+
+        def read(wrapper):
+            (currencyId, maturity) = wrapper.getDecodedID()
+            return (wrapper.address, currencyId, maturity, wrapper.totalSupply())
+
+        with ThreadPoolExecutor(max_workers=self.maxWorkers) as executor:
+            supplies = list(executor.map(read, wrappers))
+
+        return {
+            address: self.curves[currencyId].present_value(totalSupply, maturity)
+            for (address, currencyId, maturity, totalSupply) in supplies
+        }
@@ -0,0 +1,77 @@
+import os
+
+import pytest
+from brownie import Contract, WrappedfCash, chain
+from brownie._config import CONFIG
+from scripts.EnvironmentConfig import getForkEnvironment
+from scripts.rpc_cassette import REPLAY, use_cassette
+from scripts.rpc_profiler import RPCProfiler
+
+cassette = {}
+
+
+def pytest_sessionstart(session):
+    # RPC_CASSETTE=<file.json.gz> serves the fork node's archive requests from disk, set
+    # RPC_CASSETTE_MODE=record to record it against the configured archive node first
+    path = os.environ.get("RPC_CASSETTE")
+    if path is None:
+        return
+    networkId = CONFIG.argv.get("network") or CONFIG.settings["networks"]["default"]
+    mode = os.environ.get("RPC_CASSETTE_MODE", REPLAY)
+    cassette["proxy"] = use_cassette(CONFIG.networks, networkId, path, mode)
+
+
+def pytest_unconfigure(config):
+    # Runs after brownie has shut down the fork node so nothing it fetches is missed
+    if "proxy" in cassette:
+        cassette.pop("proxy").stop()
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    # RPC_PROFILE=<dir> writes <dir>/<test>.json and <dir>/<test>.folded for every test. The
+    # profile covers setup, call and teardown, so module and session scoped fixtures are charged
+    # to the first test that sets them up.
+    directory = os.environ.get("RPC_PROFILE")
+    if directory is None:
+        yield
+        return
+    os.makedirs(directory, exist_ok=True)
+    profiler = RPCProfiler().start()
+    yield
+    profiler.stop()
+    profiler.write(os.path.join(directory, item.nodeid.replace("/", ".").replace("::", "-")))
+
+
+# Shared by the SDK script tests, which opt in with
+# `pytestmark = pytest.mark.usefixtures("run_around_tests")`. It is not autouse because hypothesis
+# rejects function scoped fixtures on @given tests. Modules defining their own fixtures override these.
+@pytest.fixture()
+def run_around_tests():
+    chain.snapshot()
+    yield
+    chain.revert()
+
+
+@pytest.fixture()
+def env():
+    return getForkEnvironment()
+
+
+@pytest.fixture()
+def beacon(WrappedfCash, nUpgradeableBeacon, env):
+    impl = WrappedfCash.deploy(env.notional.address, {"from": env.deployer})
+    return nUpgradeableBeacon.deploy(impl.address, {"from": env.deployer})
+
+
+@pytest.fixture()
+def factory(WrappedfCashFactory, beacon, env):
+    return WrappedfCashFactory.deploy(beacon.address, {"from": env.deployer})
+
+
+@pytest.fixture()
+def wrapper(factory, env):
+    # DAI wrapper at the three month maturity
+    markets = env.notional.getActiveMarkets(2)
+    txn = factory.deployWrapper(2, markets[0][1])
+    return Contract.from_abi("Wrapper", txn.events['WrapperDeployed']['wrapper'], WrappedfCash.abi)
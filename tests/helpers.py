@@ -2,6 +2,7 @@ import random
 
 from brownie.convert import to_bytes, to_uint
 from brownie.convert.datatypes import Wei
+from brownie.network import accounts
 from brownie.network.state import Chain
 from brownie.test import strategy
 from eth_abi.packed import encode_abi_packed
@@ -452,3 +453,17 @@ def execute_proposal(environment, targets, values, calldatas):
         proposalId, targets, values, calldatas, {
             "from": multisig})
     return txn
+
+
+def apply_proposal(environment, targets, values, calldatas, executor=None):
+    """
+    Fast path for execute_proposal on a local chain. Sends each call directly from the governor,
+    which owns the governed contracts, instead of proposing, voting and waiting out the timelock.
+    Use execute_proposal for tests that exercise governance itself.
+    """
+    executor = environment.get('governor').address if executor is None else executor
+    executor = accounts.at(executor, force=True)
+    return [
+        executor.transfer(target, value, data=calldata)
+        for (target, value, calldata) in zip(targets, values, calldatas)
+    ]
@@ -0,0 +1,45 @@
+import pytest
+from brownie import chain
+from scripts.asset_rate import (
+    CTokenState,
+    AssetRateService,
+    convert_to_underlying,
+    interest_rate_model_from_config,
+)
+from scripts.config import CompoundConfig
+
+pytestmark = pytest.mark.usefixtures("run_around_tests")
+
+def test_jump_rate_model_kink():
+    model = interest_rate_model_from_config(CompoundConfig["DAI"]["interestRateModel"])
+    atKink = model.get_borrow_rate(20 * 10 ** 18, 80 * 10 ** 18, 0)
+    assert atKink == 8 * 10 ** 17 * model.multiplierPerBlock // 10 ** 18
+    # Rates increase faster past the kink
+    assert model.get_borrow_rate(10 * 10 ** 18, 90 * 10 ** 18, 0) - atKink > atKink // 8
+
+def test_projected_exchange_rate_accrues_interest():
+    model = interest_rate_model_from_config(CompoundConfig["ETH"]["interestRateModel"])
+    e18 = 10 ** 18
+    state = CTokenState(100 * e18, 50 * e18, e18, 5000 * 10 ** 8, 2 * 10 ** 17, 100, model)
+    assert state.exchange_rate(100) == 149 * e18 * e18 // (5000 * 10 ** 8)
+    assert state.exchange_rate(1000) > state.exchange_rate(100)
+
+def test_service_matches_notional_rates(env):
+    service = AssetRateService(env.notional, maxAge=50)
+    currencyIds = [1, 2, 3]
+    service.refresh(currencyIds)
+    chain.mine(20)
+
+    blockNumber = chain.height
+    for currencyId in currencyIds:
+        assetRate = env.notional.getCurrencyAndRates(currencyId, block_identifier=blockNumber)[3]
+        assert service.asset_rate(currencyId, blockNumber) == tuple(assetRate)
+
+        balances = [-10 ** 12, -1, 0, 1, 5000e8, 10 ** 20]
+        assert service.convert_to_underlying(currencyId, balances, blockNumber) == [
+            convert_to_underlying(assetRate, b) for b in balances
+        ]
+
+    assert service.stale(blockNumber) == []
+    chain.mine(50)
+    assert sorted(service.stale(chain.height)) == currencyIds
@@ -0,0 +1,81 @@
+import json
+import brownie
+import pytest
+from brownie import web3
+from scripts.deployment import DeploymentPipeline, contract_address, wrapper_manifest
+
+pytestmark = pytest.mark.usefixtures("run_around_tests")
+
+@pytest.fixture()
+def manifest(env):
+    manifest = wrapper_manifest(env.notional, [2, 3])
+    manifest["wrappers"] = manifest["wrappers"][0:3]
+    return manifest
+
+def pipeline(manifest, env, accounts, path):
+    return DeploymentPipeline(manifest, accounts[0], {"notional": env.notional.address}, path=str(path), verify=None)
+
+def test_predicts_create_address(WrappedfCash, env, accounts):
+    nonce = accounts[0].nonce
+    impl = WrappedfCash.deploy(env.notional.address, {"from": accounts[0]})
+    assert impl.address == contract_address(accounts[0].address, nonce)
+
+def test_deploys_and_checkpoints(manifest, env, accounts, tmp_path):
+    path = tmp_path / "wrapper.json"
+    report = pipeline(manifest, env, accounts, path).run()
+    assert report["sent"] == 6
+    assert report["wrappers"] == 3
+
+    with open(path, "r") as f:
+        checkpoint = json.load(f)
+    assert checkpoint["pending"] == {}
+    for name in ["implementation", "beacon", "factory"]:
+        assert len(web3.eth.get_code(checkpoint[name])) > 0
+    for (currencyId, maturity) in manifest["wrappers"]:
+        address = checkpoint["wrappers"]["{}:{}".format(currencyId, maturity)]
+        wrapper = brownie.WrappedfCash.at(address)
+        assert wrapper.getCurrencyId() == currencyId
+        assert wrapper.getMaturity() == maturity
+
+    # Running again sends nothing
+    nonce = accounts[0].nonce
+    assert pipeline(manifest, env, accounts, path).run()["sent"] == 0
+    assert accounts[0].nonce == nonce
+
+def test_resumes_after_failure(manifest, env, accounts, tmp_path):
+    path = tmp_path / "wrapper.json"
+    (currencyId, maturity) = manifest["wrappers"][1]
+    wrappers = manifest["wrappers"]
+    # An invalid maturity fails the deployment part way through the wrappers
+    manifest["wrappers"] = [wrappers[0], [currencyId, maturity + 1], wrappers[2]]
+    with pytest.raises(Exception):
+        pipeline(manifest, env, accounts, path).run()
+
+    with open(path, "r") as f:
+        checkpoint = json.load(f)
+    assert "factory" in checkpoint
+    # The wrapper sent before the failure is confirmed when the deployment resumes
+    assert "{}:{}".format(*wrappers[0]) in checkpoint["pending"]
+
+    manifest["wrappers"] = wrappers
+    report = pipeline(manifest, env, accounts, path).run()
+    assert report["sent"] == 2
+    assert report["wrappers"] == 3
+    assert report["contracts"]["factory"] == checkpoint["factory"]
+
+def test_failed_transaction_discards_later_pending(manifest, env, accounts, tmp_path, monkeypatch):
+    path = tmp_path / "wrapper.json"
+    dropped = {"kind": "contract", "tx": "0x" + "11" * 32, "address": accounts[1].address}
+    later = {"kind": "contract", "tx": "0x" + "22" * 32, "address": accounts[2].address}
+    with open(path, "w") as f:
+        json.dump({"wrappers": {}, "pending": {"implementation": dropped, "beacon": later}}, f)
+
+    monkeypatch.setattr("scripts.deployment.CONFIRM_TIMEOUT", 1)
+    with pytest.raises(Exception, match="implementation was not mined"):
+        pipeline(manifest, env, accounts, path).run()
+
+    # The beacon was sent at the next nonce so it is sent again along with the implementation
+    with open(path, "r") as f:
+        checkpoint = json.load(f)
+    assert checkpoint["pending"] == {}
+    assert "implementation" not in checkpoint and "beacon" not in checkpoint
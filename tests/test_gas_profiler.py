@@ -0,0 +1,48 @@
+import pytest
+from scripts.gas_profiler import _self_gas, diff_reports, profile, profile_transactions
+
+pytestmark = pytest.mark.usefixtures("run_around_tests")
+
+def step(depth, op, gas, gasCost):
+    return {"depth": depth, "op": op, "gas": gas, "gasCost": gasCost}
+
+def test_self_gas_excludes_child_frames():
+    # Geth charges the forwarded gas to the CALL step itself
+    trace = [
+        step(0, "PUSH1", 1000, 3),
+        step(0, "CALL", 997, 900),
+        step(1, "SSTORE", 880, 100),
+        step(1, "RETURN", 780, 0),
+        step(0, "STATICCALL", 870, 500),
+        step(0, "STOP", 850, 0),
+    ]
+    gas = _self_gas(trace)
+    assert gas == [3, 27, 100, 0, 20, 0]
+    assert sum(gas) == trace[0]["gas"] - trace[-1]["gas"]
+
+def test_profiles_mint(wrapper, env, accounts):
+    acct = accounts[0]
+    env.tokens["DAI"].transfer(acct, 100_000e18, {'from': env.whales["DAI_EOA"]})
+    env.tokens["DAI"].approve(wrapper.address, 2**255-1, {'from': acct})
+    txn = wrapper.mint(10_500e18, 10_000e8, acct.address, 0, True, {"from": acct})
+
+    report = profile(txn)
+    assert report["executionGas"] < report["gasUsed"]
+    assert sum(report["functions"].values()) == report["executionGas"]
+    assert sum(report["folded"].values()) == report["executionGas"]
+    assert any(fn.startswith("WrappedfCash.") for fn in report["functions"])
+    assert any(key.endswith("batchLend") for key in report["calls"])
+
+def test_diff_attributes_regressions(wrapper, env, accounts):
+    acct = accounts[0]
+    env.tokens["DAI"].transfer(acct, 100_000e18, {'from': env.whales["DAI_EOA"]})
+    env.tokens["DAI"].approve(wrapper.address, 2**255-1, {'from': acct})
+    # The first mint pays for fresh storage that the second one only updates
+    first = wrapper.mint(10_500e18, 10_000e8, acct.address, 0, True, {"from": acct})
+    second = wrapper.mint(10_500e18, 10_000e8, acct.address, 0, True, {"from": acct})
+
+    base = profile_transactions({"mint": second})
+    head = profile_transactions({"mint": first})
+    [(key, before, after, delta)] = [r for r in diff_reports(base, head)["mint"] if r[0] == "gasUsed"]
+    assert delta == first.gas_used - second.gas_used > 0
+    assert diff_reports(base, base) == {}
@@ -0,0 +1,75 @@
+import pytest
+from brownie import Contract, WrappedfCash
+from scripts.lens import Lens
+from tests.helpers import get_balance_trade_action
+
+pytestmark = pytest.mark.usefixtures("run_around_tests")
+
+@pytest.fixture()
+def wrappers(factory, env):
+    wrappers = []
+    for currencyId in [2, 3]:
+        for market in env.notional.getActiveMarkets(currencyId)[0:2]:
+            txn = factory.deployWrapper(currencyId, market[1])
+            wrappers.append(
+                Contract.from_abi("Wrapper", txn.events['WrapperDeployed']['wrapper'], WrappedfCash.abi)
+            )
+    return wrappers
+
+@pytest.fixture()
+def lender(env, accounts):
+    acct = accounts[4]
+    env.tokens["DAI"].transfer(acct, 1_000_000e18, {'from': env.whales["DAI_EOA"]})
+    env.tokens["DAI"].approve(env.notional.address, 2**255-1, {'from': acct})
+    env.notional.batchBalanceAndTradeAction(
+        acct,
+        [
+            get_balance_trade_action(
+                2,
+                "DepositUnderlying",
+                [{"tradeActionType": "Lend", "marketIndex": 1, "notional": 100_000e8, "minSlippage": 0}],
+                depositActionAmount=100_000e18,
+                withdrawEntireCashBalance=False,
+            )
+        ], { "from": acct }
+    )
+    return acct
+
+def test_lens_wrappers_match_direct_reads(wrappers, lender, env, accounts):
+    wrapper = wrappers[0]
+    env.notional.safeTransferFrom(
+        lender.address, wrapper.address, wrapper.getfCashId(), 50_000e8, "", {"from": lender}
+    )
+
+    lens = Lens.deploy(env.notional, accounts[0], chunkSize=3)
+    states = lens.wrappers([w.address for w in wrappers])
+    assert len(states) == len(wrappers)
+
+    for (w, state) in zip(wrappers, states):
+        assert state["wrapper"] == w.address
+        assert state["currencyId"] == w.getCurrencyId()
+        assert state["maturity"] == w.getMaturity()
+        assert state["hasMatured"] == w.hasMatured()
+        assert state["marketIndex"] == w.getMarketIndex()
+        assert (state["underlyingToken"], state["underlyingPrecision"]) == w.getUnderlyingToken()
+        assert (state["assetToken"], state["assetPrecision"], state["tokenType"]) == w.getAssetToken()
+        assert state["totalSupply"] == w.totalSupply()
+        assert state["fCashNotional"] == env.notional.getfCashNotional(
+            w.address, state["currencyId"], state["maturity"]
+        )
+
+    assert states[0]["totalSupply"] == 50_000e8
+
+def test_lens_accounts_match_get_account(lender, env, accounts):
+    lens = Lens.deploy(env.notional, accounts[0])
+    accountList = [lender.address, accounts[5].address, env.whales["DAI_EOA"].address]
+    states = lens.accounts(accountList)
+
+    for (account, state) in zip(accountList, states):
+        (context, balances, portfolio) = env.notional.getAccount(account)
+        assert state["account"] == account
+        assert state["context"] == tuple(context)
+        assert state["balances"] == [tuple(b) for b in balances if b[0] != 0]
+        assert state["portfolio"] == [tuple(a[0:4]) for a in portfolio]
+
+    assert len(states[0]["portfolio"]) == 1
@@ -0,0 +1,154 @@
+import random
+
+import pytest
+from brownie import accounts
+from brownie.test import given, strategy
+from hypothesis import strategies as st
+from scripts.asset_rate import convert_from_underlying, convert_to_underlying
+from scripts.date_time import (
+    DAY,
+    get_bit_num_from_maturity,
+    get_market_index,
+    get_maturity_from_bit_num,
+    get_time_utc0,
+)
+from scripts.offsetting_trades import (
+    TRADE_ACTION_TYPE,
+    _encode_trade,
+    encode_offsetting_trades_from_portfolio,
+    encode_purchase_ntoken_residual,
+    encode_settle_cash_debt,
+)
+from scripts.portfolio_cache import decode_erc1155_id, encode_erc1155_id
+from tests.constants import START_TIME
+from tests.helpers import (
+    get_cash_group_with_max_markets,
+    get_portfolio_array,
+    impliedRateStrategy,
+    timeToMaturityStrategy,
+)
+
+# Each example is a batch evaluated by the lens in a single call
+BATCH_SIZE = 250
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+blockTimeStrategy = strategy("uint", min_value=START_TIME, max_value=START_TIME + 10 * 360 * DAY)
+
+
+def batch(elements):
+    return st.lists(elements, min_size=1, max_size=BATCH_SIZE)
+
+
+def to_hex(trades):
+    return ["0x" + t.hex() for t in trades]
+
+
+@pytest.fixture(scope="module")
+def lens(MockLibraryLens):
+    return MockLibraryLens.deploy({"from": accounts[0]})
+
+
+@given(
+    assets=batch(
+        st.tuples(
+            strategy("uint16", min_value=1, max_value=2 ** 14 - 1),
+            strategy("uint40"),
+            strategy("uint8", min_value=1, max_value=8),
+        )
+    )
+)
+def test_erc1155_ids(lens, assets):
+    (currencyIds, maturities, assetTypes) = [list(c) for c in zip(*assets)]
+    ids = lens.encodeERC1155Ids(currencyIds, maturities, assetTypes)
+    assert ids == [encode_erc1155_id(*a) for a in assets]
+    assert list(zip(*lens.decodeERC1155Ids(ids))) == [decode_erc1155_id(id) for id in ids]
+
+
+@given(
+    blockTime=blockTimeStrategy,
+    days=batch(timeToMaturityStrategy),
+    offsets=batch(strategy("uint", max_value=DAY)),
+)
+def test_date_time(lens, blockTime, days, offsets):
+    # Mix day aligned and unaligned maturities
+    maturities = [get_time_utc0(blockTime) + d * DAY + o for (d, o) in zip(days, offsets + [0] * len(days))]
+    (bitNums, isExact) = lens.getBitNumsFromMaturities(blockTime, maturities)
+    assert list(zip(bitNums, isExact)) == [get_bit_num_from_maturity(blockTime, m) for m in maturities]
+
+    bits = list(range(1, 257))
+    assert lens.getMaturitiesFromBitNums(blockTime, bits) == [
+        get_maturity_from_bit_num(blockTime, b) for b in bits
+    ]
+
+    # Maturities past the twenty year market revert on chain
+    expected = []
+    inRange = []
+    for m in maturities:
+        try:
+            expected.append(get_market_index(7, m, blockTime))
+            inRange.append(m)
+        except Exception:
+            continue
+    (marketIndices, isIdiosyncratic) = lens.getMarketIndices(7, inRange, blockTime)
+    assert list(zip(marketIndices, isIdiosyncratic)) == expected
+
+
+@given(
+    trades=batch(
+        st.tuples(
+            strategy("uint8", max_value=5),
+            strategy("uint8", min_value=1, max_value=7),
+            strategy("int88"),
+            impliedRateStrategy,
+            impliedRateStrategy,
+        )
+    )
+)
+def test_trade_encoding(lens, trades):
+    expected = []
+    args = []
+    for (i, (tradeType, marketIndex, amount, minRate, maxRate)) in enumerate(trades):
+        if tradeType == TRADE_ACTION_TYPE["PurchaseNTokenResidual"]:
+            expected.append(encode_purchase_ntoken_residual(minRate, amount))
+        elif tradeType == TRADE_ACTION_TYPE["SettleCashDebt"]:
+            expected.append(encode_settle_cash_debt("{:#042x}".format(i + 1), amount))
+        else:
+            amount = abs(amount)
+            if tradeType == TRADE_ACTION_TYPE["Borrow"]:
+                # Borrow slippage shares the lend slippage bit position
+                expected.append(_encode_trade(tradeType, marketIndex, amount, maxRate))
+            elif tradeType == TRADE_ACTION_TYPE["Lend"]:
+                expected.append(_encode_trade(tradeType, marketIndex, amount, minRate))
+            else:
+                expected.append(_encode_trade(tradeType, marketIndex, amount, minRate, maxRate))
+        args.append((tradeType, marketIndex, amount, minRate, maxRate))
+
+    assert lens.encodeTrades(*[list(c) for c in zip(*args)]) == to_hex(expected)
+
+
+@given(length=strategy("uint", min_value=1, max_value=7), seed=strategy("uint32"))
+def test_offsetting_trades_from_portfolio(lens, length, seed):
+    random.seed(seed)
+    cashGroups = [get_cash_group_with_max_markets(3), get_cash_group_with_max_markets(7)]
+    portfolio = get_portfolio_array(length, cashGroups, sorted=True)
+    blockTime = START_TIME
+
+    for currencyId in (3, 7):
+        assert lens.encodeOffsettingTradesFromPortfolio(portfolio, currencyId, blockTime) == to_hex(
+            encode_offsetting_trades_from_portfolio(portfolio, currencyId, blockTime)
+        )
+
+
+@given(
+    rate=strategy("int256", min_value=10 ** 16, max_value=10 ** 30),
+    underlyingDecimals=st.sampled_from([10 ** 6, 10 ** 8, 10 ** 18]),
+    balances=batch(strategy("int128")),
+)
+def test_asset_rate_conversions(lens, rate, underlyingDecimals, balances):
+    assetRate = (ZERO_ADDRESS, rate, underlyingDecimals)
+    assert lens.convertToUnderlying(assetRate, balances) == [
+        convert_to_underlying(assetRate, b) for b in balances
+    ]
+    assert lens.convertFromUnderlying(assetRate, balances) == [
+        convert_from_underlying(assetRate, b) for b in balances
+    ]
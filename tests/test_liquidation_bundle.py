@@ -0,0 +1,169 @@
+import brownie
+import eth_abi
+import pytest
+from brownie import chain
+from scripts.liquidation_bundle import (
+    BUNDLE_ACTION,
+    LiquidationAction,
+    LiquidationBundle,
+    build_bundles,
+    encode_bundle,
+    encode_collateral_currency,
+    encode_local_currency,
+    encode_univ3_trade,
+)
+from tests.helpers import get_balance_trade_action
+
+pytestmark = pytest.mark.usefixtures("run_around_tests")
+
+UNIV3_SWAP_ROUTER = "0xE592427A0AEce4244f9A1c1e4C6C5b6D7Bd5b8FC"
+AAVE_LENDING_POOL = "0x7d2768dE32b0b80b7a3454c06BdAc94A69DDc7A9"
+AAVE_ADDRESS_PROVIDER = "0xB53C1a33016B2DC2fF3653530bfF1848a515c8c5"
+ACCOUNT = "0x0000000000000000000000000000000000000001"
+DAI = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+
+
+@pytest.fixture()
+def liquidator(NotionalV2UniV3FlashLiquidator, env):
+    liquidator = NotionalV2UniV3FlashLiquidator.deploy(
+        AAVE_LENDING_POOL,
+        AAVE_ADDRESS_PROVIDER,
+        env.deployer,
+        UNIV3_SWAP_ROUTER,
+        {"from": env.deployer},
+    )
+    liquidator.setCTokenAddress(env.tokens["cDAI"], {"from": env.deployer})
+    liquidator.approveToken(env.tokens["WETH"], UNIV3_SWAP_ROUTER, {"from": env.deployer})
+    return liquidator
+
+
+def test_bundle_round_trip():
+    actionParams = [
+        encode_local_currency("LocalCurrency_NoTransferFee_NoWithdraw", ACCOUNT, 2, 100e8),
+        encode_collateral_currency(
+            LiquidationAction["CollateralCurrency_NoTransferFee_Withdraw"],
+            ACCOUNT,
+            2,
+            DAI,
+            3,
+            USDC,
+            USDC,
+            encode_univ3_trade(500, 1000),
+        ),
+    ]
+
+    (action, withdrawProfits, decoded) = eth_abi.decode_abi(
+        ["uint8", "bool", "bytes[]"], encode_bundle(actionParams, withdrawProfits=False)
+    )
+    assert action == BUNDLE_ACTION
+    assert not withdrawProfits
+    assert list(decoded) == actionParams
+    assert eth_abi.decode_abi(["uint8", "address", "uint16", "uint96"], decoded[0]) == (4, ACCOUNT, 2, 100e8)
+
+    with pytest.raises(Exception, match="Transfer fee"):
+        encode_bundle([encode_local_currency("LocalCurrency_WithTransferFee_Withdraw", ACCOUNT, 2)])
+
+
+def test_build_bundles_by_asset():
+    params = encode_local_currency(0, ACCOUNT, 2)
+    candidates = [{"asset": DAI, "amount": 100e18, "params": params}] * 3 + [
+        {"asset": USDC, "amount": 100e6, "params": params}
+    ]
+    bundles = build_bundles(candidates, maxBundleSize=2)
+
+    assert [(b.asset, len(b)) for b in bundles] == [(DAI, 2), (USDC, 1), (DAI, 1)]
+    assert bundles[0].flash_loan_amount() == 200e18
+    # A bundle of one is sent as a plain action
+    assert bundles[1].params() == params
+    assert eth_abi.decode_abi(["uint8"], bundles[0].params()[:32])[0] == BUNDLE_ACTION
+
+    args = LiquidationBundle(DAI).add(params, 1e18).flash_loan_args(ACCOUNT, AAVE_LENDING_POOL)
+    assert args == (AAVE_LENDING_POOL, ACCOUNT, [DAI], [1e18], [0], ACCOUNT, params, 0)
+
+
+def test_bundle_rejects_transfer_fees(liquidator, env, accounts):
+    # Acts as the lending pool so executeOperation can be called directly
+    liquidator.setLendingPool(accounts[0], {"from": env.deployer})
+    actionParams = [
+        encode_local_currency("LocalCurrency_NoTransferFee_NoWithdraw", ACCOUNT, 2),
+        encode_local_currency("LocalCurrency_WithTransferFee_NoWithdraw", ACCOUNT, 2),
+    ]
+    # encode_bundle refuses these, the contract must as well
+    params = eth_abi.encode_abi(["uint8", "bool", "bytes[]"], [BUNDLE_ACTION, True, actionParams])
+
+    with brownie.reverts("Bundle transfer fee"):
+        liquidator.executeOperation([DAI], [100e18], [0], accounts[0], params, {"from": accounts[0]})
+
+
+def test_bundle_requires_repayment(liquidator, env, accounts):
+    liquidator.setLendingPool(accounts[0], {"from": env.deployer})
+    # USDC has no cToken set on the liquidator so the balance is not minted and redeemed
+    usdc = env.tokens["USDC"]
+    usdc.transfer(liquidator, 100e6, {"from": env.whales["USDC"]})
+
+    # Nothing is liquidated so only the premium is missing
+    with brownie.reverts("Insufficient repayment"):
+        liquidator.executeOperation([usdc], [100e6], [1], accounts[0], encode_bundle([]), {"from": accounts[0]})
+
+    # Anything over the repayment is sent to the owner
+    balanceBefore = usdc.balanceOf(env.deployer)
+    liquidator.executeOperation([usdc], [90e6], [1e6], accounts[0], encode_bundle([]), {"from": accounts[0]})
+    assert usdc.balanceOf(env.deployer) - balanceBefore == 9e6
+    assert usdc.balanceOf(liquidator) == 91e6
+
+
+def test_bundle_liquidates_collateral(liquidator, env, accounts):
+    borrowers = accounts[5:7]
+    for account in borrowers:
+        env.notional.batchBalanceAndTradeAction(
+            account,
+            [
+                get_balance_trade_action(1, "DepositUnderlying", [], depositActionAmount=1e18),
+                get_balance_trade_action(
+                    2,
+                    "None",
+                    [{"tradeActionType": "Borrow", "marketIndex": 1, "notional": 1500e8, "maxSlippage": 0}],
+                    withdrawEntireCashBalance=True,
+                    redeemToUnderlying=True,
+                ),
+            ],
+            {"from": account, "value": 1e18},
+        )
+
+    # A lower ETH haircut puts both borrowers under water
+    (ethRate, _) = env.notional.getRateStorage(1)
+    (rateOracle, _, mustInvert, buffer, _, liquidationDiscount) = ethRate
+    env.notional.updateETHRate(1, rateOracle, mustInvert, buffer, 40, liquidationDiscount, {"from": env.owner})
+    assert all(env.notional.getFreeCollateral(a)[0] < 0 for a in borrowers)
+
+    tradeCallData = encode_univ3_trade(3000, chain.time() + 3600)
+    candidates = [
+        {
+            "asset": env.tokens["DAI"].address,
+            "amount": 1000e18,
+            "params": encode_collateral_currency(
+                "CollateralCurrency_NoTransferFee_NoWithdraw",
+                account.address,
+                2,
+                env.tokens["DAI"].address,
+                1,
+                env.tokens["cETH"].address,
+                env.tokens["WETH"].address,
+                tradeCallData,
+            ),
+        }
+        for account in borrowers
+    ]
+    [bundle] = build_bundles(candidates)
+    assert len(bundle) == 2
+
+    ethBefore = [env.notional.getAccountBalance(1, a)[0] for a in borrowers]
+    balanceBefore = env.tokens["DAI"].balanceOf(env.deployer)
+    liquidator.flashLoan(*bundle.flash_loan_args(liquidator, AAVE_LENDING_POOL), {"from": env.deployer})
+
+    # Both accounts lost collateral in the one flash loan, the owner kept the profit
+    assert all(env.notional.getAccountBalance(1, a)[0] < b for (a, b) in zip(borrowers, ethBefore))
+    assert env.tokens["DAI"].balanceOf(env.deployer) > balanceBefore
+    assert env.tokens["DAI"].balanceOf(liquidator) == 0
+    assert env.tokens["WETH"].balanceOf(liquidator) == 0
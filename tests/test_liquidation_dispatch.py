@@ -0,0 +1,58 @@
+import os
+
+import brownie
+import pytest
+from brownie import accounts
+from scripts.gas_profiler import write_report
+from scripts.liquidation_bundle import LiquidationAction
+
+LIQUIDATION_KINDS = ["LocalCurrency", "CollateralCurrency", "LocalfCash", "CrossCurrencyfCash"]
+
+
+@pytest.fixture(scope="module")
+def dispatch(MockLiquidationDispatch):
+    return MockLiquidationDispatch.deploy(accounts[0], {"from": accounts[0]})
+
+
+def test_decode_all_actions(dispatch):
+    gasUsed = {}
+    for (name, actionType) in LiquidationAction.items():
+        (kind, noTransferFee, withdraw) = name.split("_")
+        (decodedKind, hasTransferFees, shouldWithdraw, requiresDexTrade, gas) = dispatch.decodeAction(
+            actionType
+        )
+
+        assert LIQUIDATION_KINDS[decodedKind] == kind
+        assert hasTransferFees == (noTransferFee == "WithTransferFee")
+        assert shouldWithdraw == (withdraw == "Withdraw")
+        assert requiresDexTrade == (kind in ["CollateralCurrency", "CrossCurrencyfCash"])
+        gasUsed[name] = gas
+
+    # Decoding is branch free so every action type costs the same
+    assert len(set(gasUsed.values())) == 1
+
+
+def test_decode_gas_against_comparison_chain(dispatch):
+    report = {}
+    for (name, actionType) in LiquidationAction.items():
+        bitflags = dispatch.decodeAction(actionType)
+        comparisonChain = dispatch.decodeActionComparisonChain(actionType)
+        # Both decode the action the same way
+        assert bitflags[0:4] == comparisonChain[0:4]
+        report[name] = {"bitflags": bitflags[4], "comparisonChain": comparisonChain[4]}
+
+    # The comparison chain costs more the further down it the action is matched, decoding the
+    # bitflags costs the same for every action
+    assert sum(r["bitflags"] for r in report.values()) < sum(r["comparisonChain"] for r in report.values())
+    assert max(r["bitflags"] for r in report.values()) < max(r["comparisonChain"] for r in report.values())
+
+    # GAS_PROFILE=<dir> writes the decode gas per action for diffing against another commit
+    directory = os.environ.get("GAS_PROFILE")
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+        write_report(report, os.path.join(directory, "liquidation_dispatch.json"))
+
+
+def test_decode_invalid_action(dispatch):
+    with brownie.reverts():
+        dispatch.decodeAction(len(LiquidationAction))
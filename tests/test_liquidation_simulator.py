@@ -0,0 +1,135 @@
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+
+import eth_abi
+import pytest
+from scripts.liquidation_simulator import Candidate, LiquidationSimulator, decode_revert_reason
+
+OWNER = "0x0000000000000000000000000000000000000001"
+LIQUIDATOR = "0x0000000000000000000000000000000000000002"
+NOTIONAL = "0x0000000000000000000000000000000000000003"
+
+
+def error_data(reason):
+    return "0x08c379a0" + eth_abi.encode_abi(["string"], [reason]).hex()
+
+
+@pytest.fixture()
+def node():
+    # JSON-RPC stand in, `results` maps (method, data) to a result or an error. Batch responses are
+    # returned in reverse to check the simulator matches them up by id.
+    results = {}
+    served = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            batch = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            served.append(batch)
+            response = []
+            for request in batch:
+                r = results[(request["method"], request["params"][0]["data"])]
+                key = "error" if isinstance(r, dict) else "result"
+                response.append({"jsonrpc": "2.0", "id": request["id"], key: r})
+            body = json.dumps(response[::-1]).encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield ("http://127.0.0.1:{}".format(server.server_address[1]), results, served)
+    server.shutdown()
+
+
+@pytest.fixture()
+def simulator(node):
+    simulator = LiquidationSimulator(None, OWNER, blockNumber=100, chunkSize=2)
+    simulator.endpoint = node[0]
+    return simulator
+
+
+def test_decode_revert_reason():
+    assert decode_revert_reason({"message": "x", "data": error_data("Insufficient repayment")}) == (
+        "Insufficient repayment"
+    )
+    # Hardhat and ganache nest the data one level down
+    assert decode_revert_reason({"data": {"data": error_data("Bundle transfer fee")}}) == "Bundle transfer fee"
+    assert decode_revert_reason({"data": {"result": error_data("Unauthorized")}}) == "Unauthorized"
+
+    panic = "0x4e487b71" + eth_abi.encode_abi(["uint256"], [0x11]).hex()
+    assert decode_revert_reason({"data": panic}) == "Panic(17)"
+
+    # No reason string falls back to the node's message
+    assert decode_revert_reason({"message": "execution reverted", "data": "0x"}) == "execution reverted"
+    assert decode_revert_reason({"message": "execution reverted"}) == "execution reverted"
+    assert decode_revert_reason({}) == "reverted"
+    # Custom errors are returned as raw data
+    assert decode_revert_reason({"data": "0x12345678"}) == "0x12345678"
+
+
+def test_batch_matches_responses_by_id(simulator, node):
+    (_, results, served) = node
+    for i in range(5):
+        results[("eth_call", "0x{:02x}".format(i))] = "0x{:064x}".format(i)
+
+    responses = simulator._batch(
+        [("eth_call", [simulator._tx(NOTIONAL, "0x{:02x}".format(i)), simulator.block]) for i in range(5)]
+    )
+    assert [r["id"] for r in responses] == list(range(5))
+    assert [int(r["result"], 16) for r in responses] == list(range(5))
+    # One HTTP request for the whole batch, every call at the pinned block
+    assert len(served) == 1
+    assert all(request["params"][1] == hex(100) for request in served[0])
+
+
+def test_profit_callbacks(simulator, node):
+    (_, canned, served) = node
+    canned.update(
+        {
+            ("eth_call", "0x01"): "0x" + "00" * 31 + "64",
+            ("eth_estimateGas", "0x01"): "0x30d40",
+            ("eth_call", "0xaa"): "0x" + "00" * 31 + "0a",
+            ("eth_call", "0x02"): {"message": "execution reverted", "data": error_data("Insufficient repayment")},
+            ("eth_estimateGas", "0x02"): {"message": "execution reverted"},
+            ("eth_call", "0x03"): "0x",
+            ("eth_estimateGas", "0x03"): "0x5208",
+        }
+    )
+
+    def profit(result, profitData):
+        return int(result, 16) - int(profitData, 16)
+
+    def fails(result, profitData):
+        raise Exception("cannot decode")
+
+    candidates = [
+        Candidate("profitable", LIQUIDATOR, "0x01", profit, profitCall=(NOTIONAL, "0xaa")),
+        Candidate("reverts", LIQUIDATOR, "0x02", profit),
+        Candidate("bad profit", LIQUIDATOR, "0x03", fails),
+    ]
+    results = simulator.simulate(candidates)
+
+    # Two chunks, results keep the order of the candidates
+    assert len(served) == 2
+    assert [r["name"] for r in results] == ["profitable", "reverts", "bad profit"]
+    assert results[0] == {"name": "profitable", "success": True, "gas": 200_000, "profit": 90}
+    assert results[1] == {"name": "reverts", "success": False, "revertReason": "Insufficient repayment"}
+    assert results[2]["success"] and results[2]["profit"] is None
+    assert results[2]["revertReason"] == "Profit calculation failed: cannot decode"
+
+
+def test_fcash_profit_in_eth(simulator):
+    # ETH rate of 0.01 for currency 2 at 18 decimals, asset rate of 0.02 underlying per asset cash
+    simulator._rates[2] = ((10 ** 18, 10 ** 16, 100, 100, 105), (NOTIONAL, 2 * 10 ** 26, 10 ** 18))
+    profit = simulator._fcash_profit(2, 2, lambda data: data)
+
+    # 100 fCash received for 4500 asset cash, i.e. 90 underlying
+    fCashAmounts = [60 * 10 ** 8, 40 * 10 ** 8]
+    assert profit(None, (fCashAmounts, 4500 * 10 ** 8)) == simulator.to_eth(2, 10 * 10 ** 8) == 10 ** 7
+    # Negative values truncate towards zero as in Solidity
+    assert simulator.to_eth(2, -199) == -1
@@ -0,0 +1,64 @@
+import pytest
+from brownie import web3, chain
+from scripts.market_store import MarketStore, backfill
+
+pytestmark = pytest.mark.usefixtures("run_around_tests")
+
+
+def test_store_appends_and_slices(tmp_path):
+    store = MarketStore(str(tmp_path))
+    markets = [
+        ("0x0", 1000, 100e8, 5000e8, 100e8, 0.05e9, 0.05e9, 10),
+        ("0x0", 2000, 200e8, 9000e8, 200e8, 0.06e9, 0.06e9, 10),
+    ]
+    store.append(2, 10, 100, markets)
+    # Views taken before an append remain valid
+    blocks = store.column(2, "blockNumber")
+    store.append(2, 12, 124, [("0x0", 1000, 110e8, 4900e8, 100e8, 0.055e9, 0.052e9, 120)])
+
+    assert list(blocks) == [10, 10]
+    assert list(store.column(2, "blockNumber")) == [10, 10, 12]
+    assert store.last_block(2) == 12
+    assert store.curve(2, 11) == [(1000, 0.05e9), (2000, 0.06e9)]
+    assert store.curve(2, 12) == [(1000, 0.052e9)]
+    assert store.curve(2, 9) == []
+
+    history = store.slice(2, 11, 20, ["maturity", "totalfCash"])
+    assert list(history["totalfCash"]) == [110e8]
+    with pytest.raises(Exception):
+        store.append(2, 12, 124, [])
+
+    # Reopening maps the same files
+    assert list(MarketStore(str(tmp_path)).column(2, "marketIndex")) == [1, 2, 1]
+
+
+def test_append_drops_partial_rows(tmp_path):
+    store = MarketStore(str(tmp_path))
+    market = ("0x0", 1000, 100e8, 5000e8, 100e8, 0.05e9, 0.05e9, 10)
+    store.append(2, 10, 100, [market])
+
+    # An append interrupted before blockNumber was written leaves the other columns a row ahead
+    with open(store._file(2, "maturity"), "ab") as f:
+        f.write(b"\x01" * 8)
+    with open(store._file(2, "blockNumber"), "ab") as f:
+        f.write(b"\x01" * 3)
+    store.append(2, 12, 124, [market])
+
+    assert list(store.column(2, "blockNumber")) == [10, 12]
+    assert list(store.column(2, "maturity")) == [1000, 1000]
+    assert store.curve(2, 12) == [(1000, 0.05e9)]
+
+
+def test_backfill_resumes_from_last_block(env, tmp_path):
+    store = MarketStore(str(tmp_path))
+    start = web3.eth.block_number
+    chain.mine(3)
+
+    appended = backfill(store, env.notional, [2, 3], start, start + 2)
+    assert appended == 3 * (len(env.notional.getActiveMarkets(2)) + len(env.notional.getActiveMarkets(3)))
+    assert store.last_block(2) == start + 2
+
+    # Only the new block is appended
+    backfill(store, env.notional, [2, 3], start, start + 3)
+    assert list(store.column(3, "blockNumber")).count(start + 3) == len(env.notional.getActiveMarkets(3))
+    assert store.curve(2, start + 3) == [(m[1], m[6]) for m in env.notional.getActiveMarkets(2)]
@@ -0,0 +1,72 @@
+import urllib.request
+import pytest
+from scripts.metrics import RPC_LATENCY, Registry, instrument_provider
+
+def test_counters_and_gauges():
+    registry = Registry()
+    requests = registry.counter("cache_requests_total", "Cache lookups", ("cache", "result"))
+    hits = requests.labels("eth_rate", "hit")
+    for _ in range(3):
+        hits.inc()
+    requests.labels("eth_rate", "miss").inc()
+    depth = registry.gauge("queue_depth", "Queued accounts")
+    depth.set(7)
+
+    text = registry.expose()
+    assert "# TYPE cache_requests_total counter" in text
+    assert 'cache_requests_total{cache="eth_rate",result="hit"} 3' in text
+    assert 'cache_requests_total{cache="eth_rate",result="miss"} 1' in text
+    assert "queue_depth 7" in text
+
+    with pytest.raises(Exception):
+        requests.labels("eth_rate")
+    with pytest.raises(Exception):
+        registry.counter("queue_depth", "Duplicate")
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    gas = registry.histogram("action_gas", "Gas per action", ("action",), (100_000, 200_000))
+    for value in [50_000, 100_000, 150_000, 500_000]:
+        gas.labels("flashLoan").observe(value)
+
+    text = registry.expose()
+    assert 'action_gas_bucket{action="flashLoan",le="100000"} 2' in text
+    assert 'action_gas_bucket{action="flashLoan",le="200000"} 3' in text
+    assert 'action_gas_bucket{action="flashLoan",le="+Inf"} 4' in text
+    assert 'action_gas_sum{action="flashLoan"} 800000' in text
+    assert 'action_gas_count{action="flashLoan"} 4' in text
+
+def test_serves_exposition():
+    registry = Registry()
+    registry.counter("accounts_scanned_total", "Accounts read").inc(5)
+    server = registry.serve(port=0)
+    try:
+        url = "http://127.0.0.1:{}/metrics".format(server.server_address[1])
+        body = urllib.request.urlopen(url).read().decode()
+        assert "accounts_scanned_total 5" in body
+    finally:
+        server.shutdown()
+
+def test_instrument_provider_observes_latency():
+    class Provider:
+        _request_func_cache = ("cached", "request")
+
+        def make_request(self, method, params):
+            if method == "eth_fail":
+                raise Exception("request failed")
+            return {"result": params}
+
+    latency = RPC_LATENCY.labels("eth_chainId")
+    before = sum(latency.counts)
+    provider = instrument_provider(Provider())
+
+    assert provider.make_request("eth_chainId", [1]) == {"result": [1]}
+    assert provider.make_request("eth_chainId", []) == {"result": []}
+    assert sum(latency.counts) == before + 2
+    # web3 rebuilds its middleware around the instrumented request
+    assert provider._request_func_cache == (None, None)
+
+    # Failed requests are observed as well
+    with pytest.raises(Exception, match="request failed"):
+        provider.make_request("eth_fail", [])
+    assert sum(RPC_LATENCY.labels("eth_fail").counts) == 1
@@ -2,33 +2,52 @@ import brownie
 import pytest
 from brownie import CompoundToNotionalV2
 from brownie import accounts
-from tests.helpers import get_balance_trade_action, execute_proposal
+from tests.helpers import get_balance_trade_action, apply_proposal, execute_proposal
+from scripts.compound_migration import MigrationPlanner, execute
 from scripts.environment import setup_env
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def env():
     return setup_env()
 
-def test_migrate_comp_to_v2(accounts, CompoundToNotionalV2, env):
-    account = accounts[5]
-    cETH = env['currencies']['cETH'].get('asset')
-    cUSDC = env['currencies']['cUSDC'].get('asset')
-    USDC = env['currencies']['cUSDC'].get('underlying')
-    notional = env.get('notional')
-    comptroller = env.get('comptroller')
-
-    compToV2 = CompoundToNotionalV2.deploy(
-        notional.address,
+def deploy_adapter(env):
+    return CompoundToNotionalV2.deploy(
+        env.get('notional').address,
         accounts[0].address,
-        cETH.address,
+        env['currencies']['cETH'].get('asset').address,
         {"from": accounts[0]},
     )
 
+@pytest.fixture(scope="module")
+def compToV2(env):
+    # Authorized once per module, fn_isolation reverts every test back to this state
+    compToV2 = deploy_adapter(env)
+    notional = env.get('notional')
     input = notional.updateAuthorizedCallbackContract.encode_input(
         compToV2.address, True)
-    # execute_proposal
-    execute_proposal(env, [notional.address], [0], [input])
+    apply_proposal(env, [notional.address], [0], [input])
+    return compToV2
+
+@pytest.fixture(autouse=True)
+def isolation(fn_isolation):
+    pass
+
+def test_authorize_adapter_via_governance(env):
+    compToV2 = deploy_adapter(env)
+    notional = env.get('notional')
+    input = notional.updateAuthorizedCallbackContract.encode_input(
+        compToV2.address, True)
+    txn = execute_proposal(env, [notional.address], [0], [input])
+    assert txn.events["UpdateAuthorizedCallbackContract"]["operator"] == compToV2.address
+
+def test_migrate_comp_to_v2(accounts, compToV2, env):
+    account = accounts[5]
+    cETH = env['currencies']['cETH'].get('asset')
+    cUSDC = env['currencies']['cUSDC'].get('asset')
+    USDC = env['currencies']['cUSDC'].get('underlying')
+    notional = env.get('notional')
+    comptroller = env.get('comptroller')
 
     # NOTE: these approvals allow deposit and repayment
     compToV2.enableTokens(
@@ -80,3 +99,109 @@ def test_migrate_comp_to_v2(accounts, CompoundToNotionalV2, env):
     assert len(portfolio) == 1
     assert portfolio[0][3] == -120e8
 
+
+def test_migration_planner_passes_fc_first_time(accounts, compToV2, env):
+    cETH = env['currencies']['cETH'].get('asset')
+    cUSDC = env['currencies']['cUSDC'].get('asset')
+    USDC = env['currencies']['cUSDC'].get('underlying')
+    notional = env.get('notional')
+    comptroller = env.get('comptroller')
+
+    compToV2.enableTokens(
+        [cUSDC.address, cETH.address], {"from": accounts[0]}
+    )
+
+    borrowers = accounts[6:9]
+    for (i, account) in enumerate(borrowers):
+        comptroller.enterMarkets(
+            [cUSDC.address, cETH.address], {"from": account}
+        )
+        cETH.mint({"from": account, "value": 10e18})
+        cUSDC.borrow(100e6 * (i + 1), {"from": account})
+
+    planner = MigrationPlanner(notional, compToV2)
+    plans = planner.plan([a.address for a in borrowers], cUSDC.address)
+    assert all(p["feasible"] for p in plans)
+    # Only the collateral required for the FC check is moved
+    assert all(p["collateralAmounts"][0] < cETH.balanceOf(p["account"]) for p in plans)
+
+    (results, report) = execute(
+        planner, plans, {cUSDC.address: USDC, cETH.address: cETH}
+    )
+    assert report["migrated"] == len(borrowers)
+    assert report["failed"] == {}
+
+    for account in borrowers:
+        assert cUSDC.borrowBalanceStored(account) == 0
+        portfolio = notional.getAccountPortfolio(account)
+        assert len(portfolio) == 1
+        assert portfolio[0][3] < 0
+
+
+def test_migrate_multiple_borrows_gas(accounts, compToV2, env):
+    cETH = env['currencies']['cETH'].get('asset')
+    cDAI = env['currencies']['cDAI'].get('asset')
+    DAI = env['currencies']['cDAI'].get('underlying')
+    cUSDC = env['currencies']['cUSDC'].get('asset')
+    USDC = env['currencies']['cUSDC'].get('underlying')
+    notional = env.get('notional')
+    comptroller = env.get('comptroller')
+
+    compToV2.enableTokens(
+        [cDAI.address, cUSDC.address, cETH.address], {"from": accounts[0]}
+    )
+    assert compToV2.assetTokens(1) == cETH.address
+
+    daiBorrow = get_balance_trade_action(
+        2,
+        "None",
+        [{"tradeActionType": "Borrow", "marketIndex": 1, "notional": 120e8, "maxSlippage": 0}],
+        withdrawEntireCashBalance=True,
+        redeemToUnderlying=True,
+    )
+    usdcBorrow = get_balance_trade_action(
+        3,
+        "None",
+        [{"tradeActionType": "Borrow", "marketIndex": 1, "notional": 120e8, "maxSlippage": 0}],
+        withdrawEntireCashBalance=True,
+        redeemToUnderlying=True,
+    )
+
+    (single, batch) = (accounts[3], accounts[4])
+    for account in [single, batch]:
+        comptroller.enterMarkets(
+            [cDAI.address, cUSDC.address, cETH.address], {"from": account}
+        )
+        cETH.mint({"from": account, "value": 10e18})
+        cDAI.borrow(100e18, {"from": account})
+        cUSDC.borrow(100e6, {"from": account})
+        DAI.approve(compToV2.address, 2 ** 255, {"from": account})
+        USDC.approve(compToV2.address, 2 ** 255, {"from": account})
+        cETH.approve(compToV2.address, 2 ** 255, {"from": account})
+
+    collateral = cETH.balanceOf(single)
+    txn1 = compToV2.migrateBorrowFromCompound(
+        cDAI.address, 0, [1], [collateral // 2], [daiBorrow], {"from": single}
+    )
+    txn2 = compToV2.migrateBorrowFromCompound(
+        cUSDC.address, 0, [1], [collateral - collateral // 2], [usdcBorrow], {"from": single}
+    )
+
+    # Collateral for the same currency is combined into a single deposit
+    txn3 = compToV2.migrateBorrowsFromCompound(
+        [cDAI.address, cUSDC.address],
+        [0, 0],
+        [1, 1],
+        [collateral // 2, collateral - collateral // 2],
+        [daiBorrow, usdcBorrow],
+        {"from": batch},
+    )
+
+    assert txn3.gas_used < txn1.gas_used + txn2.gas_used
+
+    for account in [single, batch]:
+        assert cETH.balanceOf(account) == 0
+        assert cDAI.borrowBalanceStored(account) == 0
+        assert cUSDC.borrowBalanceStored(account) == 0
+        assert notional.getAccountBalance(1, account)[0] > 0
+        assert len(notional.getAccountPortfolio(account)) == 2
@@ -0,0 +1,99 @@
+import pytest
+from brownie import chain
+from scripts.date_time import DAY, QUARTER, YEAR, get_reference_time
+from scripts.ntoken_engine import NTokenEngine, NTokenState
+from tests.helpers import get_balance_action
+
+pytestmark = pytest.mark.usefixtures("run_around_tests")
+
+@pytest.fixture()
+def minters(env, accounts):
+    holders = accounts[4:7]
+    for (i, acct) in enumerate(holders):
+        env.tokens["DAI"].transfer(acct, 1_000_000e18, {'from': env.whales["DAI_EOA"]})
+        env.tokens["DAI"].approve(env.notional.address, 2**255-1, {'from': acct})
+        env.notional.batchBalanceAction(
+            acct,
+            [get_balance_action(2, "DepositUnderlyingAndMintNToken", depositActionAmount=(i + 1) * 10_000e18)],
+            {"from": acct}
+        )
+    return holders
+
+def synthetic_state(blockTime):
+    maturity = get_reference_time(blockTime) + QUARTER
+    market = (0, maturity, 1_000_000e8, 50_000_000e8, 1_000_000e8, 0.05e9, 0.05e9, 0)
+    return NTokenState(
+        2,
+        blockTime,
+        # totalSupply, emission rate, lastInitializedTime, parameters, cashBalance, integral, lastSupplyChangeTime
+        (2, 1_000_000e8, 1_000_000, 0, "0x0000000000", 5_000_000e8, 0, blockTime - 100 * DAY),
+        [(2, maturity, 2, 500_000e8)],
+        [(2, maturity, 1, -400_000e8)],
+        [market],
+        (1, 20, 30, 30, 0, 0, 0, 0, 0, [90], [21]),
+        ("0x0000000000000000000000000000000000000000", 2 * 10 ** 26, 10 ** 18),
+    )
+
+def test_mint_and_redeem_are_consistent():
+    state = synthetic_state(1_700_000_000)
+    [minted] = state.quote_mint([1_000_000e8])
+    assert minted == 1_000_000e8 * state.totalSupply // state.present_value()
+
+    # Redeeming without selling returns a pro rata share of cash and fCash
+    [(assetCash, residuals)] = state.quote_redeem([100_000e8], sellTokenAssets=False)
+    maturity = state.liquidityTokens[0][1]
+    # 10% of the fCash claim on the market net of 10% of the nToken's negative fCash
+    assert residuals == {maturity: 50_000e8 - 40_000e8}
+    # 10% of the nToken cash balance plus 10% of its cash claim on the market
+    assert assetCash == 500_000e8 + 2_500_000e8
+
+    # Selling the residual fCash to the market pays out close to the present value share
+    [(sold, residuals)] = state.quote_redeem([100_000e8])
+    assert residuals == {}
+    assert sold > assetCash
+
+def test_incentives_accrue_linearly():
+    state = synthetic_state(1_700_000_000)
+    lastClaim = state.blockTime - 10 * DAY
+    integralAtClaim = state.integral_total_supply(lastClaim)
+    holders = ([100_000e8, 0, 100_000e8], [lastClaim, lastClaim, 0], [integralAtClaim] * 3)
+    holders = tuple([int(v) for v in column] for column in holders)
+
+    projected = state.project_incentives(holders, [state.blockTime, state.blockTime + 10 * DAY])
+    now = projected[state.blockTime]
+    later = projected[state.blockTime + 10 * DAY]
+    # 10% of supply for 10 days of a 1M NOTE annual emission
+    assert now[0] == 100_000e8 * (10 * DAY * 10 ** 8 * 1_000_000 // YEAR) // 1_000_000e8
+    assert now[1] == 0 and now[2] == 0
+    assert pytest.approx(later[0], rel=1e-9) == 2 * now[0]
+
+def test_engine_matches_notional_views(env, minters):
+    blockTime = chain.time()
+    engine = NTokenEngine(env.notional)
+    state = engine.load([2], blockTime)[2]
+
+    amounts = [1_000e8, 100_000e8, 5_000_000e8]
+    for (amount, quoted) in zip(amounts, state.quote_mint(amounts)):
+        # cDAI has 8 decimals so external and internal precision match
+        assert pytest.approx(quoted, rel=1e-6) == env.notional.calculateNTokensToMint(2, amount)
+
+    chain.sleep(30 * DAY)
+    chain.mine()
+    blockTime = chain.time()
+    holders = engine.holders(2, minters)
+    # Integral supplies are uint128 on chain and do not fit in a uint64 array
+    assert max(holders[2]) > 2 ** 64
+    claimable = state.incentives(*holders, blockTime)
+    for (acct, quoted) in zip(minters, claimable):
+        assert pytest.approx(quoted, rel=1e-6) == env.notional.nTokenGetClaimableIncentives(acct, blockTime)
+
+def test_redeem_quote_matches_redemption(env, minters):
+    engine = NTokenEngine(env.notional)
+    state = engine.load([2])[2]
+    acct = minters[0]
+    balance = env.notional.nTokenBalanceOf(2, acct)
+
+    [(assetCash, residuals)] = state.quote_redeem([balance])
+    redeemed = env.notional.nTokenRedeem.call(acct, 2, balance, True, {"from": acct})
+    assert residuals == {}
+    assert pytest.approx(assetCash, rel=1e-5) == redeemed
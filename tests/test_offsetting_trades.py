@@ -0,0 +1,99 @@
+import pytest
+from brownie import accounts
+from brownie.test import given, strategy
+from scripts.date_time import (
+    DAY,
+    get_bit_num_from_maturity,
+    get_market_index,
+    get_market_maturities,
+)
+from scripts.offsetting_trades import (
+    encode_offsetting_trades_from_arrays,
+    encode_offsetting_trades_from_portfolio,
+    plan_offsetting_trades,
+)
+from tests.constants import START_TIME
+from tests.helpers import get_market_state
+
+ASSET_RATE = ("0x0000000000000000000000000000000000000000", 200000000000000000000000000, 10 ** 18)
+BLOCK_TIME = START_TIME + 3600
+# Maturities past the 20 year market have no market index
+MAX_DAYS = (get_market_maturities(7, BLOCK_TIME)[-1] - (BLOCK_TIME - BLOCK_TIME % DAY)) // DAY
+
+
+@pytest.fixture(scope="module")
+def lens(MockLibraryLens):
+    return MockLibraryLens.deploy({"from": accounts[0]})
+
+
+@given(
+    days=strategy("uint", min_value=1, max_value=MAX_DAYS),
+    notional=strategy("int88", min_value=-10 ** 20, max_value=10 ** 20),
+)
+def test_offsetting_trades_match_contract(lens, days, notional):
+    blockTime = BLOCK_TIME
+    # Every market maturity plus one arbitrary, possibly idiosyncratic, maturity
+    maturities = get_market_maturities(7, blockTime) + [blockTime - blockTime % DAY + days * DAY]
+    notionals = [notional] * len(maturities)
+
+    expected = encode_offsetting_trades_from_arrays(maturities, notionals, blockTime)
+    assert lens.encodeOffsettingTradesFromArrays(maturities, notionals, blockTime) == [
+        "0x" + t.hex() for t in expected
+    ]
+    assert list(zip(*lens.getMarketIndices(7, maturities, blockTime))) == [
+        get_market_index(7, m, blockTime) for m in maturities
+    ]
+    assert list(zip(*lens.getBitNumsFromMaturities(blockTime, maturities))) == [
+        get_bit_num_from_maturity(blockTime, m) for m in maturities
+    ]
+
+
+def test_offsetting_trades_from_portfolio():
+    blockTime = START_TIME + 3600
+    (threeMonth, sixMonth) = get_market_maturities(2, blockTime)
+    portfolio = [
+        (2, threeMonth, 1, 100e8),
+        (2, sixMonth, 1, -50e8),
+        # Idiosyncratic fCash cannot be traded out of
+        (2, threeMonth + 30 * DAY, 1, 100e8),
+        # Other currencies are ignored
+        (3, threeMonth, 1, 100e8),
+        # Six month liquidity token
+        (2, sixMonth, 3, 10e8),
+    ]
+
+    trades = encode_offsetting_trades_from_portfolio(
+        [(a[0], a[1], a[2], int(a[3])) for a in portfolio], 2, blockTime
+    )
+    # Borrow, lend, remove liquidity in that order
+    assert [t[0] for t in trades] == [1, 0, 3]
+    assert [t[1] for t in trades] == [1, 2, 2]
+
+
+def test_plan_skips_idiosyncratic_and_thin_markets():
+    blockTime = START_TIME + 3600
+    markets = [
+        get_market_state(m, totalfCash=1000e8, totalAssetCash=50000e8, lastImpliedRate=0.05e9)
+        for m in get_market_maturities(2, blockTime)
+    ]
+    markets = [(m[0], m[1], int(m[2]), int(m[3]), int(m[4]), int(m[5]), int(m[6]), m[7]) for m in markets]
+    (threeMonth, sixMonth) = (markets[0][1], markets[1][1])
+
+    plan = plan_offsetting_trades(
+        [threeMonth, sixMonth, threeMonth + 30 * DAY, sixMonth, sixMonth + 30 * DAY],
+        [100e8, -100e8, 100e8, -2000e8, 100e8],
+        markets,
+        ASSET_RATE,
+        blockTime,
+        slippageBasisPoints=50,
+    )
+
+    assert plan["maturities"] == [threeMonth, sixMonth]
+    assert [reason for (_, _, reason) in plan["skipped"]] == [
+        "Idiosyncratic maturity",
+        "Insufficient market liquidity",
+        "No market for maturity",
+    ]
+    # Borrow has a max implied rate 50 bps over the last implied rate, lend a min rate 50 bps under
+    assert int.from_bytes(plan["trades"][0][13:17], "big") == 0.055e9
+    assert int.from_bytes(plan["trades"][1][13:17], "big") == 0.045e9
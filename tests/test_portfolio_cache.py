@@ -0,0 +1,70 @@
+import pytest
+from scripts.portfolio_cache import PortfolioArrays, PortfolioCache, encode_erc1155_id
+from tests.helpers import get_balance_trade_action
+
+pytestmark = pytest.mark.usefixtures("run_around_tests")
+
+
+def lend(env, account, notional):
+    return env.notional.batchBalanceAndTradeAction(
+        account,
+        [
+            get_balance_trade_action(
+                2,
+                "DepositUnderlying",
+                [{"tradeActionType": "Lend", "marketIndex": 1, "notional": notional, "minSlippage": 0}],
+                depositActionAmount=notional * 10 ** 10 * 1.1,
+                withdrawEntireCashBalance=True,
+                redeemToUnderlying=True,
+            )
+        ],
+        {"from": account},
+    )
+
+
+def assert_cache_matches(env, cache, account):
+    portfolio = [tuple(a[0:4]) for a in env.notional.getAccountPortfolio(account)]
+    assert cache.get_portfolio(account) == sorted(portfolio)
+    assert cache.get_balance(2, account) == tuple(env.notional.getAccountBalance(2, account)[0:2])
+    assert cache.get_context(account) == env.notional.getAccountContext(account)
+
+
+def test_portfolio_arrays_nets_off_assets():
+    portfolio = PortfolioArrays([(2, 1000, 1, 100e8), (3, 1000, 1, -50e8)])
+    portfolio.update(2, 1000, 1, -40e8)
+    portfolio.update(2, 2000, 1, 10e8)
+    assert portfolio.to_list() == [(2, 1000, 1, 60e8), (2, 2000, 1, 10e8), (3, 1000, 1, -50e8)]
+
+    portfolio.update(3, 1000, 1, 50e8)
+    assert len(portfolio) == 2
+    assert encode_erc1155_id(2, 1000, 1) >> 48 == 2
+
+
+def test_cache_applies_trade_and_transfer_events(env, accounts):
+    (lender, receiver) = (accounts[4], accounts[5])
+    env.tokens["DAI"].transfer(lender, 1_000_000e18, {'from': env.whales["DAI_EOA"]})
+    env.tokens["DAI"].approve(env.notional.address, 2**255-1, {'from': lender})
+
+    cache = PortfolioCache(env.notional)
+    cache.track([lender.address, receiver.address])
+
+    txn = lend(env, lender, 10_000e8)
+    cache.apply_transaction(txn)
+    assert_cache_matches(env, cache, lender)
+
+    maturity = env.notional.getActiveMarkets(2)[0][1]
+    txn = env.notional.safeTransferFrom(
+        lender, receiver, encode_erc1155_id(2, maturity, 1), 4_000e8, "", {"from": lender}
+    )
+    cache.apply_transaction(txn)
+    assert_cache_matches(env, cache, lender)
+    assert_cache_matches(env, cache, receiver)
+
+    # Events fetched from logs are applied the same way
+    lend(env, lender, 1_000e8)
+    cache.poll()
+    assert_cache_matches(env, cache, lender)
+
+    cache.reconcileInterval = 0
+    assert cache.reconcile() == []
+    assert cache.drift == 0
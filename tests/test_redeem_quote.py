@@ -0,0 +1,91 @@
+import brownie
+import pytest
+from brownie import chain
+from scripts.date_time import DAY
+from scripts.market_math import calculate_trade
+from scripts.offsetting_trades import BASIS_POINT
+from scripts.redeem_quote import quote_redeem
+
+pytestmark = pytest.mark.usefixtures("run_around_tests")
+
+@pytest.fixture()
+def holder(wrapper, env, accounts):
+    acct = accounts[4]
+    env.tokens["DAI"].transfer(acct, 1_000_000e18, {'from': env.whales["DAI_EOA"]})
+    env.tokens["DAI"].approve(wrapper.address, 2**255-1, {'from': acct})
+    wrapper.mint(120_000e18, 100_000e8, acct.address, 0, True, {'from': acct})
+    return acct
+
+def test_market_math_moves_rates():
+    # 1M fCash against 1M underlying at 5%, asset cash is worth 0.02 underlying
+    market = (0, 0, 1_000_000e8, 50_000_000e8, 1_000_000e8, 0.05e9, 0.05e9, 0)
+    cashGroup = (3, 20, 30, 30, 0, 0, 0, 0, 0, [90, 90, 90], [21, 21, 21])
+    assetRate = ("0x0000000000000000000000000000000000000000", 2 * 10 ** 26, 10 ** 18)
+    market = tuple(int(m) for m in market)
+
+    (borrowCash, borrowFee, borrowRate) = calculate_trade(market, cashGroup, assetRate, -10_000e8, 90 * DAY, 1)
+    (lendCash, lendFee, lendRate) = calculate_trade(market, cashGroup, assetRate, 10_000e8, 90 * DAY, 1)
+    assert 0 < borrowCash < -lendCash < 10_000e8
+    assert lendRate < 0.05e9 < borrowRate
+    assert borrowFee > 0 and lendFee > 0
+
+    # Borrowing past the maximum market proportion fails
+    assert calculate_trade(market, cashGroup, assetRate, -5_000_000e8, 90 * DAY, 1) is None
+
+def test_model_matches_notional_views(wrapper, env):
+    blockTime = chain.time()
+    markets = env.notional.getActiveMarkets(2)
+    cashGroup = env.notional.getCashGroup(2)
+    assetRate = env.notional.getCurrencyAndRates(2)[3]
+    for fCash in [-1_000e8, -100_000e8, 100_000e8]:
+        (_, underlying) = env.notional.getCashAmountGivenfCashAmount(2, fCash, 1, blockTime)
+        (modeled, _, _) = calculate_trade(markets[0], cashGroup, assetRate, fCash, markets[0][1] - blockTime, 1)
+        assert pytest.approx(modeled, rel=1e-5) == underlying
+
+def test_quote_sell_path(wrapper, holder, env):
+    quote = quote_redeem(env.notional, wrapper, holder.address, 50_000e8, slippageBasisPoints=10)
+    assert quote["path"] == "sell"
+    assert quote["success"]
+    assert quote["maxImpliedRate"] == quote["impliedRate"] + 10 * BASIS_POINT
+
+    balanceBefore = env.tokens["DAI"].balanceOf(holder)
+    wrapper.redeem(50_000e8, quote["opts"], {"from": holder})
+    received = env.tokens["DAI"].balanceOf(holder) - balanceBefore
+    assert pytest.approx(received, rel=1e-5) == quote["expectedCash"]
+
+def test_quote_bound_is_tight(wrapper, holder, env):
+    quote = quote_redeem(env.notional, wrapper, holder.address, 50_000e8, slippageBasisPoints=10)
+    (toUnderlying, transferfCash, receiver, _) = quote["opts"]
+    with brownie.reverts("Trade failed, slippage"):
+        wrapper.redeem(
+            50_000e8,
+            (toUnderlying, transferfCash, receiver, quote["impliedRate"] - 10 * BASIS_POINT),
+            {"from": holder}
+        )
+
+def test_quote_falls_back_to_transfer(wrapper, holder, env):
+    # More fCash than the market can absorb cannot be sold
+    quote = quote_redeem(env.notional, wrapper, holder.address, 2 ** 80)
+    assert quote["path"] == "transferfCash"
+    assert quote["reason"] == "Insufficient market liquidity"
+    # The eth_call catches that the holder does not have the balance
+    assert not quote["success"]
+
+    quote = quote_redeem(env.notional, wrapper, holder.address, 100_000e8, transferfCash=True)
+    assert quote["path"] == "transferfCash"
+    assert quote["expectedCash"] == 0
+    assert quote["success"]
+
+    wrapper.redeem(100_000e8, quote["opts"], {"from": holder})
+    assert env.notional.balanceOf(holder.address, wrapper.getfCashId()) == 100_000e8
+
+def test_quote_matured_path(wrapper, holder, env):
+    chain.mine(1, timestamp=wrapper.getMaturity())
+    quote = quote_redeem(env.notional, wrapper, holder.address, 50_000e8, toUnderlying=False)
+    assert quote["path"] == "matured"
+    assert quote["success"]
+
+    balanceBefore = env.tokens["cDAI"].balanceOf(holder)
+    wrapper.redeem(50_000e8, quote["opts"], {"from": holder})
+    received = env.tokens["cDAI"].balanceOf(holder) - balanceBefore
+    assert pytest.approx(received, rel=1e-6) == quote["expectedCash"]
@@ -0,0 +1,56 @@
+import brownie
+import pytest
+from brownie import chain
+from scripts.redemption_sweeper import find_holders, redeemable, sweep
+
+pytestmark = pytest.mark.usefixtures("run_around_tests")
+
+@pytest.fixture()
+def holders(wrapper, env, accounts):
+    lender = accounts[4]
+    env.tokens["DAI"].transfer(lender, 1_000_000e18, {'from': env.whales["DAI_EOA"]})
+    env.tokens["DAI"].approve(wrapper.address, 2**255-1, {'from': lender})
+    wrapper.mint(120_000e18, 100_000e8, lender.address, 0, True, {'from': lender})
+
+    holders = accounts[5:10]
+    for (i, h) in enumerate(holders):
+        wrapper.transfer(h, (i + 1) * 5_000e8, {"from": lender})
+    return [lender] + list(holders)
+
+def test_sweep_requires_maturity_and_operator(wrapper, holders, accounts):
+    keeper = accounts[1]
+    with brownie.reverts("fCash not matured"):
+        wrapper.batchRedeemMatured([holders[1]], False, {"from": keeper})
+
+    chain.mine(1, timestamp=wrapper.getMaturity())
+    with brownie.reverts("Not operator"):
+        wrapper.batchRedeemMatured([holders[1]], False, {"from": keeper})
+
+def test_sweep_redeems_holders_pro_rata(wrapper, holders, env, accounts):
+    keeper = accounts[1]
+    (lender, swept) = (holders[0], holders[1:])
+    for h in swept:
+        wrapper.authorizeOperator(keeper, {"from": h})
+
+    assert find_holders(wrapper) == [h.address for h in holders]
+    # The lender has not authorized the keeper
+    assert redeemable(wrapper, keeper, find_holders(wrapper)) == [h.address for h in swept]
+
+    chain.mine(1, timestamp=wrapper.getMaturity())
+    balances = [wrapper.balanceOf(h) for h in swept]
+    report = sweep(wrapper, keeper, [h.address for h in swept], chunkSize=2)
+
+    assert report["redeemed"] == len(swept)
+    assert report["batches"] == 3
+    assert report["failed"] == {}
+    for (h, balance) in zip(swept, balances):
+        assert wrapper.balanceOf(h) == 0
+        # Each holder receives the same claim as an individual redemption
+        expected = balance * 1e10 * 1e18 / env.tokens["cDAI"].exchangeRateStored()
+        assert pytest.approx(env.tokens["cDAI"].balanceOf(h), rel=1e-5) == expected
+
+    # The remaining holder redeems individually against the settled wrapper
+    txn = wrapper.redeemToAsset(wrapper.balanceOf(lender), lender, 0, {"from": lender})
+    assert report["gasPerHolder"] < txn.gas_used
+    assert wrapper.totalSupply() == 0
+    assert env.notional.getAccountBalance(2, wrapper.address)[0] <= 1
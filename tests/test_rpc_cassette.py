@@ -0,0 +1,92 @@
+import json
+import requests
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from scripts.rpc_cassette import RECORD, REPLAY, Cassette, CassetteProxy, use_cassette
+
+@pytest.fixture()
+def upstream():
+    # Archive node stand in that counts the requests it serves
+    served = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            served.append(request["method"])
+            result = "0x10" if request["method"] == "eth_blockNumber" else "0x" + "ab" * 32
+            body = json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": result}).encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield ("http://127.0.0.1:{}".format(server.server_address[1]), served)
+    server.shutdown()
+
+def rpc(url, method, params, id=1):
+    return requests.post(url, json={"jsonrpc": "2.0", "id": id, "method": method, "params": params}).json()
+
+def test_record_then_replay(upstream, tmp_path):
+    (url, served) = upstream
+    path = str(tmp_path / "cassette.json.gz")
+    storage = ["0x" + "11" * 20, "0x0", "0x10"]
+
+    proxy = CassetteProxy(Cassette(path), RECORD, url).start()
+    assert proxy.pin_block() == 16
+    recorded = rpc(proxy.url, "eth_getStorageAt", storage)
+    proxy.stop()
+    assert served == ["eth_blockNumber", "eth_getStorageAt"]
+
+    proxy = CassetteProxy(Cassette(path), REPLAY).start()
+    assert proxy.pin_block() == 16
+    # Served from disk under the caller's request id
+    replayed = rpc(proxy.url, "eth_getStorageAt", storage, id=7)
+    assert replayed["result"] == recorded["result"] and replayed["id"] == 7
+    # Requests that were never recorded fail instead of reaching the network
+    assert "error" in rpc(proxy.url, "eth_getCode", storage[0:1] + ["0x10"])
+    assert proxy.misses == 1
+    proxy.stop()
+    assert len(served) == 2
+
+def test_batches_are_replayed(upstream, tmp_path):
+    (url, _) = upstream
+    path = str(tmp_path / "cassette.json.gz")
+    batch = [
+        {"jsonrpc": "2.0", "id": i, "method": "eth_getBalance", "params": ["0x" + "%040x" % i, "0x10"]}
+        for i in range(3)
+    ]
+    proxy = CassetteProxy(Cassette(path), RECORD, url).start()
+    proxy.cassette.block = 16
+    recorded = requests.post(proxy.url, json=batch).json()
+    proxy.stop()
+
+    proxy = CassetteProxy(Cassette(path), REPLAY).start()
+    assert requests.post(proxy.url, json=batch).json() == recorded
+    proxy.stop()
+
+def test_pins_brownie_fork_config(upstream, tmp_path):
+    (url, _) = upstream
+    path = str(tmp_path / "cassette.json.gz")
+    networks = {
+        "mainnet": {"host": url, "chainid": "1"},
+        "mainnet-fork": {"cmd": "ganache-cli", "cmd_settings": {"fork": "mainnet"}},
+        "hardhat-fork": {"cmd": "npx hardhat node", "cmd_settings": {"fork": "mainnet", "fork_block": 12}},
+    }
+    proxy = use_cassette(networks, "mainnet-fork", path, RECORD)
+    assert networks["mainnet-fork"]["cmd_settings"]["fork"] == "{}@16".format(proxy.url)
+    assert networks["mainnet-fork"]["cmd_settings"]["chain_id"] == 1
+    proxy.stop()
+
+    # The configured fork block is used for a new cassette
+    proxy = use_cassette(networks, "hardhat-fork", str(tmp_path / "hardhat.json.gz"), RECORD)
+    assert networks["hardhat-fork"]["cmd_settings"] == {"fork": proxy.url, "fork_block": 12, "chain_id": 1}
+    proxy.stop()
+
+    with pytest.raises(Exception):
+        use_cassette(networks, "hardhat-fork", str(tmp_path / "missing.json.gz"), REPLAY)
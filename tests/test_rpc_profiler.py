@@ -0,0 +1,36 @@
+import pytest
+from scripts.EnvironmentConfig import getForkEnvironment
+from scripts.rpc_profiler import RPCProfiler
+
+pytestmark = pytest.mark.usefixtures("run_around_tests")
+
+def test_profiles_environment_setup():
+    with RPCProfiler() as profiler:
+        env = getForkEnvironment()
+    report = profiler.report()
+    assert report["requests"] == len(profiler.calls) > 0
+    # Every request is attributed to the environment loader
+    assert all("scripts.EnvironmentConfig" in ";".join(c["stack"]) for c in profiler.calls)
+    assert "test_profiles_environment_setup" in profiler.folded()
+
+    # Calls are named once brownie knows the contract
+    profiler.reset()
+    with profiler:
+        env.notional.getMaxCurrencyId()
+    [call] = profiler.report()["calls"]
+    assert call["method"] == "eth_call"
+    assert call["function"] == "getMaxCurrencyId"
+
+def test_counts_redundant_reads():
+    env = getForkEnvironment()
+    with RPCProfiler() as profiler:
+        for _ in range(3):
+            env.notional.getCurrency(2)
+    calls = [c for c in profiler.report()["calls"] if c["method"] == "eth_call"]
+    assert calls[0]["count"] == 3
+    assert profiler.report()["redundant"] >= 2
+
+    # Stopping restores the provider
+    recorded = len(profiler.calls)
+    env.notional.getCurrency(2)
+    assert len(profiler.calls) == recorded
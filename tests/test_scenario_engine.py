@@ -0,0 +1,75 @@
+import pytest
+from scripts.scenario_engine import (
+    CurrencySnapshot,
+    Scenario,
+    _to_eth,
+    evaluate,
+    run_scenarios,
+    scenario_grid,
+)
+from tests.constants import CASH_GROUP_PARAMETERS, MARKETS, SECONDS_IN_DAY, START_TIME
+from tests.helpers import get_market_curve
+
+BLOCK_TIME = START_TIME + SECONDS_IN_DAY
+ASSET_RATE = ("0x0000000000000000000000000000000000000000", 200000000000000000000000000, 10 ** 18)
+ETH_RATE = (10 ** 18, 10 ** 18, 140, 100, 105)
+
+
+@pytest.fixture()
+def snapshots():
+    markets = get_market_curve(3, "flat")
+    # Markets hold 1000 underlying cash against 1000 fCash
+    markets = [(m[0], m[1], 1000e8, 50000e8, 1000e8, m[5], m[6], m[7]) for m in markets]
+    return {2: CurrencySnapshot(2, BLOCK_TIME, markets, ASSET_RATE, ETH_RATE, CASH_GROUP_PARAMETERS)}
+
+
+def test_rate_shocks_move_values(snapshots):
+    positions = [(2, MARKETS[0], 100e8), (2, MARKETS[2], 100e8)]
+    (base, _, _) = evaluate(snapshots, Scenario("base"), positions)
+    (up, _, _) = evaluate(snapshots, Scenario("up", rateShock=100), positions)
+    (steep, _, _) = evaluate(snapshots, Scenario("steep", rateShock=[0, 0, 200]), positions)
+
+    assert up[0] < base[0] and up[1] < base[1]
+    assert steep[0] == base[0] and steep[1] < up[1]
+
+
+def test_liquidity_drain_blocks_exits(snapshots):
+    positions = [(2, MARKETS[0], 500e8), (2, MARKETS[0] + 10 * SECONDS_IN_DAY, 1e8)]
+    (_, sellable, _) = evaluate(snapshots, Scenario("base"), positions)
+    assert sellable == [True, False]
+
+    (_, sellable, _) = evaluate(snapshots, Scenario("drain", liquidityDrain=99), positions)
+    assert sellable == [False, False]
+
+
+def test_free_collateral_under_asset_rate_shock(snapshots):
+    # 5000 cDAI of cash (100 DAI) against 90 DAI of debt
+    account = ({2: 5000e8}, [(2, MARKETS[0], 1, -90e8)])
+    (_, _, fc) = evaluate(snapshots, Scenario("base"), [], account)
+    (_, _, fcShocked) = evaluate(snapshots, Scenario("assetRate", assetRateShock=-2000), [], account)
+    assert fc > 0
+    assert fcShocked < 0
+
+
+def test_run_scenarios_returns_flat_arrays(snapshots):
+    positions = [(2, MARKETS[0], 100e8), (2, MARKETS[1], -50e8)]
+    account = ({2: 5000e8}, [(2, MARKETS[1], 1, -50e8)])
+    scenarios = scenario_grid([-100, 0, 100], assetRateShocks=[0, -1000], liquidityDrains=[0, 50])
+
+    results = run_scenarios(snapshots, scenarios, positions, account, maxWorkers=2, chunkSize=5)
+    assert len(results["scenarios"]) == 12
+    assert len(results["values"]) == 12 * len(positions)
+    assert len(results["freeCollateral"]) == 12
+
+    for (i, scenario) in enumerate(scenarios):
+        (values, sellable, fc) = evaluate(snapshots, scenario, positions, account)
+        assert list(results["values"][i * 2 : i * 2 + 2]) == values
+        assert list(results["sellable"][i * 2 : i * 2 + 2]) == sellable
+        assert results["freeCollateral"][i] == fc
+
+
+def test_debts_truncate_towards_zero():
+    # Mirrors ExchangeRate.convertToETH, divides by percentage decimals and then rate decimals
+    ethRate = (10 ** 8, 3 * 10 ** 7, 140, 100, 105)
+    assert _to_eth(ethRate, -101) == -42
+    assert _to_eth(ethRate, 101) == 30
@@ -0,0 +1,63 @@
+import brownie
+import eth_abi
+import pytest
+from brownie import chain
+from scripts.univ3_router import encode_path
+
+pytestmark = pytest.mark.usefixtures("run_around_tests")
+
+UNIV3_SWAP_ROUTER = "0xE592427A0AEce4244f9A1c1e4C6C5b6D7Bd5b8FC"
+AAVE_LENDING_POOL = "0x7d2768dE32b0b80b7a3454c06BdAc94A69DDc7A9"
+AAVE_ADDRESS_PROVIDER = "0xB53C1a33016B2DC2fF3653530bfF1848a515c8c5"
+
+
+def multi_hop_params(tokens, fees, suffix=b""):
+    path = encode_path([t.address for t in tokens], fees) + suffix
+    return eth_abi.encode_abi(["uint24", "uint256", "uint160", "bytes"], [0, chain.time() + 3600, 0, path])
+
+
+@pytest.fixture()
+def liquidator(MockUniV3DexTrade, env):
+    liquidator = MockUniV3DexTrade.deploy(
+        AAVE_LENDING_POOL,
+        AAVE_ADDRESS_PROVIDER,
+        env.deployer,
+        UNIV3_SWAP_ROUTER,
+        {"from": env.deployer},
+    )
+    liquidator.approveToken(env.tokens["WETH"].address, UNIV3_SWAP_ROUTER, {"from": env.deployer})
+    # WETH's fallback wraps the ETH sent to it
+    env.whales["ETH_EOA"].transfer(env.tokens["WETH"], 10e18)
+    env.tokens["WETH"].transfer(liquidator, 10e18, {"from": env.whales["ETH_EOA"]})
+    return liquidator
+
+
+def test_multi_hop_trade(liquidator, env):
+    (weth, usdc, dai) = (env.tokens["WETH"], env.tokens["USDC"], env.tokens["DAI"])
+    params = multi_hop_params([weth, usdc, dai], [500, 100])
+
+    liquidator.dexTrade(weth, dai, 1e18, 0, params, {"from": env.deployer})
+    assert weth.balanceOf(liquidator) == 9e18
+    assert dai.balanceOf(liquidator) > 0
+    assert usdc.balanceOf(liquidator) == 0
+
+
+def test_multi_hop_path_must_start_at_from(liquidator, env):
+    (weth, usdc, dai) = (env.tokens["WETH"], env.tokens["USDC"], env.tokens["DAI"])
+    params = multi_hop_params([usdc, weth, dai], [500, 3000])
+
+    with brownie.reverts("Invalid path"):
+        liquidator.dexTrade(weth, dai, 1e18, 0, params, {"from": env.deployer})
+
+
+def test_multi_hop_path_must_end_at_to(liquidator, env):
+    (weth, usdc, dai) = (env.tokens["WETH"], env.tokens["USDC"], env.tokens["DAI"])
+    params = multi_hop_params([weth, dai, usdc], [3000, 100])
+
+    with brownie.reverts("Invalid path"):
+        liquidator.dexTrade(weth, dai, 1e18, 0, params, {"from": env.deployer})
+
+    # Trailing bytes that are not a whole hop are rejected as well
+    params = multi_hop_params([weth, usdc, dai], [500, 100], b"\x00")
+    with brownie.reverts("Invalid path"):
+        liquidator.dexTrade(weth, dai, 1e18, 0, params, {"from": env.deployer})
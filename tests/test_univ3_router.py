@@ -0,0 +1,143 @@
+import eth_abi
+import pytest
+from scripts.univ3_router import (
+    MAX_SQRT_RATIO,
+    MAX_TICK,
+    MIN_SQRT_RATIO,
+    MIN_TICK,
+    Pool,
+    Router,
+    flash_loan_repay_amount,
+    get_sqrt_ratio_at_tick,
+    get_tick_at_sqrt_ratio,
+    plan_repayment_trade,
+)
+
+DAI = "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+USDC = "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"
+WETH = "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+LIQUIDITY = 10 ** 24
+
+
+def mock_pool(address, token0, token1, fee, tick, liquidity, tickSpacing=60, width=6000):
+    # Single position of `liquidity` between tick - width and tick + width
+    lower = (tick - width) // tickSpacing * tickSpacing
+    upper = (tick + width) // tickSpacing * tickSpacing
+    return Pool(
+        address,
+        token0,
+        token1,
+        fee,
+        tickSpacing,
+        get_sqrt_ratio_at_tick(tick),
+        tick,
+        liquidity,
+        {lower: liquidity, upper: -liquidity},
+    )
+
+
+def test_tick_math_bounds():
+    assert get_sqrt_ratio_at_tick(MIN_TICK) == MIN_SQRT_RATIO
+    assert get_sqrt_ratio_at_tick(MAX_TICK) == MAX_SQRT_RATIO
+    assert get_sqrt_ratio_at_tick(0) == 2 ** 96
+
+    for tick in [-500000, -60, -1, 1, 60, 500000]:
+        assert get_tick_at_sqrt_ratio(get_sqrt_ratio_at_tick(tick)) == tick
+        assert get_tick_at_sqrt_ratio(get_sqrt_ratio_at_tick(tick) - 1) == tick - 1
+
+
+def test_swap_within_range():
+    pool = mock_pool("0x01", DAI, USDC, 500, 0, LIQUIDITY)
+    (amountIn, amountOut) = pool.swap(DAI, 10 ** 18)
+
+    assert amountIn == 10 ** 18
+    # At a price of 1 the output is the input less the 5 bps fee and a small price impact
+    assert 10 ** 18 * 9994 // 10000 < amountOut < 10 ** 18 * 9995 // 10000
+    # Quoting does not change the cached state
+    assert pool.sqrtPriceX96 == 2 ** 96
+
+
+@pytest.mark.parametrize("tokenIn", [DAI, USDC])
+def test_exact_output_round_trip(tokenIn):
+    pool = mock_pool("0x01", DAI, USDC, 3000, 120, LIQUIDITY)
+    (_, amountOut) = pool.swap(tokenIn, 10 ** 20)
+    (amountIn, exactOut) = pool.swap(tokenIn, -amountOut)
+
+    assert exactOut == amountOut
+    assert amountIn <= 10 ** 20
+
+
+def test_swap_crosses_ticks():
+    # A narrow position inside a deeper, wider one
+    pool = Pool(
+        "0x01", DAI, USDC, 3000, 60, get_sqrt_ratio_at_tick(0), 0, 11 * LIQUIDITY,
+        {-60: LIQUIDITY, 60: -LIQUIDITY, -6000: 10 * LIQUIDITY, 6000: -10 * LIQUIDITY},
+    )
+
+    (_, amountOut) = pool.swap(DAI, 10 ** 23, update=True)
+    assert pool.tick < -60
+    assert pool.liquidity == 10 * LIQUIDITY
+    assert amountOut < 10 ** 23
+
+
+def test_swap_outside_cached_ticks_reverts():
+    pool = mock_pool("0x01", DAI, USDC, 500, 0, LIQUIDITY)
+    pool.minWord = pool.maxWord = 0
+
+    with pytest.raises(Exception, match="cached ticks"):
+        pool.swap(DAI, 10 ** 27)
+
+
+def test_router_prefers_deeper_multi_hop():
+    # Direct DAI/USDC pool is shallow, DAI -> WETH -> USDC is deep
+    router = Router(
+        [
+            mock_pool("0x01", DAI, USDC, 500, 0, LIQUIDITY // 10000),
+            mock_pool("0x02", DAI, WETH, 3000, 0, 100 * LIQUIDITY),
+            mock_pool("0x03", USDC, WETH, 3000, 0, 100 * LIQUIDITY),
+        ]
+    )
+
+    assert len(router.routes(DAI, USDC)) == 2
+    assert len(router.routes(DAI, USDC, maxHops=1)) == 1
+
+    (route, amountOut) = router.best_exact_input(DAI, USDC, 10 ** 21)
+    assert route.tokens == [DAI, WETH, USDC]
+    assert amountOut == route.quote_exact_input(10 ** 21)
+
+    (route, amountOut) = router.best_exact_input(DAI, USDC, 10 ** 12)
+    assert route.tokens == [DAI, USDC]
+
+
+def test_plan_repayment_trade_params():
+    router = Router([mock_pool("0x01", DAI, USDC, 500, 0, LIQUIDITY)])
+    flashLoanAmount = 10 ** 18
+    plan = plan_repayment_trade(router, DAI, 2 * 10 ** 18, USDC, flashLoanAmount, 1000)
+
+    assert plan["repayAmount"] == flash_loan_repay_amount(flashLoanAmount)
+    assert plan["profit"] == plan["amountOut"] - plan["repayAmount"]
+    assert plan["repayAmount"] < plan["collateralRequired"] * 1.001
+    assert plan["tradeCallData"] == eth_abi.encode_abi(
+        ["uint24", "uint256", "uint160"], [500, 1000, 0]
+    )
+
+    with pytest.raises(Exception, match="does not cover"):
+        plan_repayment_trade(router, DAI, flashLoanAmount, USDC, flashLoanAmount, 1000)
+
+
+def test_multi_hop_trade_params():
+    router = Router(
+        [
+            mock_pool("0x02", DAI, WETH, 3000, 0, LIQUIDITY),
+            mock_pool("0x03", USDC, WETH, 500, 0, LIQUIDITY),
+        ]
+    )
+    (route, _) = router.best_exact_input(DAI, USDC, 10 ** 18)
+    path = route.path()
+
+    assert len(path) == 20 * 3 + 3 * 2
+    assert path[20:23] == (3000).to_bytes(3, "big")
+    assert path[43:46] == (500).to_bytes(3, "big")
+    assert eth_abi.decode_abi(
+        ["uint24", "uint256", "uint160", "bytes"], route.trade_params(1000)
+    ) == (0, 1000, 0, path)
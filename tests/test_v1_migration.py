@@ -0,0 +1,127 @@
+import brownie
+import pytest
+from brownie import chain, interface
+from scripts.v1_migration import V1_DAI, V1_ETH, V1_USDC, V1_WBTC, V1MigrationPlanner
+
+pytestmark = pytest.mark.usefixtures("run_around_tests")
+
+UNIV3_SWAP_ROUTER = "0xE592427A0AEce4244f9A1c1e4C6C5b6D7Bd5b8FC"
+V2_ETH = 1
+V2_DAI = 2
+V2_USDC = 3
+V2_WBTC = 4
+
+
+@pytest.fixture()
+def v1(MockNotionalV1, env):
+    # Indexed by V1 currency id
+    tokens = [env.tokens["WETH"], env.tokens["DAI"], env.tokens["USDC"], env.tokens["WBTC"]]
+    return MockNotionalV1.deploy(tokens, {"from": env.deployer})
+
+
+@pytest.fixture()
+def migrator(NotionalV1ToNotionalV2, v1, env):
+    migrator = NotionalV1ToNotionalV2.deploy(
+        v1, v1, env.tokens["WBTC"], V2_DAI, V2_USDC, V2_WBTC, {"from": env.deployer}
+    )
+    migrator.enableWBTC({"from": env.deployer})
+    env.notional.updateAuthorizedCallbackContract(migrator, True, {"from": env.owner})
+    return migrator
+
+
+@pytest.fixture()
+def planner(migrator, v1, env):
+    return V1MigrationPlanner(env.notional, migrator, v1)
+
+
+def fund_v1_collateral(env, v1, account, eth=0, wbtcFromEth=0):
+    """Backs the account's V1 ETH and WBTC balances with tokens held by the mock"""
+    whale = env.whales["ETH_EOA"]
+    if eth > 0:
+        # WETH's fallback wraps the ETH sent to it
+        whale.transfer(env.tokens["WETH"], eth)
+        env.tokens["WETH"].transfer(v1, eth, {"from": whale})
+        v1.setBalance(account, V1_ETH, eth)
+    if wbtcFromEth > 0:
+        router = interface.ISwapRouter(UNIV3_SWAP_ROUTER)
+        wbtc = env.tokens["WBTC"]
+        router.exactInputSingle(
+            (env.tokens["WETH"], wbtc, 3000, v1, chain.time() + 3600, wbtcFromEth, 0, 0),
+            {"from": whale, "value": wbtcFromEth},
+        )
+        v1.setBalance(account, V1_WBTC, wbtc.balanceOf(v1))
+
+
+def set_v1_debt(env, v1, account, dai=0, usdc=0):
+    v1.setBalance(account, V1_DAI, -dai)
+    v1.setBalance(account, V1_USDC, -usdc)
+    # Borrowed V2 cash is repaid to V1 from the account's wallet
+    env.tokens["DAI"].approve(v1, 2 ** 255, {"from": account})
+    env.tokens["USDC"].approve(v1, 2 ** 255, {"from": account})
+
+
+def test_plan_account(planner, accounts):
+    blockTime = chain.time()
+    account = accounts[5].address
+
+    plan = planner.plan_account(account, [10e18, 0, 0, 0], blockTime)
+    assert not plan["feasible"]
+    assert plan["reason"] == "No V1 debt"
+
+    plan = planner.plan_account(account, [0, -1000e18, 0, 0], blockTime)
+    assert not plan["feasible"]
+    assert plan["reason"] == "No V1 collateral"
+
+    plan = planner.plan_account(account, [10e18, -1000e18, -1000e6, 1e8], blockTime)
+    assert plan["feasible"]
+    assert plan["v1DebtCurrencyIds"] == [V1_DAI, V1_USDC]
+    assert plan["v1RepayAmounts"] == [1000e18, 1000e6]
+    assert [a[1] for a in plan["borrowActions"]] == [V2_DAI, V2_USDC]
+    assert plan["debtETH"] < plan["collateralETH"]
+    assert plan["legacyTransactions"] == 2
+
+    plan = planner.plan_account(account, [0.01e18, -10_000e18, 0, 0], blockTime)
+    assert not plan["feasible"]
+    assert plan["reason"] == "Insufficient collateral for Notional V2"
+
+
+def test_migrate_multiple_debts_eth_and_wbtc(planner, migrator, v1, env, accounts):
+    account = accounts[5]
+    fund_v1_collateral(env, v1, account, eth=10e18, wbtcFromEth=3e18)
+    set_v1_debt(env, v1, account, dai=5_000e18, usdc=5_000e6)
+    assert v1.getBalances(account)[V1_WBTC] > 0
+
+    [plan] = planner.plan([account.address])
+    assert plan["feasible"]
+    migrator.migrateAccount(*planner.migrate_args(plan), {"from": account})
+
+    # Every V1 debt is repaid and all V1 collateral withdrawn in the one transaction
+    assert v1.getBalances(account) == [0, 0, 0, 0]
+    assert env.tokens["WETH"].balanceOf(v1) == 0
+    assert env.tokens["WBTC"].balanceOf(v1) == 0
+    assert env.tokens["WETH"].balanceOf(migrator) == 0
+    assert env.tokens["WBTC"].balanceOf(migrator) == 0
+
+    # V2 holds the collateral as cash and the debts as fCash
+    assert env.notional.getAccountBalance(V2_ETH, account)[0] > 0
+    assert env.notional.getAccountBalance(V2_WBTC, account)[0] > 0
+    portfolio = env.notional.getAccountPortfolio(account)
+    assert sorted(a[0] for a in portfolio) == [V2_DAI, V2_USDC]
+    assert all(a[3] < 0 for a in portfolio)
+
+
+def test_migrate_fails_free_collateral(planner, migrator, v1, env, accounts):
+    account = accounts[5]
+    fund_v1_collateral(env, v1, account, eth=0.1e18)
+    set_v1_debt(env, v1, account, dai=5_000e18)
+
+    [plan] = planner.plan([account.address])
+    assert not plan["feasible"]
+    assert plan["reason"] == "Insufficient collateral for Notional V2"
+
+    with brownie.reverts("Insufficient free collateral"):
+        migrator.migrateAccount(*planner.migrate_args(plan), {"from": account})
+
+    # Nothing moved in V1
+    assert v1.getBalances(account) == [0.1e18, -5_000e18, 0, 0]
+    assert env.tokens["WETH"].balanceOf(v1) == 0.1e18
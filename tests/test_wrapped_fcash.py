@@ -1,6 +1,8 @@
+import os
 import pytest
 import brownie
 import eth_abi
+from scripts.gas_profiler import profile_transactions, write_report
 from tests.helpers import get_balance_trade_action
 from brownie import Contract, WrappedfCash, nProxyAdmin, network
 from brownie.convert.datatypes import Wei
@@ -515,6 +517,57 @@ def test_lend_via_erc1155_action_underlying_token(wrapper, env, accounts):
     portfolio = env.notional.getAccount(acct.address)[2]
     assert len(portfolio) == 0
 
+def notional_calls(txn, env):
+    return [
+        s.get("function", "").split(".")[-1].split("(")[0]
+        for s in txn.subcalls
+        if s["to"] == env.notional.address
+    ]
+
+def test_token_cache_matches_notional(wrapper, env):
+    (asset, underlying) = env.notional.getCurrency(2)
+    assert wrapper.getAssetToken() == (asset[0], asset[2], asset[3])
+    assert wrapper.getUnderlyingToken() == (underlying[0], underlying[2])
+
+    # Refreshing is permissionless and does not reset existing approvals
+    wrapper.refreshTokenCache({"from": env.deployer})
+    assert wrapper.getAssetToken() == (asset[0], asset[2], asset[3])
+    assert env.tokens["cDAI"].allowance(wrapper.address, env.notional.address) > 0
+    assert env.tokens["DAI"].allowance(wrapper.address, env.notional.address) > 0
+
+def test_gas_mint_and_redeem_paths(wrapper, lender, env, accounts):
+    acct = accounts[0]
+    env.tokens["DAI"].transfer(acct, 100_000e18, {'from': env.whales["DAI_EOA"]})
+    env.tokens["DAI"].approve(env.tokens["cDAI"].address, 2 ** 255 - 1, {'from': acct})
+    env.tokens["cDAI"].mint(50_000e18, {'from': acct})
+    env.tokens["cDAI"].approve(wrapper.address, 2 ** 255 - 1, {'from': acct})
+    env.tokens["DAI"].approve(wrapper.address, 2 ** 255 - 1, {'from': acct})
+
+    txns = {}
+    txns["mintUnderlying"] = wrapper.mint(10_000e18, 10_000e8, acct.address, 0, True, {'from': acct})
+    txns["mintAsset"] = wrapper.mint(500_000e8, 5_000e8, acct.address, 0, False, {'from': acct})
+    txns["redeemToUnderlying"] = wrapper.redeemToUnderlying(5_000e8, acct.address, 0, {"from": acct})
+    txns["redeemToAsset"] = wrapper.redeemToAsset(5_000e8, acct.address, 0, {"from": acct})
+
+    env.notional.safeTransferFrom(
+        lender.address, wrapper.address, wrapper.getfCashId(), 100_000e8, "", {"from": lender}
+    )
+    txns["redeemTransferfCash"] = wrapper.redeem(10_000e8, (False, True, lender.address, 0), {"from": lender})
+
+    chain.mine(1, timestamp=wrapper.getMaturity())
+    txns["redeemMaturedUnderlying"] = wrapper.redeemToUnderlying(10_000e8, lender.address, 0, {"from": lender})
+    txns["redeemMaturedAsset"] = wrapper.redeemToAsset(10_000e8, lender.address, 0, {"from": lender})
+
+    for (path, txn) in txns.items():
+        # Token metadata comes from the cache on every path
+        assert "getCurrency" not in notional_calls(txn, env)
+
+    # GAS_PROFILE=<dir> writes the profile of every path for diffing against another commit
+    directory = os.environ.get("GAS_PROFILE")
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+        write_report(profile_transactions(txns), os.path.join(directory, "wrapped_fcash_paths.json"))
+
 def get_lend_action(currencyId, tradeActionData, depositUnderlying):
     tradeActions = [get_trade_action(**t) for t in tradeActionData]
     return (currencyId, depositUnderlying, tradeActions)
@@ -0,0 +1,52 @@
+import pytest
+from scripts.yield_curve import YieldCurve, YieldCurveEngine, discount_factor
+from tests.constants import MARKETS, SECONDS_IN_DAY, SECONDS_IN_YEAR, START_TIME
+from tests.helpers import get_market_curve
+
+BLOCK_TIME = START_TIME + SECONDS_IN_DAY
+ASSET_RATE = ("0x0000000000000000000000000000000000000000", 200000000000000000000000000, 10 ** 18)
+
+
+def int_markets(markets):
+    return [tuple(int(v) if type(v) == float else v for v in m) for m in markets]
+
+
+@pytest.fixture()
+def curve():
+    return YieldCurve(2, BLOCK_TIME, int_markets(get_market_curve(3, "normal")), supplyRate=0.01e9)
+
+
+def test_market_maturities_use_oracle_rates(curve):
+    for (i, maturity) in enumerate(MARKETS[0:3]):
+        assert curve.rate(maturity) == curve.oracleRates[i]
+
+
+def test_idiosyncratic_maturities_are_interpolated(curve):
+    midpoint = (MARKETS[0] + MARKETS[1]) // 2
+    assert curve.rate(midpoint) == (curve.oracleRates[0] + curve.oracleRates[1]) // 2
+
+    # Before the first market the short rate is the supply rate at the block time
+    assert curve.oracleRates[0] > curve.rate((BLOCK_TIME + MARKETS[0]) // 2) > 0.01e9
+
+    with pytest.raises(Exception):
+        curve.rate(BLOCK_TIME - 1)
+    with pytest.raises(Exception):
+        curve.rate(MARKETS[2] + SECONDS_IN_DAY)
+
+
+def test_reprice_portfolios(curve):
+    engine = YieldCurveEngine(None)
+    engine.curves[2] = curve
+    engine.assetRates[2] = ASSET_RATE
+    portfolios = {
+        "lender": [(2, MARKETS[1], 1, 100e8)],
+        "borrower": [(2, MARKETS[0], 1, -100e8), (2, MARKETS[0] + 30 * SECONDS_IN_DAY, 1, 50e8)],
+    }
+
+    values = engine.reprice_portfolios(portfolios)
+    assert values["lender"][2] == int(100e8) * discount_factor(curve.oracleRates[1], MARKETS[1] - BLOCK_TIME) // 10 ** 9
+    assert -100e8 < values["borrower"][2] < -50e8
+    # Debts truncate towards zero as in Solidity
+    assert curve.present_value(-100e8, MARKETS[1]) == -curve.present_value(100e8, MARKETS[1])
+    # One year at 6% continuously compounded
+    assert discount_factor(0.06e9, SECONDS_IN_YEAR) == 941764533